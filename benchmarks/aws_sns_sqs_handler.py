@@ -0,0 +1,300 @@
+"""Benchmarks the per-message path of AWS SNS+SQS handlers (tomodachi.transport.aws_sns_sqs).
+
+Messages are passed directly to the handler that @tomodachi.aws_sns_sqs wraps service functions with, and the
+SQS client used to delete handled messages is stubbed, so no network access or AWS credentials are needed.
+
+Each scenario (message envelope, with or without middlewares) is run twice: once uninstrumented to measure the
+throughput in messages/sec, and once with timers around each stage of the handler to measure the latency of
+envelope parsing, deduplication bookkeeping, middleware execution (including the service function), deletion
+of the message and the remaining handler overhead (building of keyword arguments, etc).
+
+Usage:
+    python benchmarks/aws_sns_sqs_handler.py [--messages 20000] [--envelope json] [--middleware on] [--output file]
+
+Results are written as JSON (to stdout unless --output is specified) and as a table to stderr.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import tomodachi
+import tomodachi.transport.aws_sns_sqs
+from tomodachi.envelope.json_base import JsonBase
+from tomodachi.helpers.deduplication import DeduplicationCache
+from tomodachi.options import Options
+from tomodachi.transport.aws_sns_sqs import AWSSNSSQSTransport
+
+ENVELOPES = ("json", "protobuf", "none")
+QUEUE_URL = "https://sqs.eu-west-1.amazonaws.com/123456789012/benchmark-queue"
+TOPIC = "benchmark-topic"
+
+
+class StubSQSClient(object):
+    def __init__(self) -> None:
+        self.deleted = 0
+
+    async def delete_message(self, QueueUrl: str, ReceiptHandle: str) -> Dict:
+        self.deleted += 1
+        return {}
+
+    async def delete_message_batch(self, QueueUrl: str, Entries: List[Dict]) -> Dict:
+        self.deleted += len(Entries)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+
+class StubConnector(object):
+    def __init__(self, client: StubSQSClient) -> None:
+        self.client = client
+
+    def get_client(self, alias_name: str) -> Any:
+        return self.client
+
+    @contextlib.asynccontextmanager
+    async def __call__(self, alias_name: str, service_name: str) -> AsyncIterator[StubSQSClient]:
+        yield self.client
+
+
+class BenchmarkService(object):
+    name = "benchmark-service"
+    uuid = "b5c0f0a4-5f3a-4a5e-9a4b-6f7f6d0f1a2b"
+
+
+async def passthrough_middleware(
+    func: Callable, service: Any, message: Any, topic: str, context: Dict, *args: Any, **kwargs: Any
+) -> Any:
+    return await func(*args, **kwargs)
+
+
+class StageTimer(object):
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, duration: float) -> None:
+        self.durations.setdefault(stage, []).append(duration)
+
+    def wrap_async(self, stage: str, func: Callable) -> Callable:
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            start_time = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start_time)
+
+        return _wrapper
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, durations in self.durations.items():
+            durations = sorted(durations)
+            result[stage] = {
+                "count": len(durations),
+                "mean_us": round(statistics.mean(durations) * 1000000, 3),
+                "p50_us": round(durations[int(len(durations) * 0.50)] * 1000000, 3),
+                "p95_us": round(durations[min(int(len(durations) * 0.95), len(durations) - 1)] * 1000000, 3),
+                "p99_us": round(durations[min(int(len(durations) * 0.99), len(durations) - 1)] * 1000000, 3),
+            }
+        return result
+
+
+class TimedDeduplicationCache(DeduplicationCache):
+    __slots__ = ("timer",)
+
+    def __init__(self, timer: StageTimer, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.timer = timer
+
+    def add(self, key: Any) -> bool:
+        start_time = time.perf_counter()
+        try:
+            return super().add(key)
+        finally:
+            self.timer.add("deduplication", time.perf_counter() - start_time)
+
+
+def get_envelope(envelope_name: str) -> Tuple[Any, Dict]:
+    if envelope_name == "json":
+        return JsonBase, {}
+    if envelope_name == "protobuf":
+        from google.protobuf.struct_pb2 import Struct  # isort: skip
+        from tomodachi.envelope.protobuf_base import ProtobufBase  # isort: skip
+
+        return ProtobufBase, {"proto_class": Struct}
+    return None, {}
+
+
+async def build_payloads(envelope: Any, envelope_name: str, count: int) -> List[str]:
+    data = {"id": "0", "name": "benchmark", "values": [1, 2, 3], "nested": {"enabled": True}}
+    if envelope_name == "protobuf":
+        from google.protobuf.struct_pb2 import Struct  # isort: skip
+
+        message = Struct()
+        message.update(data)
+        data = message  # type: ignore
+    elif envelope_name == "none":
+        return [json.dumps({**data, "id": str(i)}) for i in range(count)]
+
+    return [await envelope.build_message(BenchmarkService, TOPIC, data) for _ in range(count)]
+
+
+async def create_handler(envelope: Any, envelope_kwargs: Dict, middlewares: List[Callable], context: Dict) -> Callable:
+    async def func(self: Any, data: Any) -> None:
+        pass
+
+    obj = BenchmarkService()
+    context["message_envelope"] = envelope
+    context["message_middleware"] = middlewares
+    context["_aws_sns_sqs_subscribers"] = []
+    await AWSSNSSQSTransport.subscribe_handler(obj, context, func, TOPIC, message_envelope=envelope, **envelope_kwargs)
+    return context["_aws_sns_sqs_subscribers"][0][4]
+
+
+async def run_scenario(envelope_name: str, middleware: bool, messages: int) -> Dict[str, Any]:
+    envelope, envelope_kwargs = get_envelope(envelope_name)
+    middlewares = [passthrough_middleware, passthrough_middleware] if middleware else []
+    payloads = await build_payloads(envelope, envelope_name, messages)
+
+    client = StubSQSClient()
+    original_connector = tomodachi.transport.aws_sns_sqs.connector
+    original_execute_middlewares = tomodachi.transport.aws_sns_sqs.execute_middlewares
+    original_enqueue_delete_message = AWSSNSSQSTransport.__dict__["enqueue_delete_message"]
+    tomodachi.transport.aws_sns_sqs.connector = StubConnector(client)  # type: ignore
+
+    try:
+        # Throughput run, without any instrumentation.
+        context: Dict = {"options": Options()}
+        handler = await create_handler(envelope, envelope_kwargs, middlewares, context)
+        start_time = time.perf_counter()
+        for i, payload in enumerate(payloads):
+            await handler(payload, "receipt-handle-{}".format(i), QUEUE_URL, TOPIC, {}, 1)
+        await AWSSNSSQSTransport.flush_delete_message_buffers(context)
+        elapsed = time.perf_counter() - start_time
+
+        # Instrumented run, where each stage of the handler is timed.
+        timer = StageTimer()
+        context = {"options": Options()}
+        context["_aws_sns_sqs_received_messages"] = TimedDeduplicationCache(timer)
+        if envelope:
+            timed_parse_message = timer.wrap_async("envelope_parse", envelope.parse_message)
+            envelope = type("Timed{}".format(envelope.__name__), (envelope,), {"parse_message": timed_parse_message})
+        tomodachi.transport.aws_sns_sqs.execute_middlewares = timer.wrap_async(  # type: ignore
+            "middlewares", original_execute_middlewares
+        )
+        timed_enqueue_delete_message = timer.wrap_async("delete", AWSSNSSQSTransport.enqueue_delete_message)
+        setattr(AWSSNSSQSTransport, "enqueue_delete_message", staticmethod(timed_enqueue_delete_message))
+
+        handler = await create_handler(envelope, envelope_kwargs, middlewares, context)
+        for i, payload in enumerate(payloads):
+            start_time = time.perf_counter()
+            await handler(payload, "receipt-handle-{}".format(i), QUEUE_URL, TOPIC, {}, 1)
+            timer.add("total", time.perf_counter() - start_time)
+        await AWSSNSSQSTransport.flush_delete_message_buffers(context)
+    finally:
+        tomodachi.transport.aws_sns_sqs.connector = original_connector
+        tomodachi.transport.aws_sns_sqs.execute_middlewares = original_execute_middlewares  # type: ignore
+        setattr(AWSSNSSQSTransport, "enqueue_delete_message", original_enqueue_delete_message)
+
+    # The remaining time of each message is spent in the handler itself, for example building keyword arguments.
+    totals = timer.durations.get("total", [])
+    for i in range(len(totals)):
+        timer.add(
+            "other",
+            max(
+                totals[i]
+                - sum(
+                    [
+                        timer.durations[stage][i]
+                        for stage in ("envelope_parse", "deduplication", "middlewares", "delete")
+                        if len(timer.durations.get(stage, [])) > i
+                    ]
+                ),
+                0.0,
+            ),
+        )
+
+    if client.deleted != messages * 2:
+        raise Exception("Expected {} deleted messages, got {}".format(messages * 2, client.deleted))
+
+    return {
+        "envelope": envelope_name,
+        "middleware": middleware,
+        "messages": messages,
+        "elapsed_seconds": round(elapsed, 6),
+        "messages_per_second": round(messages / elapsed, 1),
+        "stages": timer.summary(),
+    }
+
+
+async def run(envelopes: List[str], middleware_options: List[bool], messages: int) -> Dict[str, Any]:
+    results = []
+    for envelope_name in envelopes:
+        for middleware in middleware_options:
+            results.append(await run_scenario(envelope_name, middleware, messages))
+
+    return {
+        "benchmark": "aws_sns_sqs_handler",
+        "tomodachi_version": tomodachi.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    stages = ("envelope_parse", "deduplication", "middlewares", "delete", "other", "total")
+    print(
+        "{:<10} {:<10} {:>12}  {}".format(
+            "envelope", "middleware", "msg/s", "  ".join(["{:>14}".format(s) for s in stages])
+        ),
+        file=sys.stderr,
+    )
+    for result in report["results"]:
+        print(
+            "{:<10} {:<10} {:>12.1f}  {}".format(
+                result["envelope"],
+                "on" if result["middleware"] else "off",
+                result["messages_per_second"],
+                "  ".join(
+                    [
+                        (
+                            "{:>11.2f} us".format(result["stages"][s]["mean_us"])
+                            if s in result["stages"]
+                            else "{:>14}".format("-")
+                        )
+                        for s in stages
+                    ]
+                ),
+            ),
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the per-message path of AWS SNS+SQS handlers")
+    parser.add_argument("--messages", type=int, default=20000, help="number of messages per scenario")
+    parser.add_argument("--envelope", choices=ENVELOPES, action="append", help="envelope(s) to benchmark")
+    parser.add_argument("--middleware", choices=("on", "off"), action="append", help="run with or without middlewares")
+    parser.add_argument("--output", help="file to write the JSON results to (default: stdout)")
+    args = parser.parse_args(argv)
+
+    envelopes = args.envelope or list(ENVELOPES)
+    middleware_options = [value == "on" for value in (args.middleware or ["off", "on"])]
+
+    report = asyncio.run(run(envelopes, middleware_options, args.messages))
+
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import asyncio
+from typing import Any, Dict, List
+
+import botocore.exceptions
+import pytest
+
+from tomodachi.helpers.aiobotocore_connector import ClientConnector
+from tomodachi.helpers.circuit_breaker import CircuitOpenError
+
+
+class Client(object):
+    def __init__(self, credentials: Dict) -> None:
+        self.credentials = credentials
+
+    async def close(self) -> None:
+        pass
+
+
+def test_client_pool_round_robin(loop: Any) -> None:
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", Client)
+    connector.setup_credentials("tomodachi.sqs", {"region_name": "eu-west-1"})
+    connector.configure_pool("tomodachi.sqs", clients=3, max_pool_connections=10)
+
+    async def _async() -> None:
+        clients: List[Any] = []
+        for _ in range(6):
+            async with connector("tomodachi.sqs", service_name="sqs") as client:
+                clients.append(client)
+
+        assert len(set(clients)) == 3
+        assert clients[0:3] == clients[3:6]
+        assert clients[0] is connector.get_client("tomodachi.sqs")
+        assert clients[1].credentials == {"region_name": "eu-west-1"}
+
+        async with connector("tomodachi.sqs", service_name="sqs"):
+            stats = connector.get_pool_stats("tomodachi.sqs")
+            assert [s["alias"] for s in stats] == ["tomodachi.sqs", "tomodachi.sqs#1", "tomodachi.sqs#2"]
+            assert [s["in_use"] for s in stats] == [1, 0, 0]
+            assert stats[0]["utilization"] == 0.1
+            assert [s["requests"] for s in stats] == [3, 2, 2]
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_client_pool_least_busy(loop: Any) -> None:
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", Client)
+    connector.configure_pool("tomodachi.sqs", clients=2, selection="least_busy")
+
+    async def _async() -> None:
+        async with connector("tomodachi.sqs", service_name="sqs") as client_1:
+            async with connector("tomodachi.sqs", service_name="sqs") as client_2:
+                assert client_1 is not client_2
+            async with connector("tomodachi.sqs", service_name="sqs") as client_3:
+                assert client_3 is client_2
+
+        assert [s["peak_in_use"] for s in connector.get_pool_stats("tomodachi.sqs")] == [1, 1]
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_client_pool_invalid_values() -> None:
+    connector = ClientConnector()
+    with pytest.raises(ValueError):
+        connector.configure_pool("tomodachi.sqs", clients=0)
+    with pytest.raises(ValueError):
+        connector.configure_pool("tomodachi.sqs", max_pool_connections=0)
+    with pytest.raises(ValueError):
+        connector.configure_pool("tomodachi.sqs", selection="random")
+
+
+def test_client_hot_swap(loop: Any) -> None:
+    closed: List[Any] = []
+
+    class ClosingClient(Client):
+        async def close(self) -> None:
+            closed.append(self)
+
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", ClosingClient)
+    connector.setup_credentials("tomodachi.sqs", {"region_name": "eu-west-1"})
+
+    async def _async() -> None:
+        async with connector("tomodachi.sqs", service_name="sqs") as old_client:
+            # The new client is used right away, while the old client is kept open until its request has finished.
+            new_client = await connector.reconnect_client("tomodachi.sqs")
+            assert new_client is not old_client
+            assert connector.get_client("tomodachi.sqs") is new_client
+
+            # Clients aren't recreated again within the time lock.
+            assert await connector.reconnect_client("tomodachi.sqs") is new_client
+            await asyncio.sleep(0.1)
+            assert closed == []
+
+        await asyncio.sleep(0.1)
+        assert closed == [old_client]
+
+        # New credentials are swapped in on the same path, also within the time lock.
+        await connector.refresh_credentials("tomodachi.sqs", {"region_name": "us-east-1"})
+        client = connector.get_client("tomodachi.sqs")
+        assert client is not new_client
+        assert client.credentials == {"region_name": "us-east-1"}
+
+        await connector.close(fast=True)
+        assert set(closed) == {old_client, new_client, client}
+
+    loop.run_until_complete(_async())
+
+
+def test_client_metrics(loop: Any) -> None:
+    class APIClient(Client):
+        async def _make_api_call(self, operation_name: str, api_params: Dict) -> Dict:
+            if operation_name == "DeleteMessage":
+                raise botocore.exceptions.ClientError({"Error": {"Code": "InvalidParameterValue"}}, operation_name)
+            if operation_name == "ChangeMessageVisibility":
+                await asyncio.sleep(1)
+            return {"ResponseMetadata": {"RetryAttempts": 1}}
+
+        async def receive_message(self, **kwargs: Any) -> Dict:
+            return await self._make_api_call("ReceiveMessage", kwargs)
+
+        async def delete_message(self, **kwargs: Any) -> Dict:
+            return await self._make_api_call("DeleteMessage", kwargs)
+
+        async def change_message_visibility(self, **kwargs: Any) -> Dict:
+            return await self._make_api_call("ChangeMessageVisibility", kwargs)
+
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", APIClient)
+
+    async def _async() -> None:
+        async with connector("tomodachi.sqs", service_name="sqs") as client:
+            await client.receive_message(QueueUrl="url")
+            await client.receive_message(QueueUrl="url")
+            with pytest.raises(botocore.exceptions.ClientError):
+                await client.delete_message(QueueUrl="url", ReceiptHandle="rh")
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with connector("tomodachi.sqs", service_name="sqs") as client:
+                await asyncio.wait_for(client.change_message_visibility(QueueUrl="url"), timeout=0.05)
+
+        stats = connector.metrics.get_stats()["sqs"]
+        assert stats["receive_message"]["count"] == 2
+        assert stats["receive_message"]["retries"] == 2
+        assert stats["receive_message"]["errors"] == 0
+        assert stats["delete_message"]["errors"] == 1
+        assert stats["change_message_visibility"]["timeouts"] == 1
+        assert stats["change_message_visibility"]["max_time"] >= 0.05
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_client_warm_up(loop: Any) -> None:
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", Client)
+    connector.configure_pool("tomodachi.sqs", clients=2)
+    concurrent_requests: Dict[Any, int] = {}
+    peak_requests: Dict[Any, int] = {}
+
+    async def _request(client: Any) -> None:
+        concurrent_requests[client] = concurrent_requests.get(client, 0) + 1
+        peak_requests[client] = max(peak_requests.get(client, 0), concurrent_requests[client])
+        await asyncio.sleep(0.01)
+        concurrent_requests[client] -= 1
+
+    async def _async() -> None:
+        await connector.warm_up("tomodachi.sqs", "sqs", _request, connections=3)
+        assert connector.get_client("tomodachi.sqs") is not None
+        assert connector.get_client("tomodachi.sqs#1") is not None
+        assert list(peak_requests.values()) == [3, 3]
+
+        with pytest.raises(ValueError):
+            await connector.warm_up("tomodachi.sqs", "sqs", _request, connections=0)
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_client_circuit_breaker(loop: Any) -> None:
+    connector = ClientConnector()
+    connector.set_client_factory("sqs", Client)
+    connector.configure_pool("tomodachi.sqs", clients=2)
+    connector.configure_retry_policy(
+        "tomodachi.sqs", failure_threshold=2, reset_timeout=0.05, retry_budget_max_tokens=1, retry_budget_ratio=0.5
+    )
+
+    def server_error() -> botocore.exceptions.ClientError:
+        return botocore.exceptions.ClientError(
+            {"Error": {"Code": "InternalError"}, "ResponseMetadata": {"HTTPStatusCode": 500}}, "ReceiveMessage"
+        )
+
+    async def _async() -> None:
+        # Client errors don't count as failures of the endpoint.
+        with pytest.raises(botocore.exceptions.ClientError):
+            async with connector("tomodachi.sqs", service_name="sqs"):
+                raise botocore.exceptions.ClientError({"Error": {"Code": "InvalidParameterValue"}}, "DeleteMessage")
+
+        assert connector.can_retry("tomodachi.sqs")
+        assert not connector.can_retry("tomodachi.sqs#1")
+
+        # Failures on any of the clients of the pool are counted for the endpoint.
+        for _ in range(2):
+            with pytest.raises(botocore.exceptions.ClientError):
+                async with connector("tomodachi.sqs", service_name="sqs"):
+                    raise server_error()
+
+        with pytest.raises(CircuitOpenError):
+            async with connector("tomodachi.sqs", service_name="sqs"):
+                pass
+        assert not connector.can_retry("tomodachi.sqs")
+
+        await asyncio.sleep(0.06)
+        async with connector("tomodachi.sqs", service_name="sqs"):
+            pass
+        async with connector("tomodachi.sqs", service_name="sqs"):
+            pass
+        assert connector.can_retry("tomodachi.sqs")
+
+        # Timeouts of long-polling requests are expected and don't count as failures, unlike those of other requests.
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                async with connector("tomodachi.sqs", service_name="sqs", long_poll=True):
+                    raise asyncio.TimeoutError()
+        async with connector("tomodachi.sqs", service_name="sqs"):
+            pass
+
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                async with connector("tomodachi.sqs", service_name="sqs"):
+                    raise asyncio.TimeoutError()
+        with pytest.raises(CircuitOpenError):
+            async with connector("tomodachi.sqs", service_name="sqs", long_poll=True):
+                pass
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
@@ -1,4 +1,5 @@
-from typing import Any
+import asyncio
+from typing import Any, List
 
 import pytest
 
@@ -56,6 +57,35 @@ def test_queue_name(monkeypatch: Any) -> None:
     assert queue_name == "prefix-540e8e5bc604e4ea618f7e0517a04f030ad1dcbff2e121e9466ddd1c811450bf"
 
 
+def test_delayed_nack(monkeypatch: Any, loop: Any) -> None:
+    nacked: List[int] = []
+
+    class Channel(object):
+        async def basic_client_nack(self, delivery_tag: int) -> None:
+            nacked.append(delivery_tag)
+
+    monkeypatch.setattr(AmqpTransport, "channel", Channel())
+
+    async def _async() -> None:
+        # The nack is scheduled without blocking the caller.
+        AmqpTransport.delayed_nack(1, 0.1)
+        AmqpTransport.delayed_nack(2, 10)
+        assert nacked == []
+        assert len(AmqpTransport.delayed_nacks) == 2
+
+        await asyncio.sleep(0.2)
+        assert nacked == [1]
+        assert len(AmqpTransport.delayed_nacks) == 1
+
+        for task in list(AmqpTransport.delayed_nacks):
+            task.cancel()
+        await asyncio.sleep(0.01)
+        assert nacked == [1]
+        assert len(AmqpTransport.delayed_nacks) == 0
+
+    loop.run_until_complete(_async())
+
+
 def test_publish_invalid_credentials(monkeypatch: Any, capsys: Any, loop: Any) -> None:
     services, future = start_service("tests/services/dummy_service.py", monkeypatch, loop=loop)
 
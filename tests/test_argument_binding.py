@@ -0,0 +1,47 @@
+from typing import Any
+
+from tomodachi.helpers.arguments import ArgumentBinding
+
+
+def test_argument_binding_enveloped(loop: Any) -> None:
+    async def func(self: Any, data: Any, topic: str, queue_url: str = "default") -> Any:
+        return (self, data, topic, queue_url)
+
+    binding = ArgumentBinding(func, enveloped=True, context_names=("topic", "receipt_handle", "queue_url"))
+    assert binding.defaults == {"data": None, "topic": None, "queue_url": "default"}
+
+    message = {"data": "value", "topic": "message-topic"}
+    kwargs = binding.kwargs(message, "topic", "receipt-handle", "queue-url")
+    assert kwargs == {"data": "value", "topic": "message-topic", "queue_url": "queue-url"}
+    assert loop.run_until_complete(binding.call("obj", message, kwargs)) == (
+        "obj",
+        "value",
+        "message-topic",
+        "queue-url",
+    )
+
+    # Arguments passed on from middlewares are merged with the arguments built for the message.
+    assert loop.run_until_complete(binding.call("obj", message, kwargs, (), {"queue_url": "other"})) == (
+        "obj",
+        "value",
+        "message-topic",
+        "other",
+    )
+
+
+def test_argument_binding_without_envelope(loop: Any) -> None:
+    def func(self: Any, message: Any, topic: str) -> Any:
+        return (self, message, topic)
+
+    binding = ArgumentBinding(func, enveloped=False, context_names=("topic", "receipt_handle"))
+    kwargs = binding.kwargs("payload", "topic", "receipt-handle")
+    assert kwargs == {"topic": "topic"}
+    assert loop.run_until_complete(binding.call("obj", "payload", kwargs)) == ("obj", "payload", "topic")
+
+    async def single_argument_func(self: Any, data: Any) -> Any:
+        return (self, data)
+
+    binding = ArgumentBinding(single_argument_func, enveloped=False, context_names=("topic",))
+    kwargs = binding.kwargs("payload", "topic")
+    assert kwargs == {}
+    assert loop.run_until_complete(binding.call("obj", "payload", kwargs)) == ("obj", "payload")
@@ -1,10 +1,18 @@
-from typing import Any
+import asyncio
+import contextlib
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
 
 import pytest
 
 import tomodachi
 from run_test_service_helper import start_service
-from tomodachi.transport.aws_sns_sqs import AWSSNSSQSException, AWSSNSSQSTransport
+from tomodachi.envelope.blob_store import BlobStore
+from tomodachi.envelope.json_base import JsonBase
+from tomodachi.helpers.aiobotocore_connector import ClientConnector
+from tomodachi.helpers.in_memory_sns_sqs import InMemorySNSClient, InMemorySNSSQSBackend, InMemorySQSClient
+from tomodachi.options import Options
+from tomodachi.transport.aws_sns_sqs import AWSSNSSQSBatchMessage, AWSSNSSQSException, AWSSNSSQSTransport
 
 
 def test_get_standard_topic_name(monkeypatch: Any) -> None:
@@ -173,3 +181,812 @@ def test_validate_queue_name() -> None:
         )
     assert "vKbED4a66BaGI0cGF0iP8HNF202Sk2XuFnEuJI59GX5VfgEzLaMIU10cVscG7E8vvLIU0MhL7kmsPEy81" in str(e)
     assert AWSSNSSQSTransport.validate_queue_name("abcd") is None
+
+
+def test_enqueue_delete_message_batches_receipt_handles(monkeypatch: Any, loop: Any) -> None:
+    batches = []
+
+    async def delete_message_batch(receipt_handles: Any, queue_url: str, context: Dict) -> None:
+        batches.append((queue_url, list(receipt_handles)))
+
+    monkeypatch.setattr(AWSSNSSQSTransport, "delete_message_batch", delete_message_batch)
+
+    async def _async() -> None:
+        context: Dict = {
+            "options": {"aws_sns_sqs": {"delete_message_batch_size": 10, "delete_message_batch_interval": 10}}
+        }
+        for i in range(12):
+            await AWSSNSSQSTransport.enqueue_delete_message("receipt-{}".format(i), "queue-url", context)
+        await AWSSNSSQSTransport.enqueue_delete_message("receipt-x", "other-queue-url", context)
+        await asyncio.sleep(0)
+
+        assert batches == [("queue-url", ["receipt-{}".format(i) for i in range(10)])]
+
+        await AWSSNSSQSTransport.flush_delete_message_buffers(context)
+
+    loop.run_until_complete(_async())
+
+    assert sorted(batches) == [
+        ("other-queue-url", ["receipt-x"]),
+        ("queue-url", ["receipt-{}".format(i) for i in range(10)]),
+        ("queue-url", ["receipt-10", "receipt-11"]),
+    ]
+
+
+def test_get_queue_visibility_timeout_from_subscribed_queue(loop: Any) -> None:
+    context: Dict = {"_aws_sns_sqs_visibility_timeouts": {"queue-url": 45}}
+
+    visibility_timeout = loop.run_until_complete(AWSSNSSQSTransport.get_queue_visibility_timeout("queue-url", context))
+
+    assert visibility_timeout == 45
+
+
+def test_publish_message_batch_retries_failed_entries(monkeypatch: Any, loop: Any) -> None:
+    requests: List[List[Dict]] = []
+
+    class SNSClient:
+        async def publish_batch(self, TopicArn: str, PublishBatchRequestEntries: List[Dict]) -> Dict:
+            requests.append(PublishBatchRequestEntries)
+            successful = [
+                {"Id": entry["Id"], "MessageId": "message-{}".format(entry["Message"])}
+                for entry in PublishBatchRequestEntries
+                if len(requests) > 1 or entry["Id"] != "3"
+            ]
+            failed = [
+                {"Id": entry["Id"], "Code": "InternalError", "Message": "Internal error", "SenderFault": False}
+                for entry in PublishBatchRequestEntries
+                if len(requests) == 1 and entry["Id"] == "3"
+            ]
+            return {"Successful": successful, "Failed": failed}
+
+    class Connector:
+        def get_client(self, alias_name: str) -> Any:
+            return SNSClient()
+
+        def can_retry(self, alias_name: str) -> bool:
+            return True
+
+        @contextlib.asynccontextmanager
+        async def __call__(self, alias_name: str, service_name: str) -> AsyncIterator[SNSClient]:
+            yield SNSClient()
+
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", Connector())
+
+    entries = [(str(i), {}, "group-id" if i % 2 else "other-group-id", None) for i in range(12)]
+    message_ids = loop.run_until_complete(AWSSNSSQSTransport.publish_message_batch("topic-arn", entries, {}))
+
+    assert message_ids == ["message-{}".format(i) for i in range(12)]
+    assert [len(request) for request in requests] == [10, 1, 2]
+    assert requests[1][0]["Id"] == "3"
+    assert requests[1][0]["MessageGroupId"] == "group-id"
+    assert requests[0][0]["MessageGroupId"] == "other-group-id"
+
+
+def test_publish_message_buffer_coalesces_concurrent_publishes(monkeypatch: Any, loop: Any) -> None:
+    batches = []
+
+    async def publish_message_batch(topic_arn: str, entries: Any, context: Dict, return_exceptions: bool) -> List:
+        batches.append([entry[0] for entry in entries])
+        return [
+            "message-{}".format(entry[0]) if entry[0] != "2" else AWSSNSSQSException("Internal error")
+            for entry in entries
+        ]
+
+    monkeypatch.setattr(AWSSNSSQSTransport, "publish_message_batch", publish_message_batch)
+
+    async def _async() -> List:
+        context: Dict = {"options": {"aws_sns_sqs": {"publish_message_batch_size": 10}}}
+        return await asyncio.gather(
+            *[AWSSNSSQSTransport.publish_message("topic-arn", str(i), {}, context) for i in range(4)],
+            return_exceptions=True,
+        )
+
+    results = loop.run_until_complete(_async())
+
+    assert batches == [["0", "1", "2", "3"]]
+    assert results[0:2] == ["message-0", "message-1"]
+    assert isinstance(results[2], AWSSNSSQSException)
+    assert results[3] == "message-3"
+
+
+def test_get_failed_batch_receipt_handles() -> None:
+    messages = [
+        AWSSNSSQSBatchMessage(
+            message=i,
+            message_attributes={},
+            receipt_handle="receipt-{}".format(i),
+            approximate_receive_count=1,
+            topic="test-topic",
+            message_uuid=None,
+        )
+        for i in range(3)
+    ]
+
+    assert AWSSNSSQSTransport.get_failed_batch_receipt_handles(messages, None) == set()
+    assert AWSSNSSQSTransport.get_failed_batch_receipt_handles(messages, []) == set()
+    assert AWSSNSSQSTransport.get_failed_batch_receipt_handles(messages, [messages[1]]) == {"receipt-1"}
+    assert AWSSNSSQSTransport.get_failed_batch_receipt_handles(messages, ["receipt-0", "receipt-2"]) == {
+        "receipt-0",
+        "receipt-2",
+    }
+    assert AWSSNSSQSTransport.get_failed_batch_receipt_handles(messages, [True, Exception(), False]) == {
+        "receipt-1",
+        "receipt-2",
+    }
+
+
+def test_create_topic_shares_concurrent_calls(monkeypatch: Any, loop: Any) -> None:
+    calls = []
+
+    async def _create_topic(topic: str, context: Dict, *args: Any) -> str:
+        calls.append(topic)
+        await asyncio.sleep(0.01)
+        return "arn:aws:sns:eu-west-1:123456789012:{}".format(topic)
+
+    monkeypatch.setattr(AWSSNSSQSTransport, "_create_topic", _create_topic)
+    monkeypatch.setattr(AWSSNSSQSTransport, "topics", {})
+
+    async def _async() -> List:
+        context: Dict = {}
+        return await asyncio.gather(
+            *[AWSSNSSQSTransport.create_topic(topic, context) for topic in ("a", "b", "a", "a", "b")]
+        )
+
+    results = loop.run_until_complete(_async())
+
+    assert sorted(calls) == ["a", "b"]
+    assert [result.split(":")[-1] for result in results] == ["a", "b", "a", "a", "b"]
+
+
+def test_create_queue_from_resource_cache(monkeypatch: Any, loop: Any, tmpdir: Any) -> None:
+    calls = []
+
+    async def _create_queue(queue_name: str, context: Dict, fifo: bool) -> Tuple[str, str]:
+        calls.append(queue_name)
+        return (
+            "https://sqs.eu-west-1.amazonaws.com/123456789012/{}".format(queue_name),
+            "arn:aws:sqs:eu-west-1:123456789012:{}".format(queue_name),
+        )
+
+    monkeypatch.setattr(AWSSNSSQSTransport, "_create_queue", _create_queue)
+
+    async def _async() -> Tuple[str, str]:
+        context: Dict = {"options": {"aws_sns_sqs": {"resource_cache_path": str(tmpdir.join("resources.json"))}}}
+        await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        await AWSSNSSQSTransport.close_resource_cache(context)
+        assert calls == ["test-queue"]
+
+        context = {"options": {"aws_sns_sqs": {"resource_cache_path": str(tmpdir.join("resources.json"))}}}
+        result = await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        assert calls == ["test-queue"]
+        await asyncio.sleep(0)
+        assert calls == ["test-queue", "test-queue"]
+        return result
+
+    assert loop.run_until_complete(_async()) == (
+        "https://sqs.eu-west-1.amazonaws.com/123456789012/test-queue",
+        "arn:aws:sqs:eu-west-1:123456789012:test-queue",
+    )
+
+
+def test_resource_cache_is_kept_apart_per_endpoint_and_credentials(monkeypatch: Any, loop: Any, tmpdir: Any) -> None:
+    calls = []
+
+    async def _create_queue(queue_name: str, context: Dict, fifo: bool) -> Tuple[str, str]:
+        endpoint_url = (
+            context["options"].get("aws_endpoint_urls", {}).get("sqs") or "https://sqs.eu-west-1.amazonaws.com"
+        )
+        calls.append(endpoint_url)
+        return (
+            "{}/123456789012/{}".format(endpoint_url, queue_name),
+            "arn:aws:sqs:eu-west-1:123456789012:{}".format(queue_name),
+        )
+
+    monkeypatch.setattr(AWSSNSSQSTransport, "_create_queue", _create_queue)
+    resource_cache_path = str(tmpdir.join("resources.json"))
+
+    async def _async() -> None:
+        context: Dict = {"options": {"aws_sns_sqs": {"resource_cache_path": resource_cache_path}}}
+        await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        await AWSSNSSQSTransport.close_resource_cache(context)
+
+        # Queues created on another endpoint or with other credentials aren't read from the cached entry.
+        context = {
+            "options": {
+                "aws_sns_sqs": {"resource_cache_path": resource_cache_path},
+                "aws_endpoint_urls": {"sqs": "http://localhost:4566"},
+            }
+        }
+        queue_url, _ = await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        assert queue_url == "http://localhost:4566/123456789012/test-queue"
+        await AWSSNSSQSTransport.close_resource_cache(context)
+
+        context = {
+            "options": {"aws_sns_sqs": {"resource_cache_path": resource_cache_path, "aws_access_key_id": "AKIAOTHER"}}
+        }
+        await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        await AWSSNSSQSTransport.close_resource_cache(context)
+        assert len(calls) == 3
+
+        # FIFO queues are cached apart from standard queues of the same name.
+        context = {"options": {"aws_sns_sqs": {"resource_cache_path": resource_cache_path}}}
+        await AWSSNSSQSTransport.create_queue("test-queue", context, True)
+        assert len(calls) == 4
+
+        # The entry of each endpoint is then read from the cache and verified in the background.
+        context = {
+            "options": {
+                "aws_sns_sqs": {"resource_cache_path": resource_cache_path},
+                "aws_endpoint_urls": {"sqs": "http://localhost:4566"},
+            }
+        }
+        queue_url, _ = await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        assert queue_url == "http://localhost:4566/123456789012/test-queue"
+        assert len(calls) == 4
+        await AWSSNSSQSTransport.close_resource_cache(context)
+
+    loop.run_until_complete(_async())
+
+
+def test_get_wildcard_topic_arns_shares_topic_listing(monkeypatch: Any, loop: Any) -> None:
+    requests: List[Any] = []
+    pages = {
+        None: {"Topics": [{"TopicArn": "arn:aws:sns:eu-west-1:123456789012:order___2e_created"}], "NextToken": "2"},
+        "2": {
+            "Topics": [
+                {"TopicArn": "arn:aws:sns:eu-west-1:123456789012:order___2e_updated"},
+                {"TopicArn": "arn:aws:sns:eu-west-1:123456789012:user___2e_created"},
+            ]
+        },
+    }
+
+    class SNSClient:
+        async def list_topics(self, NextToken: Any = None) -> Dict:
+            requests.append(NextToken)
+            return pages[NextToken]
+
+    class Connector:
+        def get_client(self, alias_name: str) -> Any:
+            return SNSClient()
+
+        @contextlib.asynccontextmanager
+        async def __call__(self, alias_name: str, service_name: str) -> AsyncIterator[SNSClient]:
+            yield SNSClient()
+
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", Connector())
+
+    async def _async() -> List:
+        context: Dict = {}
+        context["_aws_sns_sqs_wildcard_topic_patterns"] = {
+            AWSSNSSQSTransport.get_wildcard_topic_pattern(topic, context, False) for topic in ("order.*", "*.created")
+        }
+        return await asyncio.gather(
+            AWSSNSSQSTransport.get_wildcard_topic_arns("order.*", context, False),
+            AWSSNSSQSTransport.get_wildcard_topic_arns("*.created", context, False),
+        )
+
+    order_topic_arns, created_topic_arns = loop.run_until_complete(_async())
+
+    assert requests == [None, "2"]
+    assert order_topic_arns == [
+        "arn:aws:sns:eu-west-1:123456789012:order___2e_created",
+        "arn:aws:sns:eu-west-1:123456789012:order___2e_updated",
+    ]
+    assert created_topic_arns == [
+        "arn:aws:sns:eu-west-1:123456789012:order___2e_created",
+        "arn:aws:sns:eu-west-1:123456789012:user___2e_created",
+    ]
+
+
+class InMemoryService(object):
+    uuid = "in-memory-service"
+    message_envelope = None
+
+
+def install_in_memory_backend(monkeypatch: Any) -> InMemorySNSSQSBackend:
+    backend = InMemorySNSSQSBackend()
+    connector = ClientConnector()
+    backend.install(connector)
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", connector)
+    monkeypatch.setattr(AWSSNSSQSTransport, "topics", {})
+    monkeypatch.setattr(AWSSNSSQSTransport, "close_waiter", None)
+    return backend
+
+
+async def start_in_memory_service(obj: Any, context: Dict) -> None:
+    # The handlers are subscribed in one go once all of them have been registered with subscribe_handler.
+    context["_aws_sns_sqs_subscribed"] = False
+    subscribe_func = await AWSSNSSQSTransport.subscribe(obj, context)
+    if subscribe_func:
+        await subscribe_func()
+    await obj._started_service()
+
+
+async def wait_until(condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    for _ in range(int(timeout * 100)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met within {} seconds".format(timeout))
+
+
+def test_max_in_flight_messages_with_more_queues_than_capacity(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    topics = ["topic-{}".format(i) for i in range(6)]
+    handled: Dict[str, List[str]] = {topic: [] for topic in topics}
+    in_flight: List[int] = [0, 0]
+
+    def handler_func(topic: str) -> Callable:
+        async def _handler(self: Any, message: str) -> None:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[0], in_flight[1])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            handled[topic].append(message)
+
+        _handler.__name__ = "handler_{}".format(topic.replace("-", "_"))
+        return _handler
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {
+            "options": Options(
+                aws_sns_sqs={"region_name": "eu-west-1", "max_in_flight_messages": 2, "pollers_per_queue": 2}
+            )
+        }
+        for topic in topics:
+            await AWSSNSSQSTransport.subscribe_handler(obj, context, handler_func(topic), topic, competing=True)
+        await start_in_memory_service(obj, context)
+
+        # Most of the queues are idle, while their pollers must not starve the queues that have messages.
+        for i in range(10):
+            await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["topic-0"], str(i), {}, context)
+        await wait_until(lambda: len(handled["topic-0"]) == 10)
+
+        for topic in topics:
+            for i in range(5):
+                await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics[topic], str(i), {}, context)
+        await wait_until(lambda: all(len(handled[topic]) >= 5 for topic in topics))
+
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    assert in_flight[1] <= 2
+    assert sorted(handled["topic-0"]) == sorted([str(i) for i in range(10)] + [str(i) for i in range(5)])
+    assert all(sorted(handled[topic]) == [str(i) for i in range(5)] for topic in topics[1:])
+
+
+def test_blob_store_fetch_error_delays_redelivery(monkeypatch: Any, loop: Any) -> None:
+    backend = install_in_memory_backend(monkeypatch)
+    visibility_timeouts: List[int] = []
+    handled: List[Any] = []
+
+    class UnavailableBlobStore(BlobStore):
+        async def put(self, key: str, data: bytes) -> str:
+            return "reference"
+
+        async def get(self, reference: str) -> bytes:
+            raise ConnectionError("Blob store unavailable")
+
+    class BlobStoreJsonBase(JsonBase):
+        blob_store = UnavailableBlobStore(cache_size=0)
+        blob_store_threshold = 0
+
+    change_message_visibility_batch = InMemorySQSClient.change_message_visibility_batch
+
+    async def _change_message_visibility_batch(self: Any, QueueUrl: str, Entries: List[Dict[str, Any]]) -> Dict:
+        visibility_timeouts.extend([entry["VisibilityTimeout"] for entry in Entries])
+        return await change_message_visibility_batch(self, QueueUrl, Entries)
+
+    monkeypatch.setattr(InMemorySQSClient, "change_message_visibility_batch", _change_message_visibility_batch)
+
+    async def handler(self: Any, data: Any) -> None:
+        handled.append(data)
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1"})}
+        await AWSSNSSQSTransport.subscribe_handler(
+            obj, context, handler, "test-topic", competing=True, message_envelope=BlobStoreJsonBase
+        )
+        await start_in_memory_service(obj, context)
+
+        json_message = await BlobStoreJsonBase.build_message(obj, "test-topic", [str(i) for i in range(20000)])
+        await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], json_message, {}, context)
+        await wait_until(lambda: len(visibility_timeouts) > 0)
+
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    # The message is kept in the queue and only redelivered after a delay, instead of being deleted or retried at once.
+    assert visibility_timeouts == [30]
+    assert handled == []
+    assert [queue.approximate_number_of_messages_not_visible for queue in backend.queues.values()] == [1]
+
+
+def test_publish_returns_message_id_of_coalesced_publish(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    publish_batch_calls: List[int] = []
+    published_message_ids: Dict[str, str] = {}
+    publish_batch = InMemorySNSClient.publish_batch
+
+    async def _publish_batch(self: Any, TopicArn: str, PublishBatchRequestEntries: List[Dict[str, Any]]) -> Dict:
+        publish_batch_calls.append(len(PublishBatchRequestEntries))
+        response = await publish_batch(self, TopicArn, PublishBatchRequestEntries)
+        messages = {entry["Id"]: entry["Message"] for entry in PublishBatchRequestEntries}
+        for entry in response["Successful"]:
+            published_message_ids[messages[entry["Id"]]] = entry["MessageId"]
+        return response
+
+    monkeypatch.setattr(InMemorySNSClient, "publish_batch", _publish_batch)
+
+    class Service(object):
+        message_envelope = None
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1", "publish_message_batch_size": 10})}
+
+    async def _async() -> List:
+        return await asyncio.gather(
+            *[AWSSNSSQSTransport.publish(Service, str(i), "test-topic", wait=True) for i in range(5)]
+        )
+
+    message_ids = loop.run_until_complete(_async())
+
+    # Each caller gets the message id of its own message, although the messages were published in a single batch.
+    assert publish_batch_calls == [5]
+    assert message_ids == [published_message_ids[str(i)] for i in range(5)]
+    assert len(set(message_ids)) == 5
+
+
+def test_failed_message_deletes_are_counted(monkeypatch: Any, loop: Any) -> None:
+    backend = install_in_memory_backend(monkeypatch)
+
+    async def _async() -> None:
+        context: Dict = {"options": {"aws_sns_sqs": {"region_name": "eu-west-1", "delete_message_batch_size": 10}}}
+        queue_url, _ = await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        backend.delete_queue(queue_url)
+        failed_message_deletes = tomodachi.get_execution_context().get("aws_sns_sqs_failed_message_deletes", 0)
+
+        # Messages on a queue that has been removed can't be deleted, which is logged and counted.
+        for i in range(3):
+            await AWSSNSSQSTransport.enqueue_delete_message("receipt-{}".format(i), queue_url, context)
+        await AWSSNSSQSTransport.flush_delete_message_buffers(context)
+        assert tomodachi.get_execution_context()["aws_sns_sqs_failed_message_deletes"] == failed_message_deletes + 3
+
+    loop.run_until_complete(_async())
+
+
+def test_fifo_message_groups_handled_in_order_and_concurrently(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    handled: Dict[str, List[int]] = {}
+    running_groups: List[str] = []
+    overlapping_groups: List[str] = []
+    peak_running_groups: List[int] = [0]
+
+    async def handler(self: Any, message: str) -> None:
+        group_id, sequence = message.split(":")
+        if group_id in running_groups:
+            overlapping_groups.append(group_id)
+        running_groups.append(group_id)
+        peak_running_groups[0] = max(len(set(running_groups)), peak_running_groups[0])
+        await asyncio.sleep(0.02)
+        running_groups.remove(group_id)
+        handled.setdefault(group_id, []).append(int(sequence))
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {
+            "options": Options(aws_sns_sqs={"region_name": "eu-west-1", "fifo_message_group_parallelism": True})
+        }
+        await AWSSNSSQSTransport.subscribe_handler(obj, context, handler, "test-topic", competing=True, fifo=True)
+        await start_in_memory_service(obj, context)
+
+        topic_arn = AWSSNSSQSTransport.topics["test-topic"]
+        for i in range(5):
+            for group_id in ("a", "b", "c"):
+                await AWSSNSSQSTransport.publish_message(
+                    topic_arn, "{}:{}".format(group_id, i), {}, context, group_id=group_id
+                )
+        await wait_until(lambda: sum(len(sequences) for sequences in handled.values()) == 15)
+
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    # Messages of a group are handled one at a time in the order they were published, while groups run concurrently.
+    assert handled == {group_id: [0, 1, 2, 3, 4] for group_id in ("a", "b", "c")}
+    assert overlapping_groups == []
+    assert peak_running_groups[0] > 1
+
+
+def test_max_concurrency_bounds_handlers_in_flight(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    handled: List[str] = []
+    in_flight: List[int] = [0, 0]
+
+    async def handler(self: Any, message: str) -> None:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[0], in_flight[1])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        handled.append(message)
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1"})}
+        await AWSSNSSQSTransport.subscribe_handler(
+            obj, context, handler, "test-topic", competing=True, max_concurrency=3
+        )
+        await start_in_memory_service(obj, context)
+
+        for i in range(30):
+            await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], str(i), {}, context)
+        await wait_until(lambda: len(handled) == 30)
+
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    # In continuous-prefetch mode the handler is kept busy up to, but never above, its max concurrency.
+    assert in_flight[1] == 3
+    assert sorted(handled, key=int) == [str(i) for i in range(30)]
+
+
+def test_multiple_pollers_per_queue(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    handled: List[str] = []
+    receives: List[int] = [0, 0]
+    receive_message = InMemorySQSClient.receive_message
+
+    async def _receive_message(self: Any, **kwargs: Any) -> Dict:
+        receives[0] += 1
+        receives[1] = max(receives[0], receives[1])
+        try:
+            return await receive_message(self, **kwargs)
+        finally:
+            receives[0] -= 1
+
+    monkeypatch.setattr(InMemorySQSClient, "receive_message", _receive_message)
+
+    async def handler(self: Any, message: str) -> None:
+        handled.append(message)
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1"})}
+        await AWSSNSSQSTransport.subscribe_handler(obj, context, handler, "test-topic", competing=True, pollers=3)
+        await start_in_memory_service(obj, context)
+
+        # All pollers of the queue are long-polling at the same time while the queue is idle.
+        await wait_until(lambda: receives[0] == 3)
+
+        for i in range(10):
+            await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], str(i), {}, context)
+        await wait_until(lambda: len(handled) == 10)
+
+        # Stopping the service ends the long-polls of all pollers without waiting for them to time out.
+        await asyncio.wait_for(obj._stop_service(), timeout=5)
+        assert receives[0] == 0
+
+    loop.run_until_complete(_async())
+
+    assert receives[1] == 3
+    assert sorted(handled, key=int) == [str(i) for i in range(10)]
+
+
+def test_visibility_timeout_heartbeat_extends_slow_handlers(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    handled: List[str] = []
+    visibility_changes: List[List[int]] = []
+    change_message_visibility_batch = InMemorySQSClient.change_message_visibility_batch
+
+    async def _change_message_visibility_batch(self: Any, QueueUrl: str, Entries: List[Dict[str, Any]]) -> Dict:
+        visibility_changes.append([entry["VisibilityTimeout"] for entry in Entries])
+        return await change_message_visibility_batch(self, QueueUrl, Entries)
+
+    monkeypatch.setattr(InMemorySQSClient, "change_message_visibility_batch", _change_message_visibility_batch)
+
+    async def handler(self: Any, message: str) -> None:
+        handled.append(message)
+        await asyncio.sleep(2.5)
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {
+            "options": Options(aws_sns_sqs={"region_name": "eu-west-1", "visibility_timeout_heartbeat": True})
+        }
+        await AWSSNSSQSTransport.subscribe_handler(
+            obj, context, handler, "test-topic", competing=True, visibility_timeout=1, pollers=2
+        )
+        await start_in_memory_service(obj, context)
+
+        await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], "message", {}, context)
+        await wait_until(lambda: len(handled) == 1)
+
+        # The handler runs for longer than the visibility timeout of the queue, while another poller is receiving.
+        await asyncio.sleep(3)
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    # The visibility timeout was extended while the handler was running, so the message was never redelivered.
+    assert handled == ["message"]
+    assert len(visibility_changes) >= 2
+    assert all(visibility_timeouts == [1] for visibility_timeouts in visibility_changes)
+
+
+def test_batch_handler_keeps_failed_messages_and_deletes_in_batches(monkeypatch: Any, loop: Any) -> None:
+    backend = install_in_memory_backend(monkeypatch)
+    received: List[Tuple[str, int]] = []
+    deleted_batches: List[int] = []
+    delete_message_batch = InMemorySQSClient.delete_message_batch
+
+    async def _delete_message_batch(self: Any, QueueUrl: str, Entries: List[Dict[str, str]]) -> Dict:
+        deleted_batches.append(len(Entries))
+        return await delete_message_batch(self, QueueUrl, Entries)
+
+    async def _delete_message(self: Any, QueueUrl: str, ReceiptHandle: str) -> Dict:
+        raise AssertionError("Messages should be deleted in batches")
+
+    monkeypatch.setattr(InMemorySQSClient, "delete_message_batch", _delete_message_batch)
+    monkeypatch.setattr(InMemorySQSClient, "delete_message", _delete_message)
+
+    async def handler(self: Any, messages: List[AWSSNSSQSBatchMessage]) -> List[AWSSNSSQSBatchMessage]:
+        received.extend([(m.message, m.approximate_receive_count or 0) for m in messages])
+
+        # Odd messages fail on their first delivery.
+        return [m for m in messages if int(m.message) % 2 and m.approximate_receive_count == 1]
+
+    def not_visible_messages() -> int:
+        return sum(queue.approximate_number_of_messages_not_visible for queue in backend.queues.values())
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1", "delete_message_batch_size": 10})}
+        await AWSSNSSQSTransport.subscribe_handler(
+            obj, context, handler, "test-topic", competing=True, batch=True, visibility_timeout=1
+        )
+        await start_in_memory_service(obj, context)
+
+        for i in range(6):
+            await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], str(i), {}, context)
+
+        # The successful messages are deleted, while the failed ones are kept in flight until their visibility
+        # timeout runs out.
+        await wait_until(lambda: sum(deleted_batches) == 3)
+        assert not_visible_messages() == 3
+
+        await wait_until(lambda: sum(deleted_batches) == 6)
+        assert not_visible_messages() == 0
+
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    assert sorted(received) == sorted([(str(i), 1) for i in range(6)] + [(str(i), 2) for i in range(6) if i % 2])
+    assert len(deleted_batches) < 6
+
+
+def test_subscribe_setup_calls_are_shared_and_cached(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    calls: Dict[str, List[str]] = {"create_topic": [], "create_queue": [], "get_queue_attributes": []}
+    in_flight: List[int] = [0, 0]
+
+    def count_calls(client_class: Any, name: str, key: str) -> None:
+        method = getattr(client_class, name)
+
+        async def _method(self: Any, **kwargs: Any) -> Dict:
+            calls[name].append(kwargs[key])
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[0], in_flight[1])
+            try:
+                await asyncio.sleep(0.01)
+                return await method(self, **kwargs)
+            finally:
+                in_flight[0] -= 1
+
+        monkeypatch.setattr(client_class, name, _method)
+
+    count_calls(InMemorySNSClient, "create_topic", "Name")
+    count_calls(InMemorySQSClient, "create_queue", "QueueName")
+    count_calls(InMemorySQSClient, "get_queue_attributes", "QueueUrl")
+
+    def handler_func(name: str) -> Callable:
+        async def _handler(self: Any, message: str) -> None:
+            pass
+
+        _handler.__name__ = name
+        return _handler
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {"options": Options(aws_sns_sqs={"region_name": "eu-west-1", "subscribe_setup_concurrency": 4})}
+        for i in range(4):
+            await AWSSNSSQSTransport.subscribe_handler(
+                obj,
+                context,
+                handler_func("handler_{}".format(i)),
+                "shared-topic",
+                competing=False,
+                dead_letter_queue_name="shared-dlq",
+                max_receive_count=3,
+            )
+        await start_in_memory_service(obj, context)
+        await obj._stop_service()
+
+    loop.run_until_complete(_async())
+
+    # The handlers are set up concurrently, while the topic and the dead-letter queue that they share are only
+    # created once.
+    assert in_flight[1] > 1
+    assert calls["create_topic"] == ["shared-topic"]
+    assert len(calls["create_queue"]) == 5
+    assert calls["create_queue"].count("shared-dlq") == 1
+
+    # The queue attributes read when a queue is created are reused when subscribing the queue to the topic.
+    assert len(calls["get_queue_attributes"]) == 5
+    assert len(set(calls["get_queue_attributes"])) == 5
+
+
+def test_empty_receive_backoff_delays_and_resets_receives(monkeypatch: Any, loop: Any) -> None:
+    install_in_memory_backend(monkeypatch)
+    handled: List[str] = []
+    receives: List[Tuple[float, int]] = []
+    receive_message = InMemorySQSClient.receive_message
+
+    async def _receive_message(self: Any, **kwargs: Any) -> Dict:
+        started_at = time.monotonic()
+        # Short polls keep the test fast, since each empty receive would otherwise wait for the full long-poll.
+        kwargs["WaitTimeSeconds"] = 0
+        result = await receive_message(self, **kwargs)
+        receives.append((started_at, len(result.get("Messages", []))))
+        return result
+
+    monkeypatch.setattr(InMemorySQSClient, "receive_message", _receive_message)
+
+    async def handler(self: Any, message: str) -> None:
+        handled.append(message)
+
+    def gaps(start: int, end: int) -> List[float]:
+        return [receives[i + 1][0] - receives[i][0] for i in range(start, end)]
+
+    async def _async() -> None:
+        obj = InMemoryService()
+        context: Dict = {
+            "options": Options(
+                aws_sns_sqs={
+                    "region_name": "eu-west-1",
+                    "empty_receive_backoff_max_delay": 0.4,
+                    "empty_receive_backoff_threshold": 3,
+                    "empty_receive_backoff_initial_delay": 0.2,
+                }
+            )
+        }
+        await AWSSNSSQSTransport.subscribe_handler(obj, context, handler, "test-topic", competing=True)
+        await start_in_memory_service(obj, context)
+
+        await wait_until(lambda: len(receives) >= 6)
+        assert all(message_count == 0 for _, message_count in receives)
+
+        # The first empty receives are repeated right away, after which the delay starts at the initial delay and
+        # is doubled up to the max delay.
+        assert all(gap < 0.15 for gap in gaps(0, 2))
+        assert 0.2 <= gaps(2, 3)[0] < 0.35
+        assert all(0.4 <= gap < 0.55 for gap in gaps(3, 5))
+
+        await AWSSNSSQSTransport.publish_message(AWSSNSSQSTransport.topics["test-topic"], "message", {}, context)
+        await wait_until(lambda: len(handled) == 1)
+        received_index = next(i for i, (_, message_count) in enumerate(receives) if message_count)
+
+        # A received message resets the backoff, so that the queue is polled continuously until it has been empty
+        # for another threshold number of receives.
+        await wait_until(lambda: len(receives) > received_index + 4)
+        await obj._stop_service()
+
+        assert all(gap < 0.15 for gap in gaps(received_index, received_index + 3))
+        assert 0.2 <= gaps(received_index + 3, received_index + 4)[0] < 0.35
+
+    loop.run_until_complete(_async())
+
+    assert handled == ["message"]
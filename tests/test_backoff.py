@@ -0,0 +1,29 @@
+import pytest
+
+from tomodachi.helpers.backoff import EmptyReceiveBackoff
+
+
+def test_empty_receive_backoff() -> None:
+    backoff = EmptyReceiveBackoff(10.0, threshold=2, initial_delay=1.5)
+    assert backoff.record(0) == 0.0
+    assert backoff.record(0) == 1.5
+    assert backoff.record(0) == 3.0
+    assert backoff.record(0) == 6.0
+    assert backoff.record(0) == 10.0
+    assert backoff.record(0) == 10.0
+
+    assert backoff.record(3) == 0.0
+    assert backoff.empty_receives == 0
+    assert backoff.record(0) == 0.0
+    assert backoff.record(0) == 1.5
+
+
+def test_empty_receive_backoff_invalid_values() -> None:
+    with pytest.raises(ValueError):
+        EmptyReceiveBackoff(0)
+
+    with pytest.raises(ValueError):
+        EmptyReceiveBackoff(10.0, threshold=0)
+
+    with pytest.raises(ValueError):
+        EmptyReceiveBackoff(10.0, initial_delay=-1)
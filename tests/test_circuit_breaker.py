@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from tomodachi.helpers.circuit_breaker import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    RetryBudget,
+)
+
+
+def test_circuit_breaker() -> None:
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    assert circuit_breaker.allow()
+
+    circuit_breaker.record_failure()
+    circuit_breaker.record_success()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == CIRCUIT_OPEN
+    assert not circuit_breaker.allow()
+    assert 0 < circuit_breaker.retry_after <= 0.05
+
+    # A single probe is let through after the reset timeout, which opens the circuit again if it fails.
+    time.sleep(0.06)
+    assert circuit_breaker.allow()
+    assert circuit_breaker.state == CIRCUIT_HALF_OPEN
+    assert not circuit_breaker.allow()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == CIRCUIT_OPEN
+
+    time.sleep(0.06)
+    assert circuit_breaker.allow()
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == CIRCUIT_CLOSED
+    assert circuit_breaker.retry_after == 0.0
+    assert circuit_breaker.allow()
+
+
+def test_retry_budget() -> None:
+    retry_budget = RetryBudget(max_tokens=2, token_ratio=0.5)
+    assert retry_budget.try_acquire()
+    assert retry_budget.try_acquire()
+    assert not retry_budget.try_acquire()
+
+    retry_budget.record_success()
+    assert not retry_budget.try_acquire()
+    retry_budget.record_success()
+    assert retry_budget.try_acquire()
+
+    for _ in range(10):
+        retry_budget.record_success()
+    assert retry_budget.tokens == 2.0
+
+
+def test_circuit_breaker_invalid_values() -> None:
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+    with pytest.raises(ValueError):
+        CircuitBreaker(reset_timeout=0)
+    with pytest.raises(ValueError):
+        RetryBudget(max_tokens=0)
+    with pytest.raises(ValueError):
+        RetryBudget(token_ratio=0)
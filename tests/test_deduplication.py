@@ -0,0 +1,47 @@
+from typing import Any
+
+import pytest
+
+from tomodachi.helpers.deduplication import DeduplicationCache
+
+
+def test_deduplication_cache_max_size() -> None:
+    cache = DeduplicationCache(max_size=3)
+    assert cache.add("a") is True
+    assert cache.add("a") is False
+    assert cache.add("b") is True
+    assert cache.add("c") is True
+    assert cache.add("d") is True
+
+    assert len(cache) == 3
+    assert "a" not in cache
+    assert "d" in cache
+
+    cache.discard("c")
+    assert "c" not in cache
+    assert cache.add("c") is True
+
+
+def test_deduplication_cache_ttl(monkeypatch: Any) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("tomodachi.helpers.deduplication.time.monotonic", lambda: now[0])
+
+    cache = DeduplicationCache(ttl=60)
+    cache.add("a")
+    now[0] += 30
+    cache.add("b")
+    assert cache.add("a") is False
+
+    now[0] += 31
+    assert "a" not in cache
+    assert "b" in cache
+    assert len(cache) == 1
+    assert cache.add("a") is True
+
+
+def test_deduplication_cache_invalid_values() -> None:
+    with pytest.raises(ValueError):
+        DeduplicationCache(max_size=0)
+
+    with pytest.raises(ValueError):
+        DeduplicationCache(ttl=0)
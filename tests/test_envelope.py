@@ -1,5 +1,6 @@
 import json
 import time
+import uuid
 from typing import Any
 
 import pytest
@@ -287,3 +288,91 @@ def test_protobuf_object_static_validation_function_fail(monkeypatch: Any, capsy
 
     loop.create_task(_async_kill())
     loop.run_until_complete(future)
+
+
+def test_json_base_blob_store(tmp_path: Any, loop: Any) -> None:
+    from tomodachi.envelope.blob_store import BlobStoreFetchError, FileSystemBlobStore
+    from tomodachi.envelope.json_base import JsonBase
+
+    class Service(object):
+        name = "test_blob_store"
+        uuid = "1d3e6a7e-9b4f-4b7a-8e39-2f3c1c3b5b1a"
+
+    class BlobStoreJsonBase(JsonBase):
+        blob_store = FileSystemBlobStore(str(tmp_path / "blobs"), cache_size=1)
+        blob_store_threshold = 1000
+
+    async def _async() -> None:
+        data = [str(uuid.uuid4()) for _ in range(10000)]
+        json_message = await BlobStoreJsonBase.build_message(Service, "topic", data)
+        assert len(json_message) < 1000
+
+        result, message_uuid, timestamp = await BlobStoreJsonBase.parse_message(json_message)
+        assert result.get("metadata", {}).get("data_encoding") == "blob_gzip_json"
+        assert result.get("data") == data
+        assert message_uuid[0:36] == Service.uuid
+
+        # Fetched data is cached, so that subscribers of fan-out topics won't read the same data multiple times.
+        for path in (tmp_path / "blobs").iterdir():
+            path.unlink()
+        result, _, _ = await BlobStoreJsonBase.parse_message(json_message)
+        assert result.get("data") == data
+
+        # Messages which data can't be read raise an error, so that the transport can keep them for redelivery.
+        BlobStoreJsonBase.blob_store = FileSystemBlobStore(str(tmp_path / "blobs"))
+        with pytest.raises(BlobStoreFetchError) as exc_info:
+            await BlobStoreJsonBase.parse_message(json_message)
+        assert exc_info.value.message_uuid[0:36] == Service.uuid
+
+        # Smaller messages are still sent as part of the message.
+        json_message = await BlobStoreJsonBase.build_message(Service, "topic", {"key": "value"})
+        result, _, _ = await BlobStoreJsonBase.parse_message(json_message)
+        assert result.get("metadata", {}).get("data_encoding") == "raw"
+
+    loop.run_until_complete(_async())
+
+
+def test_json_base_set_blob_store(tmp_path: Any, loop: Any) -> None:
+    from tomodachi.envelope.blob_store import FileSystemBlobStore
+    from tomodachi.envelope.json_base import JsonBase
+
+    class BlobStoreJsonBase(JsonBase):
+        pass
+
+    with pytest.raises(ValueError):
+        BlobStoreJsonBase.set_blob_store("/tmp/blobs")  # type: ignore
+    with pytest.raises(ValueError):
+        BlobStoreJsonBase.set_blob_store(None, threshold=-1)
+
+    BlobStoreJsonBase.set_blob_store(FileSystemBlobStore(str(tmp_path / "blobs")), threshold=1000)
+    assert JsonBase.blob_store is None
+    assert JsonBase.blob_store_threshold == 200000
+
+    async def _async() -> None:
+        data = [str(uuid.uuid4()) for _ in range(10000)]
+        json_message = await BlobStoreJsonBase.build_message(object(), "topic", data)
+        assert len(json_message) < 1000
+        assert len(list((tmp_path / "blobs").iterdir())) == 1
+
+        result, _, _ = await BlobStoreJsonBase.parse_message(json_message)
+        assert result.get("data") == data
+
+    loop.run_until_complete(_async())
+
+    BlobStoreJsonBase.set_blob_store(None)
+    assert BlobStoreJsonBase.blob_store is None
+    assert BlobStoreJsonBase.blob_store_threshold == 1000
+
+
+def test_blob_store_requires_put_and_get() -> None:
+    from tomodachi.envelope.blob_store import BlobStore
+
+    class IncompleteBlobStore(BlobStore):
+        async def put(self, key: str, data: bytes) -> str:
+            return key
+
+    # Incomplete stores fail when created, rather than when the first large message is sent or received.
+    with pytest.raises(TypeError):
+        BlobStore()  # type: ignore
+    with pytest.raises(TypeError):
+        IncompleteBlobStore()  # type: ignore
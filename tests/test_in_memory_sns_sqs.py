@@ -0,0 +1,206 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+import pytest
+
+from tomodachi.helpers.aiobotocore_connector import ClientConnector
+from tomodachi.helpers.in_memory_sns_sqs import InMemorySNSClient, InMemorySNSSQSBackend, match_filter_policy
+from tomodachi.transport.aws_sns_sqs import AWSSNSSQSException, AWSSNSSQSTransport
+
+
+def test_in_memory_backend_transport_round_trip(monkeypatch: Any, loop: Any) -> None:
+    connector = ClientConnector()
+    InMemorySNSSQSBackend().install(connector)
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", connector)
+    monkeypatch.setattr(AWSSNSSQSTransport, "topics", {})
+
+    async def _async() -> None:
+        context: Dict = {"options": {"aws_sns_sqs": {"region_name": "eu-west-1"}}}
+        queue_url, queue_arn = await AWSSNSSQSTransport.create_queue("test-queue", context, False)
+        topic_arn = await AWSSNSSQSTransport.create_topic("test-topic", context)
+        await AWSSNSSQSTransport.subscribe_topics(
+            (topic_arn,), queue_arn, queue_url, context, attributes={"FilterPolicy": json.dumps({"kind": ["a"]})}
+        )
+
+        await AWSSNSSQSTransport.publish_message(topic_arn, "message-a", {"kind": "a"}, context)
+        await AWSSNSSQSTransport.publish_message(topic_arn, "message-b", {"kind": "b"}, context)
+
+        async with connector("tomodachi.sqs", service_name="sqs") as client:
+            response = await client.receive_message(
+                QueueUrl=queue_url,
+                WaitTimeSeconds=0,
+                MaxNumberOfMessages=10,
+                AttributeNames=["ApproximateReceiveCount"],
+            )
+            assert len(response["Messages"]) == 1
+            message = response["Messages"][0]
+            body = json.loads(message["Body"])
+            assert body["TopicArn"] == topic_arn
+            assert body["Message"] == "message-a"
+            assert AWSSNSSQSTransport.transform_message_attributes_from_response(body["MessageAttributes"]) == {
+                "kind": "a"
+            }
+            assert message["Attributes"] == {"ApproximateReceiveCount": "1"}
+
+            await AWSSNSSQSTransport.delete_message_batch([message["ReceiptHandle"]], queue_url, context)
+            response = await client.get_queue_attributes(
+                QueueUrl=queue_url,
+                AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+            )
+            assert response["Attributes"] == {
+                "ApproximateNumberOfMessages": "0",
+                "ApproximateNumberOfMessagesNotVisible": "0",
+            }
+
+    loop.run_until_complete(_async())
+
+
+def test_in_memory_backend_transport_warm_up(monkeypatch: Any, loop: Any) -> None:
+    connector = ClientConnector()
+    InMemorySNSSQSBackend().install(connector)
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", connector)
+
+    async def _async() -> None:
+        context: Dict = {
+            "options": {"aws_sns_sqs": {"region_name": "eu-west-1", "warm_up_connections": 0, "client_pool_size": 2}}
+        }
+        await AWSSNSSQSTransport.warm_up(context)
+        assert connector.get_client("tomodachi.sqs") is None
+
+        context["options"]["aws_sns_sqs"]["warm_up_connections"] = 2
+        await AWSSNSSQSTransport.warm_up(context)
+        for alias in ("tomodachi.sns", "tomodachi.sns#1", "tomodachi.sqs", "tomodachi.sqs#1"):
+            assert connector.get_client(alias) is not None
+
+        context["options"]["aws_sns_sqs"]["warm_up_connections"] = -1
+        with pytest.raises(ValueError):
+            await AWSSNSSQSTransport.warm_up(context)
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_in_memory_backend_transport_circuit_breaker(monkeypatch: Any, loop: Any) -> None:
+    connector = ClientConnector()
+    InMemorySNSSQSBackend().install(connector)
+    monkeypatch.setattr("tomodachi.transport.aws_sns_sqs.connector", connector)
+    monkeypatch.setattr(AWSSNSSQSTransport, "topics", {})
+
+    publish_calls = []
+
+    async def _publish(self: Any, **kwargs: Any) -> Dict:
+        publish_calls.append(kwargs)
+        raise asyncio.TimeoutError()
+
+    async def _async() -> None:
+        context: Dict = {
+            "options": {
+                "aws_sns_sqs": {
+                    "region_name": "eu-west-1",
+                    "retry_max_attempts": 3,
+                    "circuit_breaker_failure_threshold": 2,
+                    "circuit_breaker_reset_timeout": 30,
+                }
+            }
+        }
+        topic_arn = await AWSSNSSQSTransport.create_topic("test-topic", context)
+        monkeypatch.setattr(InMemorySNSClient, "publish", _publish)
+
+        # The second failure in a row opens the circuit, which stops further retries.
+        with pytest.raises(AWSSNSSQSException):
+            await AWSSNSSQSTransport.publish_message(topic_arn, "message", {}, context)
+        assert len(publish_calls) == 2
+
+        # Publishing fails fast while the circuit is open.
+        with pytest.raises(AWSSNSSQSException):
+            await AWSSNSSQSTransport.publish_message(topic_arn, "message", {}, context)
+        assert len(publish_calls) == 2
+
+        context["options"]["aws_sns_sqs"]["retry_max_attempts"] = 0
+        with pytest.raises(ValueError):
+            await AWSSNSSQSTransport.publish_message(topic_arn, "message", {}, context)
+
+        await connector.close(fast=True)
+
+    loop.run_until_complete(_async())
+
+
+def test_in_memory_backend_fifo_visibility_and_redrive(loop: Any) -> None:
+    connector = ClientConnector()
+    InMemorySNSSQSBackend().install(connector)
+
+    async def _async() -> None:
+        async with connector("sqs") as client:
+            dlq_url = (await client.create_queue(QueueName="dlq.fifo", Attributes={"FifoQueue": "true"}))["QueueUrl"]
+            dlq_arn = (await client.get_queue_attributes(QueueUrl=dlq_url, AttributeNames=["QueueArn"]))["Attributes"][
+                "QueueArn"
+            ]
+            queue_url = (
+                await client.create_queue(
+                    QueueName="queue.fifo",
+                    Attributes={
+                        "FifoQueue": "true",
+                        "RedrivePolicy": json.dumps({"deadLetterTargetArn": dlq_arn, "maxReceiveCount": 2}),
+                    },
+                )
+            )["QueueUrl"]
+
+            for i, group_id in enumerate(["a", "a", "b"]):
+                await client.send_message(
+                    QueueUrl=queue_url, MessageBody=str(i), MessageGroupId=group_id, MessageDeduplicationId=str(i)
+                )
+            await client.send_message(
+                QueueUrl=queue_url, MessageBody="duplicate", MessageGroupId="a", MessageDeduplicationId="0"
+            )
+
+            response = await client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=1, VisibilityTimeout=0.05)
+            assert [m["Body"] for m in response["Messages"]] == ["0"]
+
+            # Group "a" is blocked while its first message is in-flight.
+            response = await client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+            assert [m["Body"] for m in response["Messages"]] == ["2"]
+            await client.delete_message(QueueUrl=queue_url, ReceiptHandle=response["Messages"][0]["ReceiptHandle"])
+
+            # Long polling returns when the visibility timeout of the in-flight message runs out.
+            start_time = time.monotonic()
+            response = await client.receive_message(
+                QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=5, VisibilityTimeout=0
+            )
+            assert time.monotonic() - start_time < 1
+            assert [m["Body"] for m in response["Messages"]] == ["0", "1"]
+
+            # The first message has now been received twice and is moved to the dead-letter queue on the next receive.
+            response = await client.receive_message(
+                QueueUrl=queue_url, MaxNumberOfMessages=10, AttributeNames=["ApproximateReceiveCount"]
+            )
+            assert [(m["Body"], m["Attributes"]["ApproximateReceiveCount"]) for m in response["Messages"]] == [
+                ("1", "2")
+            ]
+            response = await client.receive_message(
+                QueueUrl=dlq_url, MaxNumberOfMessages=10, AttributeNames=["MessageGroupId"]
+            )
+            assert [(m["Body"], m["Attributes"]["MessageGroupId"]) for m in response["Messages"]] == [("0", "a")]
+
+    loop.run_until_complete(_async())
+
+
+def test_match_filter_policy() -> None:
+    attributes = {
+        "kind": {"DataType": "String", "StringValue": "order.created"},
+        "amount": {"DataType": "Number", "StringValue": "150"},
+        "tags": {"DataType": "String.Array", "StringValue": json.dumps(["a", "b"])},
+    }
+
+    assert match_filter_policy({"kind": ["order.created", "order.updated"]}, attributes)
+    assert match_filter_policy({"kind": [{"prefix": "order."}], "tags": ["b"]}, attributes)
+    assert match_filter_policy({"amount": [{"numeric": [">", 100, "<=", 150]}]}, attributes)
+    assert match_filter_policy(
+        {"kind": [{"anything-but": ["order.deleted"]}], "missing": [{"exists": False}]}, attributes
+    )
+    assert not match_filter_policy({"kind": ["order.deleted"]}, attributes)
+    assert not match_filter_policy({"amount": [{"numeric": ["<", 100]}]}, attributes)
+    assert not match_filter_policy({"missing": ["value"]}, attributes)
+    assert not match_filter_policy({"kind": [{"anything-but": {"prefix": "order."}}]}, attributes)
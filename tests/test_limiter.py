@@ -0,0 +1,137 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from tomodachi.helpers.limiter import InFlightLimiter
+
+
+def test_in_flight_limiter_acquire_release(loop: Any) -> None:
+    async def _async() -> None:
+        limiter = InFlightLimiter(10)
+        assert await limiter.acquire(4) == 4
+        assert await limiter.acquire(10) == 6
+        assert limiter.saturated()
+
+        waiter = asyncio.ensure_future(limiter.acquire(10))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.release(3)
+        assert await waiter == 3
+        assert limiter.in_use == 10
+
+        limiter.release(10)
+        assert limiter.in_use == 0
+        assert limiter.available == 10
+
+    loop.run_until_complete(_async())
+
+
+def test_in_flight_limiter_waiters_in_order(loop: Any) -> None:
+    async def _async() -> None:
+        limiter = InFlightLimiter(1)
+        assert await limiter.acquire() == 1
+
+        order = []
+
+        async def _acquire(name: str) -> None:
+            await limiter.acquire()
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(_acquire(name)) for name in ("a", "b", "c")]
+        await asyncio.sleep(0)
+
+        cancelled_waiter = tasks[1]
+        cancelled_waiter.cancel()
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.wait([tasks[0], tasks[2]])
+
+        assert order == ["a", "c"]
+
+    loop.run_until_complete(_async())
+
+
+def test_in_flight_limiter_skips_cancelled_waiters(loop: Any) -> None:
+    async def _async() -> None:
+        limiter = InFlightLimiter(1)
+        assert await limiter.acquire() == 1
+
+        tasks = [asyncio.ensure_future(limiter.acquire()) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        # The first waiter is cancelled but hasn't yet run to remove itself when the capacity is released.
+        tasks[0].cancel()
+        limiter.release()
+
+        assert await asyncio.wait_for(tasks[1], timeout=1) == 1
+        assert tasks[0].cancelled()
+        assert limiter.in_use == 1
+
+    loop.run_until_complete(_async())
+
+
+def test_in_flight_limiter_wait_available(loop: Any) -> None:
+    async def _async() -> None:
+        limiter = InFlightLimiter(1)
+        await asyncio.wait_for(limiter.wait_available(), timeout=1)
+        assert limiter.in_use == 0
+
+        assert await limiter.acquire() == 1
+        task = asyncio.ensure_future(limiter.wait_available())
+        await asyncio.sleep(0.01)
+        assert not task.done()
+
+        # Waiting for capacity doesn't take it.
+        limiter.release()
+        await asyncio.wait_for(task, timeout=1)
+        assert limiter.in_use == 0
+        assert limiter.available == 1
+
+    loop.run_until_complete(_async())
+
+
+def test_in_flight_limiter_invalid_limit() -> None:
+    with pytest.raises(ValueError):
+        InFlightLimiter(0)
+    with pytest.raises(ValueError):
+        InFlightLimiter(True)  # type: ignore
+
+
+def test_in_flight_limiter_priority(loop: Any) -> None:
+    async def _async() -> None:
+        limiter = InFlightLimiter(1)
+        assert await limiter.acquire() == 1
+
+        order = []
+
+        async def _acquire(name: str, priority: int) -> None:
+            while len(order) < 40:
+                await limiter.acquire(priority=priority, key=name)
+                order.append(name)
+                await asyncio.sleep(0)
+                limiter.release()
+
+        # Multiple waiters per key, as with multiple pollers per queue.
+        tasks = [
+            asyncio.ensure_future(_acquire(name, priority)) for name, priority in (("bulk", 1), ("critical", 3)) * 2
+        ]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.wait(tasks)
+
+        # While saturated, the key with priority 3 gets three times the share of the key with priority 1.
+        assert order[0:40].count("critical") == 30
+        assert order[0:40].count("bulk") == 10
+
+    loop.run_until_complete(_async())
+
+
+def test_in_flight_limiter_invalid_priority(loop: Any) -> None:
+    limiter = InFlightLimiter(1)
+    with pytest.raises(ValueError):
+        loop.run_until_complete(limiter.acquire(priority=0))
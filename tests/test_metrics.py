@@ -0,0 +1,49 @@
+import pytest
+
+from tomodachi.helpers.metrics import LatencyHistogram, OperationMetrics
+
+
+def test_latency_histogram() -> None:
+    histogram = LatencyHistogram((0.1, 1.0, 10.0))
+    histogram.record(0.05)
+    histogram.record(0.5, retries=2)
+    histogram.record(0.5, error=True)
+    histogram.record(20.0, timeout=True)
+
+    assert histogram.buckets == [1, 2, 0, 1]
+    assert histogram.count == 4
+    assert histogram.errors == 1
+    assert histogram.timeouts == 1
+    assert histogram.retries == 2
+    assert histogram.max_time == 20.0
+    assert histogram.quantile(0.25) == 0.1
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.99) == 20.0
+
+    stats = histogram.get_stats()
+    assert stats["buckets"] == {0.1: 1, 1.0: 2, 10.0: 0, float("inf"): 1}
+    assert stats["avg_time"] == pytest.approx(21.05 / 4)
+
+    histogram.reset()
+    assert histogram.buckets == [0, 0, 0, 0]
+    assert histogram.quantile(0.5) == 0.0
+
+
+def test_operation_metrics() -> None:
+    metrics = OperationMetrics((0.1, 1.0))
+    histogram = metrics.get_histogram("sqs", "receive_message")
+    assert metrics.get_histogram("sqs", "receive_message") is histogram
+
+    histogram.record(0.2)
+    assert metrics.get_stats()["sqs"]["receive_message"]["count"] == 1
+
+    metrics.reset()
+    assert metrics.get_histogram("sqs", "receive_message") is histogram
+    assert histogram.count == 0
+
+
+def test_latency_histogram_invalid_bounds() -> None:
+    with pytest.raises(ValueError):
+        LatencyHistogram(())
+    with pytest.raises(ValueError):
+        LatencyHistogram((1.0, 0.1))
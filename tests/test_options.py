@@ -86,6 +86,37 @@ def test_default_values() -> None:
         "aws_sns_sqs.sqs_kms_data_key_reuse_period": None,
         "aws_sns_sqs.queue_policy": None,
         "aws_sns_sqs.wildcard_queue_policy": None,
+        "aws_sns_sqs.delete_message_batch_size": 1,
+        "aws_sns_sqs.delete_message_batch_interval": 0.1,
+        "aws_sns_sqs.publish_message_batch_size": 1,
+        "aws_sns_sqs.publish_message_batch_interval": 0.005,
+        "aws_sns_sqs.max_in_flight_messages_per_queue": None,
+        "aws_sns_sqs.max_in_flight_messages": None,
+        "aws_sns_sqs.pollers_per_queue": 1,
+        "aws_sns_sqs.visibility_timeout_heartbeat": False,
+        "aws_sns_sqs.visibility_timeout_heartbeat_threshold": 0.5,
+        "aws_sns_sqs.publish_outbox_max_size": 10000,
+        "aws_sns_sqs.publish_outbox_concurrency": 10,
+        "aws_sns_sqs.publish_outbox_shutdown_timeout": 10.0,
+        "aws_sns_sqs.message_deduplication_max_size": 100000,
+        "aws_sns_sqs.message_deduplication_ttl": None,
+        "aws_sns_sqs.subscribe_setup_concurrency": 10,
+        "aws_sns_sqs.resource_cache_path": None,
+        "aws_sns_sqs.wildcard_topic_refresh_interval": None,
+        "aws_sns_sqs.fifo_message_group_parallelism": False,
+        "aws_sns_sqs.empty_receive_backoff_max_delay": None,
+        "aws_sns_sqs.empty_receive_backoff_threshold": 3,
+        "aws_sns_sqs.empty_receive_backoff_initial_delay": 1.0,
+        "aws_sns_sqs.client_pool_size": 1,
+        "aws_sns_sqs.client_pool_max_connections": 50,
+        "aws_sns_sqs.client_pool_selection": "round_robin",
+        "aws_sns_sqs.warm_up_connections": 0,
+        "aws_sns_sqs.dns_cache_ttl": None,
+        "aws_sns_sqs.retry_max_attempts": None,
+        "aws_sns_sqs.retry_budget_max_tokens": None,
+        "aws_sns_sqs.retry_budget_ratio": 0.1,
+        "aws_sns_sqs.circuit_breaker_failure_threshold": None,
+        "aws_sns_sqs.circuit_breaker_reset_timeout": 10.0,
         "aws_endpoint_urls.sns": None,
         "aws_endpoint_urls.sqs": None,
         "amqp.host": "127.0.0.1",
@@ -99,6 +130,11 @@ def test_default_values() -> None:
         "amqp.ssl": False,
         "amqp.heartbeat": 60,
         "amqp.queue_ttl": 86400,
+        "amqp.publish_outbox_max_size": 10000,
+        "amqp.publish_outbox_concurrency": 10,
+        "amqp.publish_outbox_shutdown_timeout": 10.0,
+        "amqp.message_deduplication_max_size": 100000,
+        "amqp.message_deduplication_ttl": None,
         "amqp.qos.queue_prefetch_count": 100,
         "amqp.qos.global_prefetch_count": 400,
         "watcher.ignored_dirs": [],
@@ -262,6 +298,37 @@ def test_legacy_fallback_init() -> None:
         "sqs_kms_data_key_reuse_period": None,
         "queue_policy": None,
         "wildcard_queue_policy": None,
+        "delete_message_batch_size": 1,
+        "delete_message_batch_interval": 0.1,
+        "publish_message_batch_size": 1,
+        "publish_message_batch_interval": 0.005,
+        "max_in_flight_messages_per_queue": None,
+        "max_in_flight_messages": None,
+        "pollers_per_queue": 1,
+        "visibility_timeout_heartbeat": False,
+        "visibility_timeout_heartbeat_threshold": 0.5,
+        "publish_outbox_max_size": 10000,
+        "publish_outbox_concurrency": 10,
+        "publish_outbox_shutdown_timeout": 10.0,
+        "message_deduplication_max_size": 100000,
+        "message_deduplication_ttl": None,
+        "subscribe_setup_concurrency": 10,
+        "resource_cache_path": None,
+        "wildcard_topic_refresh_interval": None,
+        "fifo_message_group_parallelism": False,
+        "empty_receive_backoff_max_delay": None,
+        "empty_receive_backoff_threshold": 3,
+        "empty_receive_backoff_initial_delay": 1.0,
+        "client_pool_size": 1,
+        "client_pool_max_connections": 50,
+        "client_pool_selection": "round_robin",
+        "warm_up_connections": 0,
+        "dns_cache_ttl": None,
+        "retry_max_attempts": None,
+        "retry_budget_max_tokens": None,
+        "retry_budget_ratio": 0.1,
+        "circuit_breaker_failure_threshold": None,
+        "circuit_breaker_reset_timeout": 10.0,
     }
     assert options.aws_endpoint_urls.asdict() == {"sns": "http://localhost:4566", "sqs": "http://localhost:4566"}
 
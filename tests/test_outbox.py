@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from tomodachi.helpers.execution_context import clear_execution_context, get_execution_context
+from tomodachi.helpers.outbox import PublishOutbox, flush_publish_outboxes, get_publish_outbox
+
+
+def test_publish_outbox_backpressure_and_flush(loop: Any) -> None:
+    clear_execution_context()
+    published: List[int] = []
+
+    async def _async() -> None:
+        release = asyncio.Event()
+
+        def publish(value: int) -> Any:
+            async def _publish() -> None:
+                await release.wait()
+                published.append(value)
+
+            return _publish
+
+        outbox = PublishOutbox("test", max_size=2, concurrency=1)
+        await outbox.put(publish(0))
+        await asyncio.sleep(0)
+        for i in range(1, 3):
+            await outbox.put(publish(i))
+
+        waiter = asyncio.ensure_future(outbox.put(publish(3)))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert outbox.depth == 2
+        assert get_execution_context()["test_publish_outbox_depth"] == 4
+
+        release.set()
+        await waiter
+        await outbox.flush()
+
+        assert published == [0, 1, 2, 3]
+        assert get_execution_context()["test_publish_outbox_depth"] == 0
+        assert get_execution_context().get("test_publish_outbox_dropped", 0) == 0
+
+        await outbox.put(publish(4))
+        assert get_execution_context()["test_publish_outbox_dropped"] == 1
+
+    loop.run_until_complete(_async())
+
+
+def test_publish_outbox_drops_after_grace_period(loop: Any) -> None:
+    clear_execution_context()
+
+    async def _publish() -> None:
+        await asyncio.sleep(10)
+
+    async def _async() -> None:
+        context: dict = {}
+        outbox = get_publish_outbox(context, "test", concurrency=1, shutdown_timeout=0.05)
+        assert get_publish_outbox(context, "test") is outbox
+
+        for _ in range(3):
+            await outbox.put(_publish)
+        await asyncio.sleep(0)
+
+        await flush_publish_outboxes(context)
+
+        assert outbox.depth == 0
+        assert get_execution_context()["test_publish_outbox_depth"] == 0
+        assert get_execution_context()["test_publish_outbox_dropped"] == 3
+
+    loop.run_until_complete(_async())
+
+
+def test_publish_outbox_invalid_options() -> None:
+    with pytest.raises(ValueError):
+        PublishOutbox("test", concurrency=0)
+
+    with pytest.raises(ValueError):
+        PublishOutbox("test", max_size=-1)
@@ -0,0 +1,37 @@
+import os
+from typing import Any
+
+import pytest
+
+from tomodachi.helpers.resource_cache import ResourceCache
+
+
+def test_resource_cache_persists_entries(tmpdir: Any) -> None:
+    path = os.path.join(str(tmpdir), "resources.json")
+    key = ResourceCache.key("topic", "eu-west-1", "prefix-topic")
+    attributes_hash = ResourceCache.attributes_hash([{"FifoTopic": "false"}])
+
+    resource_cache = ResourceCache(path)
+    assert resource_cache.get(key, attributes_hash) is None
+    resource_cache.set(key, {"topic_arn": "arn:aws:sns:eu-west-1:123456789012:prefix-topic"}, attributes_hash)
+    resource_cache.save()
+
+    resource_cache = ResourceCache(path)
+    assert resource_cache.get(key, attributes_hash) == {"topic_arn": "arn:aws:sns:eu-west-1:123456789012:prefix-topic"}
+    assert resource_cache.get(key, ResourceCache.attributes_hash([{"FifoTopic": "true"}])) is None
+
+    resource_cache.clear()
+    resource_cache.save()
+    assert ResourceCache(path).get(key, attributes_hash) is None
+
+
+def test_resource_cache_ignores_invalid_file(tmpdir: Any) -> None:
+    path = os.path.join(str(tmpdir), "resources.json")
+    with open(path, "w") as fp:
+        fp.write("{invalid")
+
+    resource_cache = ResourceCache(path)
+    assert resource_cache.get(ResourceCache.key("queue", "eu-west-1", "queue")) is None
+
+    with pytest.raises(ValueError):
+        ResourceCache("")
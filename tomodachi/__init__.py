@@ -30,6 +30,7 @@ __available_defs: Dict[str, Union[Tuple[str], Tuple[str, Optional[str]]]] = {
     "amqp_publish": ("tomodachi.transport.amqp",),
     "aws_sns_sqs": ("tomodachi.transport.aws_sns_sqs",),
     "aws_sns_sqs_publish": ("tomodachi.transport.aws_sns_sqs",),
+    "aws_sns_sqs_publish_batch": ("tomodachi.transport.aws_sns_sqs",),
     "HttpException": ("tomodachi.transport.http",),
     "HttpResponse": ("tomodachi.transport.http", "Response"),
     "get_http_response_status": ("tomodachi.transport.http",),
@@ -238,6 +239,7 @@ __all__ = [
     "amqp_publish",
     "aws_sns_sqs",
     "aws_sns_sqs_publish",
+    "aws_sns_sqs_publish_batch",
     "http",
     "http_error",
     "http_static",
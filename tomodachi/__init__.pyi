@@ -22,6 +22,7 @@ from tomodachi.transport.amqp import amqp as amqp
 from tomodachi.transport.amqp import amqp_publish as amqp_publish
 from tomodachi.transport.aws_sns_sqs import aws_sns_sqs as aws_sns_sqs
 from tomodachi.transport.aws_sns_sqs import aws_sns_sqs_publish as aws_sns_sqs_publish
+from tomodachi.transport.aws_sns_sqs import aws_sns_sqs_publish_batch as aws_sns_sqs_publish_batch
 from tomodachi.transport.http import HttpException as HttpException
 from tomodachi.transport.http import Response as _HttpResponse
 from tomodachi.transport.http import get_http_response_status as get_http_response_status
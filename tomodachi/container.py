@@ -13,6 +13,7 @@ import tomodachi
 from tomodachi import CLASS_ATTRIBUTE
 from tomodachi.helpers.dict import merge_dicts
 from tomodachi.helpers.execution_context import set_service, unset_service
+from tomodachi.helpers.outbox import flush_publish_outboxes
 from tomodachi.invoker import FUNCTION_ATTRIBUTE, INVOKER_TASK_START_KEYWORD, START_ATTRIBUTE
 
 
@@ -241,6 +242,11 @@ class ServiceContainer(object):
         if stop_futures and any(stop_futures):
             await asyncio.wait([asyncio.ensure_future(func()) for func in stop_futures if func])
 
+        # Messages published with wait=False by services without any stop hooks for the transport (for example
+        # publish-only services) are still pending in the outbox at this point.
+        for name, instance, log_level in services_started:
+            await flush_publish_outboxes(getattr(instance, "context", None))
+
         for name, instance, log_level in services_started:
             self.logger.info('Stopped service "{}" [id: {}]'.format(name, instance.uuid))
 
@@ -0,0 +1,103 @@
+import abc
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Optional
+
+
+class BlobStoreFetchError(Exception):
+    # Raised by envelopes when message data can't be fetched from the blob store. Transports keep the message for
+    # redelivery after a delay, since the store may only be unavailable for a while.
+    def __init__(self, message: str, message_uuid: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.message_uuid = message_uuid
+
+
+class BlobStore(abc.ABC):
+    # Base class for stores of message data that is too large to be sent as part of the message itself (claim-check),
+    # where only a reference to the stored data is sent. Subclasses implement put() and get(), while fetch() is used
+    # by envelopes to read data through a small LRU cache, since multiple consumers of a fan-out topic (or redelivered
+    # messages) will often read the same data. Stored data is never changed, so cached data never gets stale.
+    #
+    # Removal of stored data is left to the store, for example using expiration or lifecycle rules, since the
+    # publisher can't know when all subscribers have received a message.
+
+    def __init__(self, cache_size: int = 16) -> None:
+        if not isinstance(cache_size, int) or cache_size is True or cache_size is False or cache_size < 0:
+            raise ValueError("Bad value for blob store cache size: {}".format(str(cache_size)))
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+    @abc.abstractmethod
+    async def put(self, key: str, data: bytes) -> str:
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    async def get(self, reference: str) -> bytes:
+        raise NotImplementedError()
+
+    async def fetch(self, reference: str) -> bytes:
+        data = self._cache.get(reference)
+        if data is not None:
+            self._cache.move_to_end(reference)
+            return data
+
+        data = await self.get(reference)
+        if self.cache_size:
+            self._cache[reference] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return data
+
+
+class FileSystemBlobStore(BlobStore):
+    # Stores data as files in a local directory, which may also be a shared (network) filesystem mounted by both
+    # publishers and subscribers.
+
+    def __init__(self, path: str, cache_size: int = 16) -> None:
+        if not isinstance(path, str) or not path:
+            raise ValueError("Bad value for blob store path: {}".format(str(path)))
+
+        super().__init__(cache_size=cache_size)
+        self.path = path
+
+    def get_file_path(self, reference: str) -> str:
+        if not re.match(r"^[0-9a-f]{64}$", reference or ""):
+            raise ValueError("Bad blob store reference: {}".format(str(reference)))
+        return os.path.join(self.path, reference)
+
+    async def put(self, key: str, data: bytes) -> str:
+        reference = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        file_path = self.get_file_path(reference)
+
+        def _write() -> None:
+            os.makedirs(self.path, exist_ok=True)
+
+            # The file is replaced atomically so that a subscriber never reads a partially written file.
+            tmp_path = "{}.{}.tmp".format(file_path, os.getpid())
+            with open(tmp_path, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, file_path)
+
+        await asyncio.get_event_loop().run_in_executor(None, _write)
+        return reference
+
+    async def get(self, reference: str) -> bytes:
+        file_path = self.get_file_path(reference)
+
+        def _read() -> bytes:
+            with open(file_path, "rb") as fp:
+                return fp.read()
+
+        return await asyncio.get_event_loop().run_in_executor(None, _read)
+
+
+__all__ = [
+    "BlobStore",
+    "BlobStoreFetchError",
+    "FileSystemBlobStore",
+]
@@ -3,23 +3,54 @@ import json
 import time
 import uuid
 import zlib
-from typing import Any, Dict, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
+
+from tomodachi.envelope.blob_store import BlobStore, BlobStoreFetchError
 
 PROTOCOL_VERSION = "tomodachi-json-base--1.0.0"
 
 
 class JsonBase(object):
+    # Data which is still too large after compression is put in the blob store (if the envelope has one) and only a
+    # reference to the stored data is sent in the message. A blob store is set with set_blob_store() or by
+    # subclassing the envelope, for example: class LargeMessageJsonBase(JsonBase): blob_store = FileSystemBlobStore(...)
+    blob_store: Optional[BlobStore] = None
+    blob_store_threshold: int = 200000
+
+    @classmethod
+    def set_blob_store(cls, blob_store: Optional[BlobStore], threshold: Optional[int] = None) -> None:
+        # Sets the blob store (or None to stop offloading data) of the envelope and of any subclasses which
+        # haven't set their own, and optionally the size in bytes of compressed data from which it's used.
+        if blob_store is not None and not isinstance(blob_store, BlobStore):
+            raise ValueError("Bad value for blob store: {}".format(str(blob_store)))
+        if threshold is not None and (
+            not isinstance(threshold, int) or threshold is True or threshold is False or threshold < 0
+        ):
+            raise ValueError("Bad value for blob store threshold: {}".format(str(threshold)))
+
+        cls.blob_store = blob_store
+        if threshold is not None:
+            cls.blob_store_threshold = threshold
+
     @classmethod
     async def build_message(cls, service: Any, topic: str, data: Any, **kwargs: Any) -> str:
+        message_uuid = "{}.{}".format(getattr(service, "uuid", ""), str(uuid.uuid4()))
+
         data_encoding = "raw"
-        if len(json.dumps(data)) >= 60000:
-            data = base64.b64encode(zlib.compress(json.dumps(data).encode("utf-8"))).decode("utf-8")
+        json_data = json.dumps(data)
+        if len(json_data) >= 60000:
+            compressed_data = zlib.compress(json_data.encode("utf-8"))
+            data = base64.b64encode(compressed_data).decode("utf-8")
             data_encoding = "base64_gzip_json"
 
+            if cls.blob_store is not None and len(data) >= cls.blob_store_threshold:
+                data = await cls.blob_store.put(message_uuid, compressed_data)
+                data_encoding = "blob_gzip_json"
+
         message = {
             "service": {"name": getattr(service, "name", None), "uuid": getattr(service, "uuid", None)},
             "metadata": {
-                "message_uuid": "{}.{}".format(getattr(service, "uuid", ""), str(uuid.uuid4())),
+                "message_uuid": message_uuid,
                 "protocol_version": PROTOCOL_VERSION,
                 "compatible_protocol_versions": ["json_base-wip"],  # deprecated
                 "timestamp": time.time(),
@@ -42,6 +73,15 @@ class JsonBase(object):
             data = message.get("data")
         elif message.get("metadata", {}).get("data_encoding") == "base64_gzip_json":
             data = json.loads(zlib.decompress(base64.b64decode(message.get("data").encode("utf-8"))).decode("utf-8"))
+        elif message.get("metadata", {}).get("data_encoding") == "blob_gzip_json":
+            # The transport keeps the message for redelivery if the data can't be fetched, instead of discarding it.
+            if cls.blob_store is None:
+                raise BlobStoreFetchError("No blob store in message envelope", message_uuid)
+            try:
+                blob_data = await cls.blob_store.fetch(message.get("data"))
+            except Exception as e:
+                raise BlobStoreFetchError(str(e) or e.__class__.__name__, message_uuid) from e
+            data = json.loads(zlib.decompress(blob_data).decode("utf-8"))
 
         return (
             {
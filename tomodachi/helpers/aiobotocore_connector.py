@@ -2,7 +2,7 @@ import asyncio
 import inspect
 import time
 from contextlib import AsyncExitStack, asynccontextmanager
-from typing import Any, AsyncIterator, Dict, Optional, cast
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, cast
 
 import aiobotocore
 import aiobotocore.client
@@ -13,10 +13,31 @@ import aiohttp.client_exceptions
 import botocore
 import botocore.exceptions
 
+from tomodachi.helpers.circuit_breaker import CircuitBreaker, CircuitOpenError, RetryBudget
+from tomodachi.helpers.metrics import LatencyHistogram, OperationMetrics
+
 MAX_POOL_CONNECTIONS = 50
 CONNECT_TIMEOUT = 8
 READ_TIMEOUT = 35
 CLIENT_CREATION_TIME_LOCK = 45
+CLIENT_RETIRE_TIMEOUT = READ_TIMEOUT + 5
+CLIENT_POOL_SELECTIONS = ("round_robin", "least_busy")
+SERVER_ERROR_CODES = (
+    "InternalError",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "KMSThrottlingException",
+)
+TIMEOUT_EXCEPTIONS = (
+    asyncio.TimeoutError,
+    asyncio.CancelledError,
+    botocore.exceptions.ReadTimeoutError,
+    botocore.exceptions.ConnectTimeoutError,
+)
 
 
 class ClientConnector(object):
@@ -28,6 +49,19 @@ class ClientConnector(object):
         "aliases",
         "locks",
         "close_waiter",
+        "client_factories",
+        "metrics",
+        "pool_options",
+        "_pool_aliases",
+        "_round_robin",
+        "_in_use",
+        "_peak_in_use",
+        "_requests",
+        "_client_in_use",
+        "_retiring_clients",
+        "_retire_tasks",
+        "circuit_breakers",
+        "retry_budgets",
     )
 
     clients: Dict[str, Optional[aiobotocore.client.AioBaseClient]]
@@ -37,6 +71,19 @@ class ClientConnector(object):
     aliases: Dict[str, str]
     locks: Dict[str, asyncio.Lock]
     close_waiter: Optional[asyncio.Future]
+    client_factories: Dict[str, Callable[[Dict], Any]]
+    metrics: OperationMetrics
+    pool_options: Dict[str, Dict[str, Any]]
+    _pool_aliases: Dict[str, str]
+    _round_robin: Dict[str, int]
+    _in_use: Dict[str, int]
+    _peak_in_use: Dict[str, int]
+    _requests: Dict[str, int]
+    _client_in_use: Dict[int, int]
+    _retiring_clients: Dict[int, Tuple[Any, Optional[AsyncExitStack], asyncio.Future]]
+    _retire_tasks: Set[asyncio.Future]
+    circuit_breakers: Dict[str, CircuitBreaker]
+    retry_budgets: Dict[str, RetryBudget]
 
     def __init__(self) -> None:
         self.clients = {}
@@ -46,10 +93,140 @@ class ClientConnector(object):
         self.client_creation_lock_time = {}
         self.locks = {}
         self.close_waiter = None
+        self.client_factories = {}
+        self.metrics = OperationMetrics()
+        self.pool_options = {}
+        self._pool_aliases = {}
+        self._round_robin = {}
+        self._in_use = {}
+        self._peak_in_use = {}
+        self._requests = {}
+        self._client_in_use = {}
+        self._retiring_clients = {}
+        self._retire_tasks = set()
+        self.circuit_breakers = {}
+        self.retry_budgets = {}
 
     def setup_credentials(self, alias_name: str, credentials: Dict) -> None:
         self.credentials[alias_name] = credentials
 
+    def set_client_factory(self, service_name: str, client_factory: Optional[Callable[[Dict], Any]]) -> None:
+        # A client factory replaces the aiobotocore client of a service, for example with an in-memory stand-in.
+        # It's called with the credentials of the client and may return the client or an awaitable.
+        if client_factory is None:
+            self.client_factories.pop(service_name, None)
+        else:
+            self.client_factories[service_name] = client_factory
+
+    def configure_pool(
+        self,
+        alias_name: str,
+        clients: int = 1,
+        max_pool_connections: int = MAX_POOL_CONNECTIONS,
+        selection: str = "round_robin",
+        connector_args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        # An alias may use multiple clients (each with its own connection pool), which are created as additional
+        # aliases named "<alias>#<n>". Requests on the alias are spread over the clients either round-robin or to
+        # the client with the fewest requests in progress ("least_busy"). Connector args (for example "ttl_dns_cache")
+        # are passed on to the aiohttp connector of each client.
+        if not isinstance(clients, int) or clients is True or clients is False or clients < 1:
+            raise ValueError("Bad value for client pool clients: {}".format(str(clients)))
+        if (
+            not isinstance(max_pool_connections, int)
+            or max_pool_connections is True
+            or max_pool_connections is False
+            or max_pool_connections < 1
+        ):
+            raise ValueError("Bad value for client pool max_pool_connections: {}".format(str(max_pool_connections)))
+        if selection not in CLIENT_POOL_SELECTIONS:
+            raise ValueError("Bad value for client pool selection: {}".format(str(selection)))
+
+        self.pool_options[alias_name] = {
+            "clients": clients,
+            "max_pool_connections": max_pool_connections,
+            "selection": selection,
+            "connector_args": dict(connector_args) if connector_args else None,
+        }
+        for client_alias_name in self.get_client_aliases(alias_name):
+            self._pool_aliases[client_alias_name] = alias_name
+
+    def configure_retry_policy(
+        self,
+        alias_name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: float = 10.0,
+        retry_budget_max_tokens: Optional[int] = None,
+        retry_budget_ratio: float = 0.1,
+    ) -> None:
+        # The health of the endpoint of an alias (shared by the clients of its client pool) is tracked by a circuit
+        # breaker, which makes requests fail fast with CircuitOpenError after a number of failures in a row, and
+        # retries of failed requests are limited by a token-bucket retry budget (see can_retry). Either is disabled
+        # when set to None.
+        self.circuit_breakers.pop(alias_name, None)
+        self.retry_budgets.pop(alias_name, None)
+        if failure_threshold is not None:
+            self.circuit_breakers[alias_name] = CircuitBreaker(failure_threshold, reset_timeout)
+        if retry_budget_max_tokens is not None:
+            self.retry_budgets[alias_name] = RetryBudget(retry_budget_max_tokens, retry_budget_ratio)
+
+    def can_retry(self, alias_name: str) -> bool:
+        # Returns whether a failed request on the alias may be retried, which takes a token from its retry budget.
+        # Requests aren't retried while the circuit of the endpoint is open.
+        alias_name = self._pool_aliases.get(alias_name, alias_name)
+        circuit_breaker = self.circuit_breakers.get(alias_name)
+        if circuit_breaker and circuit_breaker.retry_after:
+            return False
+        retry_budget = self.retry_budgets.get(alias_name)
+        if retry_budget and not retry_budget.try_acquire():
+            return False
+        return True
+
+    def record_success(self, alias_name: str) -> None:
+        circuit_breaker = self.circuit_breakers.get(alias_name)
+        if circuit_breaker:
+            circuit_breaker.record_success()
+        retry_budget = self.retry_budgets.get(alias_name)
+        if retry_budget:
+            retry_budget.record_success()
+
+    def record_failure(self, alias_name: str) -> None:
+        circuit_breaker = self.circuit_breakers.get(alias_name)
+        if circuit_breaker:
+            circuit_breaker.record_failure()
+
+    def get_client_aliases(self, alias_name: str) -> List[str]:
+        clients = self.pool_options.get(alias_name, {}).get("clients", 1)
+        return [alias_name] + ["{}#{}".format(alias_name, i) for i in range(1, clients)]
+
+    def select_client_alias(self, alias_name: str) -> str:
+        client_aliases = self.get_client_aliases(alias_name)
+        if len(client_aliases) == 1:
+            return alias_name
+
+        if self.pool_options[alias_name]["selection"] == "least_busy":
+            return min(client_aliases, key=lambda k: self._in_use.get(k, 0))
+
+        idx = self._round_robin.get(alias_name, 0) % len(client_aliases)
+        self._round_robin[alias_name] = idx + 1
+        return client_aliases[idx]
+
+    def get_pool_stats(self, alias_name: str) -> List[Dict[str, Any]]:
+        # Utilization is the share of the connection pool of each client that is used by requests in progress.
+        max_pool_connections = self.pool_options.get(alias_name, {}).get("max_pool_connections", MAX_POOL_CONNECTIONS)
+        return [
+            {
+                "alias": client_alias_name,
+                "connected": self.get_client(client_alias_name) is not None,
+                "in_use": self._in_use.get(client_alias_name, 0),
+                "peak_in_use": self._peak_in_use.get(client_alias_name, 0),
+                "requests": self._requests.get(client_alias_name, 0),
+                "max_pool_connections": max_pool_connections,
+                "utilization": self._in_use.get(client_alias_name, 0) / max_pool_connections,
+            }
+            for client_alias_name in self.get_client_aliases(alias_name)
+        ]
+
     def get_client(self, alias_name: str) -> Optional[aiobotocore.client.AioBaseClient]:
         return self.clients.get(alias_name)
 
@@ -85,12 +262,14 @@ class ClientConnector(object):
         async with self.get_lock(alias_name):
             client = self.get_client(alias_name)
             if self.client_creation_lock_time.get(alias_name, 0) + CLIENT_CREATION_TIME_LOCK > time.time():
-                if client:
+                # Clients are recreated at most once per time lock, unless they're recreated with new credentials.
+                if client and (not credentials or credentials == self.credentials.get(alias_name)):
                     return client
             self.client_creation_lock_time[alias_name] = time.time() if client else 0
 
+            pool_alias_name = self._pool_aliases.get(alias_name, alias_name)
             if not credentials:
-                credentials = self.credentials.get(alias_name, {})
+                credentials = self.credentials.get(alias_name) or self.credentials.get(pool_alias_name, {})
             else:
                 self.credentials[alias_name] = credentials
             if not credentials:
@@ -98,35 +277,159 @@ class ClientConnector(object):
 
             self.aliases[alias_name] = service_name
 
-            session = aiobotocore.session.get_session()
-            config = aiobotocore.config.AioConfig(
-                connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, max_pool_connections=MAX_POOL_CONNECTIONS
-            )
             context_stack = AsyncExitStack()
-            client_value = context_stack.enter_async_context(
-                session.create_client(service_name, config=config, **credentials)
-            )
+            client_factory = self.client_factories.get(service_name)
+            if client_factory:
+                client_value = client_factory(credentials)
+            else:
+                session = aiobotocore.session.get_session()
+                pool_options = self.pool_options.get(pool_alias_name, {})
+                config_kwargs: Dict[str, Any] = {}
+                if pool_options.get("connector_args"):
+                    config_kwargs["connector_args"] = pool_options["connector_args"]
+                config = aiobotocore.config.AioConfig(
+                    connect_timeout=CONNECT_TIMEOUT,
+                    read_timeout=READ_TIMEOUT,
+                    max_pool_connections=pool_options.get("max_pool_connections", MAX_POOL_CONNECTIONS),
+                    **config_kwargs,
+                )
+                client_value = context_stack.enter_async_context(
+                    session.create_client(service_name, config=config, **credentials)
+                )
             if inspect.isawaitable(client_value):
                 client = await client_value
             else:
                 client = client_value
+            self.instrument_client(client, service_name)
 
+            # The new client is switched in right away, while the old client is closed in the background once the
+            # requests that are still using it have finished, so that other requests don't have to wait for it.
             old_client = self.get_client(alias_name)
+            old_context_stack = self._clients_context.get(alias_name)
             self.clients[alias_name] = cast(aiobotocore.client.AioBaseClient, client)
             self._clients_context[alias_name] = context_stack
 
-            if old_client:
-                try:
-                    await asyncio.sleep(1)
-                    task = old_client.close()
-                    if getattr(task, "_coro", None):
-                        task = getattr(task, "_coro")
-                    await asyncio.wait([asyncio.ensure_future(task)], timeout=3)
-                    await asyncio.sleep(0.25)  # SSL termination sleep
-                except (Exception, RuntimeError, asyncio.CancelledError, BaseException):
-                    pass
+            if old_client and old_client is not client:
+                self.retire_client(old_client, old_context_stack)
+
+            return cast(aiobotocore.client.AioBaseClient, client)
+
+    async def warm_up(
+        self,
+        alias_name: str,
+        service_name: str,
+        request: Callable[[Any], Awaitable],
+        connections: int = 1,
+    ) -> None:
+        # Creates the clients of the alias (including the clients of its client pool) and makes a number of concurrent
+        # requests with each of them. Every concurrent request opens a connection to the endpoint (with DNS lookup
+        # and TLS handshake), which is kept in the connection pool of the client to be reused by later requests.
+        if not isinstance(connections, int) or connections is True or connections is False or connections < 1:
+            raise ValueError("Bad value for warm-up connections: {}".format(str(connections)))
+
+        for client_alias_name in self.get_client_aliases(alias_name):
+            client = self.get_client(client_alias_name)
+            if not client:
+                client = await self.create_client(client_alias_name, service_name=service_name)
+            await asyncio.gather(*[request(client) for _ in range(connections)])
+
+    def instrument_client(self, client: Any, service_name: str) -> None:
+        # Records the latency, retries, errors and timeouts of every API call made with the client in the metrics of
+        # the connector. All client methods call _make_api_call with the operation name, so it's wrapped once per
+        # client. Calls cancelled by asyncio.wait_for() are counted as timeouts. Clients from client factories without
+        # _make_api_call aren't instrumented.
+        make_api_call = getattr(client, "_make_api_call", None)
+        if not make_api_call or getattr(make_api_call, "__tomodachi_instrumented__", False):
+            return
+
+        metrics = self.metrics
+        perf_counter = time.perf_counter
+        histograms: Dict[str, LatencyHistogram] = {}
+
+        def _get_histogram(operation_name: str) -> LatencyHistogram:
+            # Operations are recorded by the name of the client method, for example "receive_message".
+            histogram = histograms.get(operation_name)
+            if histogram is None:
+                histogram = histograms[operation_name] = metrics.get_histogram(
+                    service_name, botocore.xform_name(operation_name)
+                )
+            return histogram
+
+        async def _make_api_call(operation_name: str, api_params: Dict) -> Any:
+            start_time = perf_counter()
+            try:
+                response = await make_api_call(operation_name, api_params)
+            except TIMEOUT_EXCEPTIONS:
+                _get_histogram(operation_name).record(perf_counter() - start_time, timeout=True)
+                raise
+            except botocore.exceptions.ClientError as e:
+                metadata = e.response.get("ResponseMetadata") if isinstance(e.response, dict) else None
+                _get_histogram(operation_name).record(
+                    perf_counter() - start_time, retries=metadata.get("RetryAttempts", 0) if metadata else 0, error=True
+                )
+                raise
+            except Exception:
+                _get_histogram(operation_name).record(perf_counter() - start_time, error=True)
+                raise
+
+            metadata = response.get("ResponseMetadata") if isinstance(response, dict) else None
+            _get_histogram(operation_name).record(
+                perf_counter() - start_time, retries=metadata.get("RetryAttempts", 0) if metadata else 0
+            )
+            return response
+
+        setattr(_make_api_call, "__tomodachi_instrumented__", True)
+        setattr(client, "_make_api_call", _make_api_call)
 
-            return cast(aiobotocore.client.AioBaseClient, self.clients.get(alias_name) or client)
+    def retire_client(self, client: Any, context_stack: Optional[AsyncExitStack] = None) -> None:
+        client_id = id(client)
+        if client_id in self._retiring_clients:
+            return
+
+        drained: asyncio.Future = asyncio.get_event_loop().create_future()
+        if not self._client_in_use.get(client_id):
+            drained.set_result(None)
+        self._retiring_clients[client_id] = (client, context_stack, drained)
+
+        task = asyncio.ensure_future(self._close_retired_client(client_id))
+        self._retire_tasks.add(task)
+        task.add_done_callback(self._retire_tasks.discard)
+
+    async def _close_retired_client(self, client_id: int) -> None:
+        client, context_stack, drained = self._retiring_clients[client_id]
+        try:
+            # Requests that are still in progress after the timeout (longer than the read timeout) are assumed to hang.
+            await asyncio.wait([drained], timeout=CLIENT_RETIRE_TIMEOUT)
+            await self._close_client_instance(client, context_stack)
+        finally:
+            self._retiring_clients.pop(client_id, None)
+
+    async def _close_client_instance(
+        self, client: Any, context_stack: Optional[AsyncExitStack] = None, fast: bool = False
+    ) -> None:
+        try:
+            task = client.close()
+            if getattr(task, "_coro", None):
+                task = getattr(task, "_coro")
+            tasks = [asyncio.ensure_future(task)]
+            if context_stack:
+                tasks.append(asyncio.ensure_future(context_stack.aclose()))
+            await asyncio.wait(tasks, timeout=3)
+            if not fast:
+                await asyncio.sleep(0.25)  # SSL termination sleep
+            else:
+                await asyncio.sleep(0)
+        except (Exception, RuntimeError, asyncio.CancelledError, BaseException):
+            pass
+
+    async def refresh_credentials(self, alias_name: str, credentials: Dict) -> None:
+        # Swaps the clients of an alias (and of its client pool) for clients using the new credentials, the same way
+        # as clients are recreated after connection errors. Clients that haven't been created yet will use them.
+        for client_alias_name in self.get_client_aliases(alias_name):
+            service_name = self.aliases.get(client_alias_name)
+            if self.get_client(client_alias_name) and service_name:
+                await self.create_client(client_alias_name, credentials=credentials, service_name=service_name)
+        self.credentials[alias_name] = credentials
 
     async def close_client(
         self,
@@ -196,14 +499,20 @@ class ClientConnector(object):
             return
 
         clients = self.clients
+        retiring_clients = list(self._retiring_clients.values())
 
         self.clients = {}
         self.credentials = {}
         self.aliases = {}
         self.client_creation_lock_time = {}
         self.locks = {}
+        self._retiring_clients = {}
+
+        # Retired clients are closed right away together with the other clients, instead of waiting for them to drain.
+        for task in list(self._retire_tasks):
+            task.cancel()
 
-        if not clients:
+        if not clients and not retiring_clients:
             return
 
         self.close_waiter = asyncio.Future()
@@ -221,6 +530,8 @@ class ClientConnector(object):
                 tasks.append(asyncio.ensure_future(task))
             except (Exception, RuntimeError, asyncio.CancelledError, BaseException):
                 pass
+        for client, context_stack, _ in retiring_clients:
+            tasks.append(asyncio.ensure_future(self._close_client_instance(client, context_stack, fast=True)))
 
         try:
             await asyncio.wait(tasks, timeout=3)
@@ -236,7 +547,11 @@ class ClientConnector(object):
 
     @asynccontextmanager
     async def __call__(
-        self, alias_name: Optional[str] = None, credentials: Optional[Dict] = None, service_name: Optional[str] = None
+        self,
+        alias_name: Optional[str] = None,
+        credentials: Optional[Dict] = None,
+        service_name: Optional[str] = None,
+        long_poll: bool = False,
     ) -> AsyncIterator[Any]:
         exc_iteration_count = 0
         while self.close_waiter and not self.close_waiter.done():
@@ -249,10 +564,28 @@ class ClientConnector(object):
                 await asyncio.sleep(0.1)
 
         client_name = alias_name or service_name or ""
+        endpoint_name = client_name
+        circuit_breaker = self.circuit_breakers.get(endpoint_name)
+        if circuit_breaker and not circuit_breaker.allow():
+            raise CircuitOpenError(
+                "Circuit open for {} - failing fast after repeated failures".format(endpoint_name),
+                retry_after=circuit_breaker.retry_after,
+            )
+
+        if client_name in self.pool_options:
+            client_name = self.select_client_alias(client_name)
 
         if not self.get_client(client_name):
-            await self.create_client(alias_name, credentials, service_name)
+            await self.create_client(client_name, credentials, service_name or self.aliases.get(alias_name or ""))
         client = self.get_client(client_name)
+        client_id = id(client)
+        self._client_in_use[client_id] = self._client_in_use.get(client_id, 0) + 1
+
+        in_use = self._in_use.get(client_name, 0) + 1
+        self._in_use[client_name] = in_use
+        self._requests[client_name] = self._requests.get(client_name, 0) + 1
+        if in_use > self._peak_in_use.get(client_name, 0):
+            self._peak_in_use[client_name] = in_use
 
         try:
             yield client
@@ -264,13 +597,47 @@ class ClientConnector(object):
             await self.close_client(client=client, fast=True)
             raise
         except (aiohttp.client_exceptions.ServerDisconnectedError, asyncio.TimeoutError, RuntimeError):
+            # Long-polling requests (such as receiving messages from a queue) are expected to time out or be
+            # disconnected now and then, which isn't counted as a failure of the endpoint.
+            if not long_poll:
+                self.record_failure(endpoint_name)
             await self.reconnect_client(client_name, client=client)
             raise
+        except (
+            aiohttp.client_exceptions.ClientConnectorError,
+            botocore.exceptions.HTTPClientError,
+            botocore.exceptions.ConnectionError,
+        ):
+            if not long_poll:
+                self.record_failure(endpoint_name)
+            raise
         except botocore.exceptions.ClientError as e:
             error_message = str(e)
             if "The security token included in the request is invalid" in error_message:
                 await self.close_client(client=client, fast=True)
+
+            # Errors from the client side (such as a queue that doesn't exist) still mean that the endpoint is healthy.
+            response = e.response if isinstance(e.response, dict) else {}
+            if (
+                response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+                or response.get("Error", {}).get("Code") in SERVER_ERROR_CODES
+            ):
+                self.record_failure(endpoint_name)
+            else:
+                self.record_success(endpoint_name)
             raise
+        else:
+            self.record_success(endpoint_name)
+        finally:
+            self._in_use[client_name] = max(self._in_use.get(client_name, 1) - 1, 0)
+            client_in_use = self._client_in_use.get(client_id, 1) - 1
+            if client_in_use > 0:
+                self._client_in_use[client_id] = client_in_use
+            else:
+                self._client_in_use.pop(client_id, None)
+                retiring = self._retiring_clients.get(client_id)
+                if retiring and not retiring[2].done():
+                    retiring[2].set_result(None)
 
 
 connector: ClientConnector = ClientConnector()
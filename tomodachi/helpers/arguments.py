@@ -0,0 +1,149 @@
+import inspect
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from tomodachi.helpers.dict import merge_dicts
+
+
+class ArgumentBinding(object):
+    # Resolves how a message handler should be called once, when the handler is decorated, so that each received
+    # message only needs one dict of keyword arguments to be built and one call to be made. Keyword arguments are
+    # the argument names of the function (or the explicitly listed callback_kwargs), populated from the message
+    # (if it's a dict and the handler uses a message envelope) or from the transport provided values.
+
+    __slots__ = (
+        "func",
+        "enveloped",
+        "defaults",
+        "has_args",
+        "positional_count",
+        "_context_names",
+        "_message_keyword",
+        "_keyword_defaults",
+        "_invoke",
+    )
+
+    func: Callable
+    enveloped: bool
+    defaults: Dict[str, Any]
+    has_args: bool
+    positional_count: int
+    _context_names: Tuple[Tuple[str, int], ...]
+    _message_keyword: bool
+    _keyword_defaults: Dict[str, Any]
+    _invoke: Callable
+
+    def __init__(
+        self,
+        func: Callable,
+        callback_kwargs: Optional[Iterable[str]] = None,
+        enveloped: bool = True,
+        context_names: Tuple[str, ...] = (),
+    ) -> None:
+        values = inspect.getfullargspec(func)
+        if not callback_kwargs:
+            defaults: Dict[str, Any] = (
+                {
+                    k: (
+                        values.defaults[i - len(values.args) + 1]
+                        if values.defaults and i >= len(values.args) - len(values.defaults) - 1
+                        else None
+                    )
+                    for i, k in enumerate(values.args[1:])
+                }
+                if values.args and len(values.args) > 1
+                else {}
+            )
+        else:
+            defaults = {k: None for k in callback_kwargs if k != "self"}
+
+        self.func = func
+        self.enveloped = enveloped
+        self.defaults = defaults
+        self.has_args = len(values.args[1:]) > 0
+        self.positional_count = len(values.args[2:])
+
+        # Without an envelope the message is passed as the first positional argument, which is therefore never
+        # passed as a keyword argument.
+        message_arg = values.args[1] if not enveloped and self.has_args else None
+        self._context_names = tuple(
+            (name, i) for i, name in enumerate(context_names) if name in defaults and name != message_arg
+        )
+        self._message_keyword = "message" in defaults and message_arg != "message"
+        self._keyword_defaults = {k: v for k, v in defaults.items() if k != message_arg}
+
+        if enveloped:
+            if defaults:
+                self._invoke = self._invoke_kwargs
+            elif self.has_args:
+                self._invoke = self._invoke_message
+            else:
+                self._invoke = self._invoke_empty
+        elif self.has_args and not self.positional_count:
+            self._invoke = self._invoke_message
+        elif self.has_args and self._keyword_defaults:
+            self._invoke = self._invoke_message_kwargs
+        elif self._keyword_defaults:
+            self._invoke = self._invoke_kwargs
+        elif self.has_args:
+            self._invoke = self._invoke_message
+        else:
+            self._invoke = self._invoke_empty
+
+    def kwargs(self, message: Any, *context_values: Any) -> Dict[str, Any]:
+        # The context values are given in the same order as the context names the binding was created with.
+        kwargs = dict(self._keyword_defaults)
+        if not kwargs:
+            return kwargs
+
+        if self.enveloped and isinstance(message, dict):
+            for k in self.defaults:
+                if k in message:
+                    kwargs[k] = message[k]
+            if self._message_keyword and "message" not in message:
+                kwargs["message"] = message
+            for name, i in self._context_names:
+                if name not in message:
+                    kwargs[name] = context_values[i]
+        else:
+            if self._message_keyword:
+                kwargs["message"] = message
+            for name, i in self._context_names:
+                kwargs[name] = context_values[i]
+
+        return kwargs
+
+    def _invoke_kwargs(self, obj: Any, message: Any, kwargs: Dict) -> Any:
+        return self.func(obj, **kwargs)
+
+    def _invoke_message(self, obj: Any, message: Any, kwargs: Dict) -> Any:
+        return self.func(obj, message)
+
+    def _invoke_message_kwargs(self, obj: Any, message: Any, kwargs: Dict) -> Any:
+        return self.func(obj, message, **kwargs)
+
+    def _invoke_empty(self, obj: Any, message: Any, kwargs: Dict) -> Any:
+        return self.func(obj)
+
+    def _invoke_with(self, obj: Any, message: Any, kwargs: Dict, a: Tuple, kw: Dict) -> Any:
+        # Middlewares may pass on additional arguments, which are merged with the arguments built for the message.
+        enveloped = self.enveloped
+        if not enveloped and self.has_args and self.positional_count == len(a):
+            return self.func(*(obj, message, *a))
+        merged_kwargs = merge_dicts(kwargs, kw)
+        if not enveloped and self.has_args and len(merged_kwargs):
+            return self.func(*(obj, message, *a), **merged_kwargs)
+        if len(merged_kwargs):
+            return self.func(*(obj, *a), **merged_kwargs)
+        if self.has_args:
+            return self.func(*(obj, message, *a), **kw)
+        return self.func(*(obj, *a), **kw)
+
+    async def call(self, obj: Any, message: Any, kwargs: Dict, a: Tuple = (), kw: Optional[Dict] = None) -> Any:
+        if not a and not kw:
+            routine = self._invoke(obj, message, kwargs)
+        else:
+            routine = self._invoke_with(obj, message, kwargs, a, kw or {})
+
+        if inspect.isawaitable(routine):
+            return await routine
+        return routine
@@ -0,0 +1,46 @@
+from typing import Union
+
+
+class EmptyReceiveBackoff(object):
+    __slots__ = ("threshold", "initial_delay", "max_delay", "empty_receives", "delay")
+
+    threshold: int
+    initial_delay: float
+    max_delay: float
+    empty_receives: int
+    delay: float
+
+    def __init__(
+        self, max_delay: Union[int, float], threshold: int = 3, initial_delay: Union[int, float] = 1.0
+    ) -> None:
+        if not isinstance(max_delay, (int, float)) or max_delay is True or max_delay is False or max_delay <= 0:
+            raise ValueError("Bad value for empty receive backoff max delay: {}".format(str(max_delay)))
+        if not isinstance(threshold, int) or threshold is True or threshold is False or threshold < 1:
+            raise ValueError("Bad value for empty receive backoff threshold: {}".format(str(threshold)))
+        if (
+            not isinstance(initial_delay, (int, float))
+            or initial_delay is True
+            or initial_delay is False
+            or initial_delay <= 0
+        ):
+            raise ValueError("Bad value for empty receive backoff initial delay: {}".format(str(initial_delay)))
+
+        self.threshold = threshold
+        self.initial_delay = float(min(initial_delay, max_delay))
+        self.max_delay = float(max_delay)
+        self.empty_receives = 0
+        self.delay = 0.0
+
+    def record(self, message_count: int) -> float:
+        # Returns the delay to wait before the next receive. Once a queue has been empty for a number of receives in
+        # a row, the delay starts at the initial delay and is doubled for every further empty receive (up to the max
+        # delay), while any received message resets the delay so that the queue is polled continuously again.
+        if message_count:
+            self.empty_receives = 0
+            self.delay = 0.0
+            return self.delay
+
+        self.empty_receives += 1
+        if self.empty_receives >= self.threshold:
+            self.delay = min(self.delay * 2, self.max_delay) if self.delay else self.initial_delay
+        return self.delay
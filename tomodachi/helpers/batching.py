@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BatchFlushFunction = Callable[[List[T]], Awaitable[Sequence[Union[R, BaseException]]]]
+
+
+class BatchAccumulator(Generic[T, R]):
+    __slots__ = ("flush_func", "max_size", "max_wait", "_items", "_timer", "_tasks")
+
+    flush_func: BatchFlushFunction
+    max_size: int
+    max_wait: float
+    _items: List[Tuple[T, asyncio.Future]]
+    _timer: Optional[asyncio.TimerHandle]
+    _tasks: Set[asyncio.Future]
+
+    def __init__(self, flush_func: BatchFlushFunction, max_size: int = 10, max_wait: float = 0.1) -> None:
+        self.flush_func = flush_func
+        self.max_size = max(int(max_size), 1)
+        self.max_wait = max(float(max_wait), 0.0)
+        self._items = []
+        self._timer = None
+        self._tasks = set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def pending(self) -> int:
+        return len(self._items) + len(self._tasks)
+
+    def add(self, item: T) -> asyncio.Future:
+        loop = asyncio.get_event_loop()
+        future: asyncio.Future = loop.create_future()
+        self._items.append((item, future))
+
+        if len(self._items) >= self.max_size:
+            self._flush_items()
+        elif not self._timer:
+            self._timer = loop.call_later(self.max_wait, self._flush_items)
+
+        return future
+
+    def _flush_items(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._items:
+            items, self._items = self._items[: self.max_size], self._items[self.max_size :]
+            task = asyncio.ensure_future(self._flush(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, items: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results: Sequence[Any] = await self.flush_func([item for item, _ in items])
+            if len(results) != len(items):
+                raise Exception("Batch flush function returned an unexpected number of results")
+        except (Exception, asyncio.CancelledError) as e:
+            results = [e] * len(items)
+
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def flush(self) -> None:
+        self._flush_items()
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
@@ -0,0 +1,116 @@
+import time
+from typing import Union
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, message: str, retry_after: float = 0.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker(object):
+    __slots__ = ("failure_threshold", "reset_timeout", "failures", "state", "opened_at")
+
+    failure_threshold: int
+    reset_timeout: float
+    failures: int
+    state: str
+    opened_at: float
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: Union[int, float] = 10.0) -> None:
+        if (
+            not isinstance(failure_threshold, int)
+            or failure_threshold is True
+            or failure_threshold is False
+            or failure_threshold < 1
+        ):
+            raise ValueError("Bad value for circuit breaker failure threshold: {}".format(str(failure_threshold)))
+        if (
+            not isinstance(reset_timeout, (int, float))
+            or reset_timeout is True
+            or reset_timeout is False
+            or reset_timeout <= 0
+        ):
+            raise ValueError("Bad value for circuit breaker reset timeout: {}".format(str(reset_timeout)))
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = float(reset_timeout)
+        self.failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+
+    @property
+    def retry_after(self) -> float:
+        if self.state == CIRCUIT_CLOSED:
+            return 0.0
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        # The circuit is opened after a number of failures in a row, after which requests fail fast until the reset
+        # timeout has passed. A single request is then let through as a probe (half-open) - if it succeeds the circuit
+        # is closed again, otherwise it stays open for another reset timeout. Another probe is let through after each
+        # reset timeout, in case the outcome of a probe is never recorded.
+        if self.state == CIRCUIT_CLOSED:
+            return True
+
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            self.state = CIRCUIT_HALF_OPEN
+            self.opened_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = CIRCUIT_CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+
+class RetryBudget(object):
+    __slots__ = ("max_tokens", "token_ratio", "tokens")
+
+    max_tokens: float
+    token_ratio: float
+    tokens: float
+
+    def __init__(self, max_tokens: Union[int, float] = 10, token_ratio: Union[int, float] = 0.1) -> None:
+        if not isinstance(max_tokens, (int, float)) or max_tokens is True or max_tokens is False or max_tokens < 1:
+            raise ValueError("Bad value for retry budget max tokens: {}".format(str(max_tokens)))
+        if not isinstance(token_ratio, (int, float)) or token_ratio is True or token_ratio is False or token_ratio <= 0:
+            raise ValueError("Bad value for retry budget token ratio: {}".format(str(token_ratio)))
+
+        self.max_tokens = float(max_tokens)
+        self.token_ratio = float(token_ratio)
+        self.tokens = self.max_tokens
+
+    def record_success(self) -> None:
+        # Every successful request adds a part of a token, so that retries are limited to a share of the requests
+        # (with the default ratio of 0.1, one retry per ten successful requests) once the initial tokens are spent.
+        if self.tokens < self.max_tokens:
+            self.tokens = min(self.tokens + self.token_ratio, self.max_tokens)
+
+    def try_acquire(self) -> bool:
+        # Every retry takes a token. Retries aren't made when the budget has run out.
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+__all__ = [
+    "CIRCUIT_CLOSED",
+    "CIRCUIT_HALF_OPEN",
+    "CIRCUIT_OPEN",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryBudget",
+]
@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class DeduplicationCache(object):
+    __slots__ = ("max_size", "ttl", "_entries")
+
+    max_size: int
+    ttl: Optional[float]
+    _entries: "OrderedDict[Hashable, float]"
+
+    def __init__(self, max_size: int = 100000, ttl: Optional[float] = None) -> None:
+        if not isinstance(max_size, int) or max_size is True or max_size is False or max_size < 1:
+            raise ValueError("Bad value for deduplication cache max size: {}".format(str(max_size)))
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl is True or ttl is False or ttl <= 0):
+            raise ValueError("Bad value for deduplication cache ttl: {}".format(str(ttl)))
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        added_at = self._entries.get(key)
+        if added_at is None:
+            return False
+        if self.ttl is not None and added_at <= time.monotonic() - self.ttl:
+            self._expire()
+            return False
+        return True
+
+    def add(self, key: Hashable) -> bool:
+        # Returns False if the key was already seen (and hasn't expired), otherwise adds the key and returns True.
+        if key in self:
+            return False
+
+        self._entries[key] = time.monotonic()
+        self._expire()
+        return True
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _expire(self) -> None:
+        # Entries are kept in insertion order, so expired entries and entries above the size limit are always
+        # found at the front - each entry is removed at most once, which keeps the cost amortized O(1) per add.
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        if self.ttl is not None:
+            expires_before = time.monotonic() - self.ttl
+            while self._entries:
+                key, added_at = next(iter(self._entries.items()))
+                if added_at > expires_before:
+                    break
+                del self._entries[key]
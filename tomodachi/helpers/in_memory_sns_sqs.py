@@ -0,0 +1,952 @@
+import asyncio
+import base64
+import bisect
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import botocore.exceptions
+
+from tomodachi.helpers.aiobotocore_connector import ClientConnector
+
+DEFAULT_REGION_NAME = "eu-west-1"
+DEFAULT_ACCOUNT_ID = "123456789012"
+DEFAULT_VISIBILITY_TIMEOUT = 30
+LIST_TOPICS_PAGE_SIZE = 100
+DEDUPLICATION_INTERVAL = 300
+
+
+def client_error(code: str, message: str, operation_name: str) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError({"Error": {"Code": code, "Message": message}}, operation_name)
+
+
+class InMemoryMessage(object):
+    __slots__ = (
+        "message_id",
+        "sequence_number",
+        "body",
+        "message_attributes",
+        "message_group_id",
+        "deduplication_id",
+        "sent_timestamp",
+        "receive_count",
+        "receipt_handle",
+        "visible_at",
+    )
+
+    message_id: str
+    sequence_number: int
+    body: str
+    message_attributes: Dict[str, Dict[str, Any]]
+    message_group_id: Optional[str]
+    deduplication_id: Optional[str]
+    sent_timestamp: int
+    receive_count: int
+    receipt_handle: Optional[str]
+    visible_at: float
+
+    def __init__(
+        self,
+        sequence_number: int,
+        body: str,
+        message_attributes: Optional[Dict[str, Dict[str, Any]]] = None,
+        message_group_id: Optional[str] = None,
+        deduplication_id: Optional[str] = None,
+    ) -> None:
+        self.message_id = str(uuid.uuid4())
+        self.sequence_number = sequence_number
+        self.body = body
+        self.message_attributes = message_attributes or {}
+        self.message_group_id = message_group_id
+        self.deduplication_id = deduplication_id
+        self.sent_timestamp = int(time.time() * 1000)
+        self.receive_count = 0
+        self.receipt_handle = None
+        self.visible_at = 0.0
+
+
+class InMemoryQueue(object):
+    __slots__ = (
+        "name",
+        "url",
+        "arn",
+        "attributes",
+        "fifo",
+        "_messages",
+        "_message_groups",
+        "_in_flight",
+        "_in_flight_groups",
+        "_visibility_heap",
+        "_deduplication_ids",
+        "_waiters",
+    )
+
+    name: str
+    url: str
+    arn: str
+    attributes: Dict[str, str]
+    fifo: bool
+    _messages: Deque[InMemoryMessage]
+    _message_groups: "OrderedDict[str, List[Tuple[int, InMemoryMessage]]]"
+    _in_flight: Dict[str, InMemoryMessage]
+    _in_flight_groups: Dict[str, int]
+    _visibility_heap: List[Tuple[float, int, str]]
+    _deduplication_ids: "OrderedDict[str, float]"
+    _waiters: List[asyncio.Future]
+
+    def __init__(self, name: str, url: str, arn: str, attributes: Dict[str, str]) -> None:
+        self.name = name
+        self.url = url
+        self.arn = arn
+        self.attributes = attributes
+        self.fifo = name.endswith(".fifo")
+        self._messages = deque()
+        self._message_groups = OrderedDict()
+        self._in_flight = {}
+        self._in_flight_groups = {}
+        self._visibility_heap = []
+        self._deduplication_ids = OrderedDict()
+        self._waiters = []
+
+    @property
+    def visibility_timeout(self) -> int:
+        return int(self.attributes.get("VisibilityTimeout") or DEFAULT_VISIBILITY_TIMEOUT)
+
+    @property
+    def approximate_number_of_messages(self) -> int:
+        return len(self._messages) + sum([len(messages) for messages in self._message_groups.values()])
+
+    @property
+    def approximate_number_of_messages_not_visible(self) -> int:
+        return len(self._in_flight)
+
+    def is_duplicate(self, deduplication_id: Optional[str]) -> bool:
+        if not self.fifo or not deduplication_id:
+            return False
+
+        now = time.monotonic()
+        while self._deduplication_ids:
+            key, expires_at = next(iter(self._deduplication_ids.items()))
+            if expires_at > now:
+                break
+            del self._deduplication_ids[key]
+
+        if deduplication_id in self._deduplication_ids:
+            return True
+        self._deduplication_ids[deduplication_id] = now + DEDUPLICATION_INTERVAL
+        return False
+
+    def put(self, message: InMemoryMessage) -> None:
+        if self.fifo:
+            group = self._message_groups.setdefault(message.message_group_id or "", [])
+            bisect.insort(group, (message.sequence_number, message))
+        else:
+            self._messages.append(message)
+        self.notify()
+
+    def notify(self) -> None:
+        waiters = self._waiters
+        self._waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def add_waiter(self, waiter: asyncio.Future) -> None:
+        self._waiters.append(waiter)
+
+    def remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def next_visible_at(self) -> Optional[float]:
+        return self._visibility_heap[0][0] if self._visibility_heap else None
+
+    def _release(self, message: InMemoryMessage) -> None:
+        if message.receipt_handle:
+            self._in_flight.pop(message.receipt_handle, None)
+        message.receipt_handle = None
+        if self.fifo:
+            group_id = message.message_group_id or ""
+            self._in_flight_groups[group_id] -= 1
+            if not self._in_flight_groups[group_id]:
+                del self._in_flight_groups[group_id]
+
+    def requeue_expired(self) -> None:
+        now = time.monotonic()
+        expired: List[InMemoryMessage] = []
+        while self._visibility_heap and self._visibility_heap[0][0] <= now:
+            visible_at, _, receipt_handle = heapq.heappop(self._visibility_heap)
+            message = self._in_flight.get(receipt_handle)
+            if message is None or message.visible_at != visible_at:
+                continue
+            self._release(message)
+            expired.append(message)
+
+        # Messages that become visible again are put back at the front of the queue (FIFO queues keep them in
+        # order of their sequence number within their message group).
+        for message in sorted(expired, key=lambda m: m.sequence_number, reverse=True):
+            if self.fifo:
+                group = self._message_groups.setdefault(message.message_group_id or "", [])
+                bisect.insort(group, (message.sequence_number, message))
+            else:
+                self._messages.appendleft(message)
+
+    def _take(self, max_number_of_messages: int) -> List[InMemoryMessage]:
+        messages: List[InMemoryMessage] = []
+        if not self.fifo:
+            while self._messages and len(messages) < max_number_of_messages:
+                messages.append(self._messages.popleft())
+            return messages
+
+        # Messages of a FIFO message group are only received while no other message of the group is in-flight,
+        # and in the order they were sent.
+        for group_id in list(self._message_groups.keys()):
+            if len(messages) >= max_number_of_messages:
+                break
+            if self._in_flight_groups.get(group_id):
+                continue
+            group = self._message_groups[group_id]
+            count = min(max_number_of_messages - len(messages), len(group))
+            messages.extend([message for _, message in group[:count]])
+            del group[:count]
+            if not group:
+                del self._message_groups[group_id]
+        return messages
+
+    def receive(
+        self, max_number_of_messages: int, visibility_timeout: int, dead_letter_queue: Optional["InMemoryQueue"]
+    ) -> List[InMemoryMessage]:
+        self.requeue_expired()
+
+        max_receive_count = 0
+        redrive_policy = json.loads(self.attributes.get("RedrivePolicy") or "{}")
+        if redrive_policy and dead_letter_queue:
+            max_receive_count = int(redrive_policy.get("maxReceiveCount") or 0)
+
+        received: List[InMemoryMessage] = []
+        while len(received) < max_number_of_messages:
+            messages = self._take(max_number_of_messages - len(received))
+            if not messages:
+                break
+
+            now = time.monotonic()
+            for message in messages:
+                if max_receive_count and dead_letter_queue and message.receive_count >= max_receive_count:
+                    message.receive_count = 0
+                    dead_letter_queue.put(message)
+                    continue
+
+                message.receive_count += 1
+                message.receipt_handle = "{}#{}".format(message.message_id, uuid.uuid4())
+                message.visible_at = now + visibility_timeout
+                self._in_flight[message.receipt_handle] = message
+                if self.fifo:
+                    group_id = message.message_group_id or ""
+                    self._in_flight_groups[group_id] = self._in_flight_groups.get(group_id, 0) + 1
+                heapq.heappush(
+                    self._visibility_heap, (message.visible_at, message.sequence_number, message.receipt_handle)
+                )
+                received.append(message)
+
+            if self.fifo:
+                break
+
+        return received
+
+    def delete(self, receipt_handle: str) -> None:
+        message = self._in_flight.get(receipt_handle)
+        if message is not None:
+            self._release(message)
+            self.notify()
+
+    def change_visibility(self, receipt_handle: str, visibility_timeout: int) -> bool:
+        message = self._in_flight.get(receipt_handle)
+        if message is None:
+            return False
+        message.visible_at = time.monotonic() + visibility_timeout
+        heapq.heappush(self._visibility_heap, (message.visible_at, message.sequence_number, receipt_handle))
+        if visibility_timeout == 0:
+            self.notify()
+        return True
+
+    def purge(self) -> None:
+        self._messages.clear()
+        self._message_groups.clear()
+        self._in_flight.clear()
+        self._in_flight_groups.clear()
+        self._visibility_heap = []
+
+
+class InMemoryTopic(object):
+    __slots__ = ("name", "arn", "attributes", "fifo", "subscriptions", "_deduplication_ids")
+
+    name: str
+    arn: str
+    attributes: Dict[str, str]
+    fifo: bool
+    subscriptions: "OrderedDict[str, Dict[str, Any]]"
+    _deduplication_ids: "OrderedDict[str, float]"
+
+    def __init__(self, name: str, arn: str, attributes: Dict[str, str]) -> None:
+        self.name = name
+        self.arn = arn
+        self.attributes = attributes
+        self.fifo = name.endswith(".fifo")
+        self.subscriptions = OrderedDict()
+        self._deduplication_ids = OrderedDict()
+
+    def is_duplicate(self, deduplication_id: Optional[str]) -> bool:
+        if not self.fifo or not deduplication_id:
+            return False
+
+        now = time.monotonic()
+        while self._deduplication_ids:
+            key, expires_at = next(iter(self._deduplication_ids.items()))
+            if expires_at > now:
+                break
+            del self._deduplication_ids[key]
+
+        if deduplication_id in self._deduplication_ids:
+            return True
+        self._deduplication_ids[deduplication_id] = now + DEDUPLICATION_INTERVAL
+        return False
+
+
+def _filter_policy_values(attribute: Mapping[str, Any]) -> List[Any]:
+    data_type = str(attribute.get("DataType") or "")
+    value = attribute.get("StringValue")
+    if data_type.startswith("String.Array"):
+        try:
+            values = json.loads(value or "[]")
+        except ValueError:
+            return []
+        return values if isinstance(values, list) else [values]
+    if data_type.startswith("Number"):
+        try:
+            return [float(value or "")]
+        except ValueError:
+            return []
+    if data_type.startswith("String"):
+        return [value]
+    return []
+
+
+def _match_numeric(conditions: Sequence[Any], value: Any) -> bool:
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return False
+    operators = {
+        "=": lambda a, b: a == b,
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+    }
+    for i in range(0, len(conditions) - 1, 2):
+        operator = operators.get(conditions[i])
+        if operator is None or not operator(value, float(conditions[i + 1])):
+            return False
+    return True
+
+
+def _match_rule(rule: Any, values: List[Any]) -> bool:
+    if isinstance(rule, str):
+        return rule in values
+    if isinstance(rule, (int, float)) and not isinstance(rule, bool):
+        return any([isinstance(v, (int, float)) and not isinstance(v, bool) and v == rule for v in values])
+    if rule is None or isinstance(rule, bool):
+        return rule in values
+    if not isinstance(rule, dict):
+        return False
+
+    if "prefix" in rule:
+        return any([isinstance(v, str) and v.startswith(rule["prefix"]) for v in values])
+    if "suffix" in rule:
+        return any([isinstance(v, str) and v.endswith(rule["suffix"]) for v in values])
+    if "equals-ignore-case" in rule:
+        return any([isinstance(v, str) and v.lower() == str(rule["equals-ignore-case"]).lower() for v in values])
+    if "numeric" in rule:
+        return any([_match_numeric(rule["numeric"], v) for v in values])
+    if "anything-but" in rule:
+        excluded = rule["anything-but"]
+        if isinstance(excluded, dict):
+            return not any([_match_rule(excluded, [v]) for v in values])
+        excluded_values = excluded if isinstance(excluded, list) else [excluded]
+        return not any([_match_rule(e, values) for e in excluded_values])
+    return False
+
+
+def match_filter_policy(filter_policy: Mapping[str, Any], message_attributes: Mapping[str, Mapping[str, Any]]) -> bool:
+    # Matches a filter policy (with the default "MessageAttributes" scope) against the message attributes of an
+    # SNS publish call. Every key of the policy has to match, and a key matches if any of its rules match.
+    for key, rules in filter_policy.items():
+        rules = rules if isinstance(rules, list) else [rules]
+        attribute = message_attributes.get(key)
+        if attribute is None:
+            if not any([isinstance(rule, dict) and rule.get("exists") is False for rule in rules]):
+                return False
+            continue
+
+        values = _filter_policy_values(attribute)
+        if not any(
+            [(isinstance(rule, dict) and rule.get("exists") is True) or _match_rule(rule, values) for rule in rules]
+        ):
+            return False
+
+    return True
+
+
+class InMemorySNSSQSBackend(object):
+    """In-process stand-in for AWS SNS and AWS SQS, for tests and for benchmarks of the AWS SNS+SQS transport.
+
+    Once installed on a ClientConnector, the "sns" and "sqs" clients of the connector are served by this backend
+    instead of AWS. Queue policies and IAM permissions are not enforced.
+    """
+
+    __slots__ = ("region_name", "account_id", "topics", "queues", "_queue_urls", "_sequence")
+
+    region_name: str
+    account_id: str
+    topics: "OrderedDict[str, InMemoryTopic]"
+    queues: Dict[str, InMemoryQueue]
+    _queue_urls: Dict[str, str]
+    _sequence: "itertools.count[int]"
+
+    def __init__(self, region_name: str = DEFAULT_REGION_NAME, account_id: str = DEFAULT_ACCOUNT_ID) -> None:
+        self.region_name = region_name
+        self.account_id = account_id
+        self.topics = OrderedDict()
+        self.queues = {}
+        self._queue_urls = {}
+        self._sequence = itertools.count(1)
+
+    def install(self, connector: ClientConnector) -> None:
+        connector.set_client_factory("sns", lambda credentials: InMemorySNSClient(self))
+        connector.set_client_factory("sqs", lambda credentials: InMemorySQSClient(self))
+
+    def uninstall(self, connector: ClientConnector) -> None:
+        connector.set_client_factory("sns", None)
+        connector.set_client_factory("sqs", None)
+
+    def get_queue(self, queue_url: str, operation_name: str) -> InMemoryQueue:
+        queue = self.queues.get(queue_url)
+        if queue is None:
+            raise client_error(
+                "AWS.SimpleQueueService.NonExistentQueue",
+                "The specified queue does not exist for this wsdl version.",
+                operation_name,
+            )
+        return queue
+
+    def get_queue_by_arn(self, queue_arn: str) -> Optional[InMemoryQueue]:
+        queue_url = self._queue_urls.get(queue_arn.split(":")[-1])
+        return self.queues.get(queue_url) if queue_url else None
+
+    def get_topic(self, topic_arn: str, operation_name: str) -> InMemoryTopic:
+        topic = self.topics.get(topic_arn)
+        if topic is None:
+            raise client_error("NotFound", "Topic does not exist", operation_name)
+        return topic
+
+    def create_queue(self, queue_name: str, attributes: Dict[str, str]) -> InMemoryQueue:
+        queue_url = self._queue_urls.get(queue_name)
+        if queue_url:
+            queue = self.queues[queue_url]
+            if any([queue.attributes.get(k) != v for k, v in attributes.items()]):
+                raise client_error(
+                    "QueueAlreadyExists",
+                    "A queue already exists with the same name and a different value for attribute",
+                    "CreateQueue",
+                )
+            return queue
+
+        if queue_name.endswith(".fifo") != (str(attributes.get("FifoQueue", "")).lower() == "true"):
+            raise client_error(
+                "InvalidParameterValue",
+                "The name of a FIFO queue can only include alphanumeric characters, hyphens, or underscores, must end with .fifo suffix",
+                "CreateQueue",
+            )
+
+        queue_url = "https://sqs.{}.amazonaws.com/{}/{}".format(self.region_name, self.account_id, queue_name)
+        queue_arn = "arn:aws:sqs:{}:{}:{}".format(self.region_name, self.account_id, queue_name)
+        queue = InMemoryQueue(queue_name, queue_url, queue_arn, dict(attributes))
+        self.queues[queue_url] = queue
+        self._queue_urls[queue_name] = queue_url
+        return queue
+
+    def delete_queue(self, queue_url: str) -> None:
+        queue = self.get_queue(queue_url, "DeleteQueue")
+        del self.queues[queue_url]
+        self._queue_urls.pop(queue.name, None)
+        queue.notify()
+
+    def create_topic(self, name: str, attributes: Dict[str, str]) -> InMemoryTopic:
+        topic_arn = "arn:aws:sns:{}:{}:{}".format(self.region_name, self.account_id, name)
+        topic = self.topics.get(topic_arn)
+        if topic is not None:
+            if any([topic.attributes.get(k, "") != v for k, v in attributes.items()]):
+                raise client_error(
+                    "InvalidParameter",
+                    "Invalid parameter: Attributes Reason: Topic already exists with different attributes",
+                    "CreateTopic",
+                )
+            return topic
+
+        if name.endswith(".fifo") != (str(attributes.get("FifoTopic", "")).lower() == "true"):
+            raise client_error(
+                "InvalidParameter", "Invalid parameter: Fifo Topic names must end with .fifo", "CreateTopic"
+            )
+
+        topic = InMemoryTopic(name, topic_arn, dict(attributes))
+        self.topics[topic_arn] = topic
+        return topic
+
+    def subscribe(self, topic_arn: str, protocol: str, endpoint: str, attributes: Dict[str, str]) -> str:
+        topic = self.get_topic(topic_arn, "Subscribe")
+        if protocol != "sqs":
+            raise client_error(
+                "InvalidParameter", "Invalid parameter: Only the sqs protocol is supported in-memory", "Subscribe"
+            )
+
+        for subscription_arn, subscription in topic.subscriptions.items():
+            if subscription["Endpoint"] == endpoint:
+                if attributes and any([subscription["Attributes"].get(k) != v for k, v in attributes.items()]):
+                    raise client_error(
+                        "InvalidParameter",
+                        "Invalid parameter: Attributes Reason: Subscription already exists with different attributes",
+                        "Subscribe",
+                    )
+                return subscription_arn
+
+        subscription_arn = "{}:{}".format(topic_arn, uuid.uuid4())
+        topic.subscriptions[subscription_arn] = {"Endpoint": endpoint, "Attributes": dict(attributes)}
+        return subscription_arn
+
+    def get_subscription(self, subscription_arn: str, operation_name: str) -> Dict[str, Any]:
+        topic = self.topics.get(subscription_arn.rsplit(":", 1)[0])
+        subscription = topic.subscriptions.get(subscription_arn) if topic else None
+        if subscription is None:
+            raise client_error("NotFound", "Subscription does not exist", operation_name)
+        return subscription
+
+    def next_sequence_number(self) -> int:
+        return next(self._sequence)
+
+    def publish(
+        self,
+        topic_arn: str,
+        message: str,
+        message_attributes: Optional[Dict[str, Dict[str, Any]]],
+        message_group_id: Optional[str],
+        deduplication_id: Optional[str],
+        operation_name: str,
+    ) -> str:
+        topic = self.get_topic(topic_arn, operation_name)
+        if topic.fifo and not message_group_id:
+            raise client_error(
+                "InvalidParameter",
+                "Invalid parameter: The MessageGroupId parameter is required for FIFO topics",
+                operation_name,
+            )
+        if topic.fifo and not deduplication_id:
+            if str(topic.attributes.get("ContentBasedDeduplication", "")).lower() != "true":
+                raise client_error(
+                    "InvalidParameter",
+                    "Invalid parameter: The topic should either have ContentBasedDeduplication enabled or MessageDeduplicationId provided explicitly",
+                    operation_name,
+                )
+            deduplication_id = hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+        message_id = str(uuid.uuid4())
+        if topic.is_duplicate(deduplication_id):
+            return message_id
+
+        message_attributes = message_attributes or {}
+        notification_attributes = {
+            name: {
+                "Type": attribute.get("DataType"),
+                "Value": (
+                    base64.b64encode(attribute["BinaryValue"]).decode()
+                    if attribute.get("BinaryValue") is not None
+                    else attribute.get("StringValue")
+                ),
+            }
+            for name, attribute in message_attributes.items()
+        }
+        notification = {
+            "Type": "Notification",
+            "MessageId": message_id,
+            "TopicArn": topic_arn,
+            "Message": message,
+            "Timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "MessageAttributes": notification_attributes,
+        }
+        if message_group_id:
+            notification["SequenceNumber"] = str(self.next_sequence_number()).zfill(20)
+
+        for subscription in list(topic.subscriptions.values()):
+            queue = self.get_queue_by_arn(subscription["Endpoint"])
+            if queue is None:
+                continue
+
+            filter_policy = json.loads(subscription["Attributes"].get("FilterPolicy") or "{}")
+            if filter_policy and not match_filter_policy(filter_policy, message_attributes):
+                continue
+
+            raw_message_delivery = str(subscription["Attributes"].get("RawMessageDelivery", "")).lower() == "true"
+            body = message if raw_message_delivery else json.dumps(notification)
+            if queue.is_duplicate(deduplication_id if queue.fifo else None):
+                continue
+            queue.put(
+                InMemoryMessage(
+                    self.next_sequence_number(),
+                    body,
+                    copy.deepcopy(message_attributes) if raw_message_delivery else None,
+                    message_group_id if queue.fifo else None,
+                    deduplication_id if queue.fifo else None,
+                )
+            )
+
+        return message_id
+
+
+class InMemorySNSClient(object):
+    __slots__ = ("backend",)
+
+    backend: InMemorySNSSQSBackend
+
+    def __init__(self, backend: InMemorySNSSQSBackend) -> None:
+        self.backend = backend
+
+    async def close(self) -> None:
+        pass
+
+    async def create_topic(self, Name: str, Attributes: Optional[Dict[str, str]] = None, **kwargs: Any) -> Dict:
+        return {"TopicArn": self.backend.create_topic(Name, Attributes or {}).arn}
+
+    async def delete_topic(self, TopicArn: str) -> Dict:
+        self.backend.topics.pop(TopicArn, None)
+        return {}
+
+    async def get_topic_attributes(self, TopicArn: str) -> Dict:
+        topic = self.backend.get_topic(TopicArn, "GetTopicAttributes")
+        return {
+            "Attributes": {
+                **topic.attributes,
+                "TopicArn": topic.arn,
+                "SubscriptionsConfirmed": str(len(topic.subscriptions)),
+            }
+        }
+
+    async def set_topic_attributes(self, TopicArn: str, AttributeName: str, AttributeValue: str) -> Dict:
+        self.backend.get_topic(TopicArn, "SetTopicAttributes").attributes[AttributeName] = AttributeValue
+        return {}
+
+    async def list_topics(self, NextToken: Optional[str] = None) -> Dict:
+        topic_arns = list(self.backend.topics.keys())
+        start = int(NextToken) if NextToken else 0
+        response: Dict[str, Any] = {
+            "Topics": [{"TopicArn": topic_arn} for topic_arn in topic_arns[start : start + LIST_TOPICS_PAGE_SIZE]]
+        }
+        if start + LIST_TOPICS_PAGE_SIZE < len(topic_arns):
+            response["NextToken"] = str(start + LIST_TOPICS_PAGE_SIZE)
+        return response
+
+    async def subscribe(
+        self,
+        TopicArn: str,
+        Protocol: str,
+        Endpoint: str,
+        Attributes: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        return {"SubscriptionArn": self.backend.subscribe(TopicArn, Protocol, Endpoint, Attributes or {})}
+
+    async def unsubscribe(self, SubscriptionArn: str) -> Dict:
+        topic = self.backend.topics.get(SubscriptionArn.rsplit(":", 1)[0])
+        if topic:
+            topic.subscriptions.pop(SubscriptionArn, None)
+        return {}
+
+    async def get_subscription_attributes(self, SubscriptionArn: str) -> Dict:
+        subscription = self.backend.get_subscription(SubscriptionArn, "GetSubscriptionAttributes")
+        return {
+            "Attributes": {
+                **subscription["Attributes"],
+                "SubscriptionArn": SubscriptionArn,
+                "Endpoint": subscription["Endpoint"],
+                "Protocol": "sqs",
+            }
+        }
+
+    async def set_subscription_attributes(self, SubscriptionArn: str, AttributeName: str, AttributeValue: str) -> Dict:
+        subscription = self.backend.get_subscription(SubscriptionArn, "SetSubscriptionAttributes")
+        subscription["Attributes"][AttributeName] = AttributeValue
+        return {}
+
+    async def publish(
+        self,
+        TopicArn: str,
+        Message: str,
+        MessageAttributes: Optional[Dict[str, Dict[str, Any]]] = None,
+        MessageGroupId: Optional[str] = None,
+        MessageDeduplicationId: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        message_id = self.backend.publish(
+            TopicArn, Message, MessageAttributes, MessageGroupId, MessageDeduplicationId, "Publish"
+        )
+        return {"MessageId": message_id}
+
+    async def publish_batch(self, TopicArn: str, PublishBatchRequestEntries: List[Dict[str, Any]]) -> Dict:
+        self.backend.get_topic(TopicArn, "PublishBatch")
+        if len(PublishBatchRequestEntries) > 10:
+            raise client_error(
+                "TooManyEntriesInBatchRequest",
+                "The batch request contains more entries than permissible.",
+                "PublishBatch",
+            )
+
+        successful = []
+        failed = []
+        for entry in PublishBatchRequestEntries:
+            try:
+                message_id = self.backend.publish(
+                    TopicArn,
+                    entry["Message"],
+                    entry.get("MessageAttributes"),
+                    entry.get("MessageGroupId"),
+                    entry.get("MessageDeduplicationId"),
+                    "PublishBatch",
+                )
+                successful.append({"Id": entry["Id"], "MessageId": message_id})
+            except botocore.exceptions.ClientError as e:
+                failed.append(
+                    {
+                        "Id": entry["Id"],
+                        "Code": e.response.get("Error", {}).get("Code"),
+                        "Message": e.response.get("Error", {}).get("Message"),
+                        "SenderFault": True,
+                    }
+                )
+
+        return {"Successful": successful, "Failed": failed}
+
+
+class InMemorySQSClient(object):
+    __slots__ = ("backend",)
+
+    backend: InMemorySNSSQSBackend
+
+    def __init__(self, backend: InMemorySNSSQSBackend) -> None:
+        self.backend = backend
+
+    async def close(self) -> None:
+        pass
+
+    async def create_queue(self, QueueName: str, Attributes: Optional[Dict[str, str]] = None, **kwargs: Any) -> Dict:
+        return {"QueueUrl": self.backend.create_queue(QueueName, Attributes or {}).url}
+
+    async def delete_queue(self, QueueUrl: str) -> Dict:
+        self.backend.delete_queue(QueueUrl)
+        return {}
+
+    async def purge_queue(self, QueueUrl: str) -> Dict:
+        self.backend.get_queue(QueueUrl, "PurgeQueue").purge()
+        return {}
+
+    async def list_queues(self, QueueNamePrefix: Optional[str] = None, MaxResults: Optional[int] = None) -> Dict:
+        queue_urls = [
+            queue_url
+            for queue_name, queue_url in self.backend._queue_urls.items()
+            if not QueueNamePrefix or queue_name.startswith(QueueNamePrefix)
+        ]
+        if MaxResults:
+            queue_urls = queue_urls[:MaxResults]
+        return {"QueueUrls": queue_urls} if queue_urls else {}
+
+    async def get_queue_url(self, QueueName: str, QueueOwnerAWSAccountId: Optional[str] = None) -> Dict:
+        queue_url = self.backend._queue_urls.get(QueueName)
+        if not queue_url or (QueueOwnerAWSAccountId and QueueOwnerAWSAccountId != self.backend.account_id):
+            raise client_error(
+                "AWS.SimpleQueueService.NonExistentQueue",
+                "The specified queue does not exist for this wsdl version.",
+                "GetQueueUrl",
+            )
+        return {"QueueUrl": queue_url}
+
+    async def get_queue_attributes(self, QueueUrl: str, AttributeNames: Optional[List[str]] = None) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "GetQueueAttributes")
+        queue.requeue_expired()
+        attributes = {
+            "VisibilityTimeout": str(DEFAULT_VISIBILITY_TIMEOUT),
+            **queue.attributes,
+            "QueueArn": queue.arn,
+            "ApproximateNumberOfMessages": str(queue.approximate_number_of_messages),
+            "ApproximateNumberOfMessagesNotVisible": str(queue.approximate_number_of_messages_not_visible),
+        }
+        if AttributeNames and "All" not in AttributeNames:
+            attributes = {k: v for k, v in attributes.items() if k in AttributeNames}
+        return {"Attributes": attributes}
+
+    async def set_queue_attributes(self, QueueUrl: str, Attributes: Dict[str, str]) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "SetQueueAttributes")
+        for name, value in Attributes.items():
+            if value == "" and name in ("Policy", "RedrivePolicy", "KmsMasterKeyId"):
+                queue.attributes.pop(name, None)
+            else:
+                queue.attributes[name] = value
+        return {}
+
+    async def send_message(
+        self,
+        QueueUrl: str,
+        MessageBody: str,
+        MessageAttributes: Optional[Dict[str, Dict[str, Any]]] = None,
+        MessageGroupId: Optional[str] = None,
+        MessageDeduplicationId: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "SendMessage")
+        if queue.fifo and not MessageGroupId:
+            raise client_error(
+                "MissingParameter", "The request must contain the parameter MessageGroupId.", "SendMessage"
+            )
+        message = InMemoryMessage(
+            self.backend.next_sequence_number(), MessageBody, MessageAttributes, MessageGroupId, MessageDeduplicationId
+        )
+        if not queue.is_duplicate(MessageDeduplicationId):
+            queue.put(message)
+        return {"MessageId": message.message_id, "MD5OfMessageBody": hashlib.md5(MessageBody.encode()).hexdigest()}
+
+    async def receive_message(
+        self,
+        QueueUrl: str,
+        MaxNumberOfMessages: int = 1,
+        WaitTimeSeconds: Optional[int] = None,
+        VisibilityTimeout: Optional[int] = None,
+        AttributeNames: Optional[List[str]] = None,
+        MessageAttributeNames: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "ReceiveMessage")
+        if WaitTimeSeconds is None:
+            WaitTimeSeconds = int(queue.attributes.get("ReceiveMessageWaitTimeSeconds") or 0)
+        loop = asyncio.get_event_loop()
+        deadline = time.monotonic() + WaitTimeSeconds
+
+        while True:
+            queue = self.backend.get_queue(QueueUrl, "ReceiveMessage")
+            redrive_policy = json.loads(queue.attributes.get("RedrivePolicy") or "{}")
+            dead_letter_queue = (
+                self.backend.get_queue_by_arn(redrive_policy["deadLetterTargetArn"])
+                if redrive_policy.get("deadLetterTargetArn")
+                else None
+            )
+            messages = queue.receive(
+                min(max(MaxNumberOfMessages, 1), 10),
+                VisibilityTimeout if VisibilityTimeout is not None else queue.visibility_timeout,
+                dead_letter_queue,
+            )
+            now = time.monotonic()
+            if messages or now >= deadline:
+                break
+
+            # Long polling - waits until a message is sent to the queue, or a received message becomes visible again.
+            timeout = deadline - now
+            next_visible_at = queue.next_visible_at()
+            if next_visible_at is not None:
+                timeout = max(min(timeout, next_visible_at - now), 0.001)
+            waiter: asyncio.Future = loop.create_future()
+            queue.add_waiter(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                queue.remove_waiter(waiter)
+
+        if not messages:
+            return {}
+
+        return {
+            "Messages": [self._format_message(message, AttributeNames, MessageAttributeNames) for message in messages]
+        }
+
+    @staticmethod
+    def _format_message(
+        message: InMemoryMessage, attribute_names: Optional[List[str]], message_attribute_names: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        attributes: Dict[str, str] = {
+            "ApproximateReceiveCount": str(message.receive_count),
+            "SentTimestamp": str(message.sent_timestamp),
+        }
+        if message.message_group_id:
+            attributes["MessageGroupId"] = message.message_group_id
+        if message.deduplication_id:
+            attributes["MessageDeduplicationId"] = message.deduplication_id
+
+        result: Dict[str, Any] = {
+            "MessageId": message.message_id,
+            "ReceiptHandle": message.receipt_handle,
+            "MD5OfBody": hashlib.md5(message.body.encode()).hexdigest(),
+            "Body": message.body,
+        }
+        if attribute_names:
+            result["Attributes"] = (
+                attributes
+                if "All" in attribute_names
+                else {k: v for k, v in attributes.items() if k in attribute_names}
+            )
+        if message_attribute_names and message.message_attributes:
+            result["MessageAttributes"] = {
+                k: v
+                for k, v in message.message_attributes.items()
+                if "All" in message_attribute_names or ".*" in message_attribute_names or k in message_attribute_names
+            }
+        return result
+
+    async def delete_message(self, QueueUrl: str, ReceiptHandle: str) -> Dict:
+        self.backend.get_queue(QueueUrl, "DeleteMessage").delete(ReceiptHandle)
+        return {}
+
+    async def delete_message_batch(self, QueueUrl: str, Entries: List[Dict[str, str]]) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "DeleteMessageBatch")
+        for entry in Entries:
+            queue.delete(entry["ReceiptHandle"])
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    async def change_message_visibility(self, QueueUrl: str, ReceiptHandle: str, VisibilityTimeout: int) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "ChangeMessageVisibility")
+        if not queue.change_visibility(ReceiptHandle, VisibilityTimeout):
+            raise client_error(
+                "AWS.SimpleQueueService.MessageNotInflight",
+                "Message does not exist or is not available for visibility timeout change.",
+                "ChangeMessageVisibility",
+            )
+        return {}
+
+    async def change_message_visibility_batch(self, QueueUrl: str, Entries: List[Dict[str, Any]]) -> Dict:
+        queue = self.backend.get_queue(QueueUrl, "ChangeMessageVisibilityBatch")
+        successful = []
+        failed = []
+        for entry in Entries:
+            if queue.change_visibility(entry["ReceiptHandle"], int(entry["VisibilityTimeout"])):
+                successful.append({"Id": entry["Id"]})
+            else:
+                failed.append(
+                    {
+                        "Id": entry["Id"],
+                        "Code": "AWS.SimpleQueueService.MessageNotInflight",
+                        "Message": "Message does not exist or is not available for visibility timeout change.",
+                        "SenderFault": True,
+                    }
+                )
+        return {"Successful": successful, "Failed": failed}
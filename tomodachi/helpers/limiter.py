@@ -0,0 +1,125 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple, Union
+
+
+class InFlightLimiter(object):
+    __slots__ = ("limit", "in_use", "_waiters", "_woken", "_passes", "_virtual_time", "_watchers")
+
+    limit: int
+    in_use: int
+    _waiters: Deque[Tuple[asyncio.Future, Optional[Hashable]]]
+    _woken: int
+    _passes: Dict[Hashable, float]
+    _virtual_time: float
+    _watchers: List[asyncio.Future]
+
+    def __init__(self, limit: int) -> None:
+        if not isinstance(limit, int) or limit is True or limit is False or limit < 1:
+            raise ValueError("Bad value for in-flight limit: {}".format(str(limit)))
+
+        self.limit = limit
+        self.in_use = 0
+        self._waiters = deque()
+        self._woken = 0
+        self._passes = {}
+        self._virtual_time = 0.0
+        self._watchers = []
+
+    @property
+    def available(self) -> int:
+        return max(self.limit - self.in_use, 0)
+
+    def saturated(self) -> bool:
+        return self.available <= 0
+
+    async def acquire(self, count: int = 1, priority: Union[int, float] = 1, key: Optional[Hashable] = None) -> int:
+        # Waits until there's capacity for at least one more in-flight item, then takes as much
+        # of the requested capacity as is currently available. Returns the acquired count.
+        #
+        # Waiters that share the limiter using a key are woken in proportion to their priority weight (stride
+        # scheduling), so that a key with priority 4 gets four times the capacity of a key with priority 1 while
+        # the limiter is saturated. Waiters without a key (or with equal weights) are woken in order.
+        if not isinstance(priority, (int, float)) or priority is True or priority is False or priority <= 0:
+            raise ValueError("Bad value for in-flight limiter priority: {}".format(str(priority)))
+
+        count = max(count, 1)
+        queued = False
+        # Capacity is reserved for woken waiters until they get to run, so that it can't be taken by new callers.
+        while (not queued and self._waiters) or self.available <= self._woken:
+            future: asyncio.Future = asyncio.get_event_loop().create_future()
+            if not queued:
+                self._waiters.append((future, key))
+            else:
+                # Capacity was taken by someone else before this waiter got to run - keep its place in line.
+                self._waiters.appendleft((future, key))
+            queued = True
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._remove_waiter(future)
+                if future.done() and not future.cancelled():
+                    self._woken -= 1
+                    self._wake_waiters()
+                raise
+            self._woken -= 1
+
+        acquired = min(count, self.available)
+        self.in_use += acquired
+        if key is not None:
+            # Keys that were idle start at the current virtual time, so that they can't build up credit.
+            start = max(self._passes.get(key, self._virtual_time), self._virtual_time)
+            self._passes[key] = start + acquired / priority
+            self._virtual_time = start
+        self._wake_waiters()
+        return acquired
+
+    async def wait_available(self) -> None:
+        # Waits until there's capacity for at least one more in-flight item, without taking it. Capacity that is
+        # reserved for woken waiters isn't available.
+        while self.available <= self._woken:
+            future: asyncio.Future = asyncio.get_event_loop().create_future()
+            self._watchers.append(future)
+            try:
+                await future
+            finally:
+                if future in self._watchers:
+                    self._watchers.remove(future)
+
+    def release(self, count: int = 1) -> None:
+        self.in_use = max(self.in_use - count, 0)
+        self._wake_waiters()
+
+    def _remove_waiter(self, future: asyncio.Future) -> None:
+        for waiter in self._waiters:
+            if waiter[0] is future:
+                self._waiters.remove(waiter)
+                return
+
+    def _wake_waiters(self) -> None:
+        # Waiters that were cancelled before they got to remove themselves are skipped, so that a woken waiter is
+        # never lost while capacity is available.
+        while self._waiters and self.available > self._woken:
+            # The waiter with the lowest pass is woken first, or the longest waiting one if passes are equal.
+            waiter = self._waiters[0]
+            if len(self._waiters) > 1 and self._passes:
+                virtual_time = self._virtual_time
+                passes = self._passes
+                waiter = min(
+                    self._waiters,
+                    key=lambda w: (
+                        max(passes.get(w[1], virtual_time), virtual_time) if w[1] is not None else virtual_time
+                    ),
+                )
+            self._waiters.remove(waiter)
+            future = waiter[0]
+            if not future.done():
+                future.set_result(None)
+                self._woken += 1
+                break
+
+        if self._watchers and self.available > self._woken:
+            watchers, self._watchers = self._watchers, []
+            for future in watchers:
+                if not future.done():
+                    future.set_result(None)
@@ -0,0 +1,124 @@
+import bisect
+from typing import Any, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class LatencyHistogram(object):
+    __slots__ = ("bounds", "buckets", "count", "errors", "timeouts", "retries", "total_time", "max_time")
+
+    bounds: Tuple[float, ...]
+    buckets: List[int]
+    count: int
+    errors: int
+    timeouts: int
+    retries: int
+    total_time: float
+    max_time: float
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        if (
+            not bounds
+            or any(not isinstance(b, (int, float)) or b <= 0 for b in bounds)
+            or sorted(bounds) != list(bounds)
+        ):
+            raise ValueError("Bad value for latency histogram bounds: {}".format(str(bounds)))
+
+        self.bounds = tuple(float(b) for b in bounds)
+        self.reset()
+
+    def reset(self) -> None:
+        # The last bucket counts durations above the highest bound.
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, duration: float, retries: int = 0, error: bool = False, timeout: bool = False) -> None:
+        self.buckets[bisect.bisect_left(self.bounds, duration)] += 1
+        self.count += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+        if retries:
+            self.retries += retries
+        if timeout:
+            self.timeouts += 1
+        elif error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        # Estimated as the upper bound of the bucket that holds the quantile (or the max duration for the last bucket).
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.bounds[idx], self.max_time) if idx < len(self.bounds) else self.max_time
+        return self.max_time
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "total_time": self.total_time,
+            "avg_time": self.total_time / self.count if self.count else 0.0,
+            "max_time": self.max_time,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{bound: self.buckets[idx] for idx, bound in enumerate(self.bounds)},
+                float("inf"): self.buckets[-1],
+            },
+        }
+
+
+class OperationMetrics(object):
+    # Latency histograms of API calls per service and operation name. Instrumented clients record operations by
+    # their snake_case client method names (for example "publish" or "receive_message"), rather than by the API
+    # operation names. Histograms are created on the first call to an operation and are then updated in place.
+    __slots__ = ("bounds", "services")
+
+    bounds: Tuple[float, ...]
+    services: Dict[str, Dict[str, LatencyHistogram]]
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.services = {}
+
+    def get_histogram(self, service_name: str, operation_name: str) -> LatencyHistogram:
+        operations = self.services.get(service_name)
+        if operations is None:
+            operations = self.services[service_name] = {}
+
+        histogram = operations.get(operation_name)
+        if histogram is None:
+            histogram = operations[operation_name] = LatencyHistogram(self.bounds)
+        return histogram
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {
+            service_name: {operation_name: histogram.get_stats() for operation_name, histogram in operations.items()}
+            for service_name, operations in self.services.items()
+        }
+
+    def reset(self) -> None:
+        for operations in self.services.values():
+            for histogram in operations.values():
+                histogram.reset()
+
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "LatencyHistogram",
+    "OperationMetrics",
+]
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from tomodachi.helpers.execution_context import decrease_execution_context_value, increase_execution_context_value
+
+
+class PublishOutbox(object):
+    __slots__ = ("name", "max_size", "concurrency", "shutdown_timeout", "_queue", "_workers", "_closed")
+
+    name: str
+    max_size: int
+    concurrency: int
+    shutdown_timeout: Optional[float]
+    _queue: Optional[asyncio.Queue]
+    _workers: List[asyncio.Future]
+    _closed: bool
+
+    def __init__(
+        self, name: str, max_size: int = 10000, concurrency: int = 10, shutdown_timeout: Optional[float] = 10.0
+    ) -> None:
+        if not isinstance(max_size, int) or max_size is True or max_size is False or max_size < 0:
+            raise ValueError("Bad value for {} option publish_outbox_max_size: {}".format(name, str(max_size)))
+        if not isinstance(concurrency, int) or concurrency is True or concurrency is False or concurrency < 1:
+            raise ValueError("Bad value for {} option publish_outbox_concurrency: {}".format(name, str(concurrency)))
+
+        self.name = name
+        self.max_size = max_size
+        self.concurrency = concurrency
+        self.shutdown_timeout = shutdown_timeout
+        self._queue = None
+        self._workers = []
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def _start_workers(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if not self._workers:
+            self._workers = [asyncio.ensure_future(self._worker(self._queue)) for _ in range(self.concurrency)]
+        return self._queue
+
+    async def put(self, func: Callable[[], Awaitable]) -> None:
+        # Waits for a free slot while the outbox is full, which applies backpressure on the publisher instead
+        # of accumulating an unbounded number of pending publish tasks.
+        if self._closed:
+            self._dropped(1, "outbox is closed")
+            return
+
+        queue = self._start_workers()
+        increase_execution_context_value("{}_publish_outbox_depth".format(self.name))
+        try:
+            await queue.put(func)
+        except BaseException:
+            decrease_execution_context_value("{}_publish_outbox_depth".format(self.name))
+            raise
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            func = await queue.get()
+            try:
+                await func()
+            except asyncio.CancelledError:
+                self._dropped(1, "publish was cancelled")
+                raise
+            except Exception as e:
+                self._dropped(1, str(e) or type(e).__name__)
+            finally:
+                queue.task_done()
+                decrease_execution_context_value("{}_publish_outbox_depth".format(self.name))
+
+    def _dropped(self, count: int, reason: str) -> None:
+        increase_execution_context_value("{}_publish_outbox_dropped".format(self.name), count)
+        logging.getLogger("transport.{}".format(self.name)).warning(
+            "Dropped {} message(s) from publish outbox ({})".format(count, reason)
+        )
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        # Awaits messages in the outbox to be published, within the grace period given by timeout (or the
+        # shutdown_timeout of the outbox). Messages that remain when the grace period has passed are dropped.
+        self._closed = True
+        queue = self._queue
+        if queue is None:
+            return
+
+        if timeout is None:
+            timeout = self.shutdown_timeout
+
+        try:
+            await asyncio.wait_for(asyncio.shield(queue.join()), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.wait(self._workers)
+        self._workers = []
+
+        remaining = 0
+        while not queue.empty():
+            queue.get_nowait()
+            queue.task_done()
+            remaining += 1
+        if remaining:
+            decrease_execution_context_value("{}_publish_outbox_depth".format(self.name), remaining)
+            self._dropped(remaining, "shutdown grace period exceeded")
+
+
+def get_publish_outbox(
+    context: Dict,
+    name: str,
+    max_size: int = 10000,
+    concurrency: int = 10,
+    shutdown_timeout: Optional[float] = 10.0,
+) -> PublishOutbox:
+    if context.get("_publish_outboxes") is None:
+        context["_publish_outboxes"] = {}
+    outboxes: Dict[str, PublishOutbox] = context["_publish_outboxes"]
+
+    outbox = outboxes.get(name)
+    if outbox is None:
+        outbox = PublishOutbox(name, max_size=max_size, concurrency=concurrency, shutdown_timeout=shutdown_timeout)
+        outboxes[name] = outbox
+
+    return outbox
+
+
+async def flush_publish_outboxes(context: Any, name: Optional[str] = None) -> None:
+    outboxes: Optional[Dict[str, PublishOutbox]] = context.get("_publish_outboxes") if context else None
+    if not outboxes:
+        return
+
+    await asyncio.gather(
+        *[outbox.flush() for outbox_name, outbox in list(outboxes.items()) if name is None or outbox_name == name]
+    )
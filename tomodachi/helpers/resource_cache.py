@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+RESOURCE_CACHE_VERSION = 2
+
+
+class ResourceCache(object):
+    __slots__ = ("path", "_entries", "_loaded", "_dirty")
+
+    path: str
+    _entries: Dict[str, Dict[str, Any]]
+    _loaded: bool
+    _dirty: bool
+
+    def __init__(self, path: str) -> None:
+        if not isinstance(path, str) or not path:
+            raise ValueError("Bad value for resource cache path: {}".format(str(path)))
+
+        self.path = path
+        self._entries = {}
+        self._loaded = False
+        self._dirty = False
+
+    @staticmethod
+    def key(*parts: Optional[str]) -> str:
+        return json.dumps([part or "" for part in parts])
+
+    @staticmethod
+    def attributes_hash(value: Any) -> str:
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            with open(self.path, "r") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.getLogger("resource_cache").warning(
+                "Unable to read resource cache file '{}' ({})".format(self.path, str(e))
+            )
+            return
+
+        if not isinstance(data, dict) or data.get("version") != RESOURCE_CACHE_VERSION:
+            return
+
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries = {k: v for k, v in entries.items() if isinstance(v, dict)}
+
+    def get(self, key: str, attributes_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # Returns the cached value for the key, unless the cached value was stored for other attributes.
+        self.load()
+        entry = self._entries.get(key)
+        if entry is None or entry.get("attributes_hash") != attributes_hash:
+            return None
+        value = entry.get("value")
+        return value if isinstance(value, dict) else None
+
+    def set(self, key: str, value: Dict[str, Any], attributes_hash: Optional[str] = None) -> None:
+        self.load()
+        entry = {"value": value, "attributes_hash": attributes_hash}
+        if self._entries.get(key) != entry:
+            self._entries[key] = entry
+            self._dirty = True
+
+    def discard(self, key: str) -> None:
+        self.load()
+        if self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def clear(self) -> None:
+        self._loaded = True
+        if self._entries:
+            self._entries = {}
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        # The file is replaced atomically so that services starting concurrently never read a partial file.
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            with open(tmp_path, "w") as fp:
+                json.dump({"version": RESOURCE_CACHE_VERSION, "entries": self._entries}, fp, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logging.getLogger("resource_cache").warning(
+                "Unable to write resource cache file '{}' ({})".format(self.path, str(e))
+            )
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -85,6 +85,37 @@ class _AWSSNSSQS(OptionsInterface):
     sqs_kms_data_key_reuse_period: Optional[int]
     queue_policy: Optional[str]
     wildcard_queue_policy: Optional[str]
+    delete_message_batch_size: int
+    delete_message_batch_interval: float
+    publish_message_batch_size: int
+    publish_message_batch_interval: float
+    max_in_flight_messages_per_queue: Optional[int]
+    max_in_flight_messages: Optional[int]
+    pollers_per_queue: int
+    visibility_timeout_heartbeat: bool
+    visibility_timeout_heartbeat_threshold: float
+    publish_outbox_max_size: int
+    publish_outbox_concurrency: int
+    publish_outbox_shutdown_timeout: Optional[float]
+    message_deduplication_max_size: int
+    message_deduplication_ttl: Optional[float]
+    subscribe_setup_concurrency: int
+    resource_cache_path: Optional[str]
+    wildcard_topic_refresh_interval: Optional[float]
+    fifo_message_group_parallelism: bool
+    empty_receive_backoff_max_delay: Optional[float]
+    empty_receive_backoff_threshold: int
+    empty_receive_backoff_initial_delay: float
+    client_pool_size: int
+    client_pool_max_connections: int
+    client_pool_selection: str
+    warm_up_connections: int
+    dns_cache_ttl: Optional[int]
+    retry_max_attempts: Optional[int]
+    retry_budget_max_tokens: Optional[int]
+    retry_budget_ratio: float
+    circuit_breaker_failure_threshold: Optional[int]
+    circuit_breaker_reset_timeout: float
 
     _hierarchy: Tuple[str, ...] = ("aws_sns_sqs",)
     _legacy_fallback: Dict[str, Union[str, Tuple[str, ...]]] = {
@@ -121,6 +152,37 @@ class _AWSSNSSQS(OptionsInterface):
         sqs_kms_data_key_reuse_period: Optional[int] = None,
         queue_policy: Optional[str] = None,
         wildcard_queue_policy: Optional[str] = None,
+        delete_message_batch_size: int = 1,
+        delete_message_batch_interval: float = 0.1,
+        publish_message_batch_size: int = 1,
+        publish_message_batch_interval: float = 0.005,
+        max_in_flight_messages_per_queue: Optional[int] = None,
+        max_in_flight_messages: Optional[int] = None,
+        pollers_per_queue: int = 1,
+        visibility_timeout_heartbeat: bool = False,
+        visibility_timeout_heartbeat_threshold: float = 0.5,
+        publish_outbox_max_size: int = 10000,
+        publish_outbox_concurrency: int = 10,
+        publish_outbox_shutdown_timeout: Optional[float] = 10.0,
+        message_deduplication_max_size: int = 100000,
+        message_deduplication_ttl: Optional[float] = None,
+        subscribe_setup_concurrency: int = 10,
+        resource_cache_path: Optional[str] = None,
+        wildcard_topic_refresh_interval: Optional[float] = None,
+        fifo_message_group_parallelism: bool = False,
+        empty_receive_backoff_max_delay: Optional[float] = None,
+        empty_receive_backoff_threshold: int = 3,
+        empty_receive_backoff_initial_delay: float = 1.0,
+        client_pool_size: int = 1,
+        client_pool_max_connections: int = 50,
+        client_pool_selection: str = "round_robin",
+        warm_up_connections: int = 0,
+        dns_cache_ttl: Optional[int] = None,
+        retry_max_attempts: Optional[int] = None,
+        retry_budget_max_tokens: Optional[int] = None,
+        retry_budget_ratio: float = 0.1,
+        circuit_breaker_failure_threshold: Optional[int] = None,
+        circuit_breaker_reset_timeout: float = 10.0,
         **kwargs: Any,
     ):
         self.region_name = region_name
@@ -133,6 +195,37 @@ class _AWSSNSSQS(OptionsInterface):
         self.sqs_kms_data_key_reuse_period = sqs_kms_data_key_reuse_period
         self.queue_policy = queue_policy
         self.wildcard_queue_policy = wildcard_queue_policy
+        self.delete_message_batch_size = delete_message_batch_size
+        self.delete_message_batch_interval = delete_message_batch_interval
+        self.publish_message_batch_size = publish_message_batch_size
+        self.publish_message_batch_interval = publish_message_batch_interval
+        self.max_in_flight_messages_per_queue = max_in_flight_messages_per_queue
+        self.max_in_flight_messages = max_in_flight_messages
+        self.pollers_per_queue = pollers_per_queue
+        self.visibility_timeout_heartbeat = visibility_timeout_heartbeat
+        self.visibility_timeout_heartbeat_threshold = visibility_timeout_heartbeat_threshold
+        self.publish_outbox_max_size = publish_outbox_max_size
+        self.publish_outbox_concurrency = publish_outbox_concurrency
+        self.publish_outbox_shutdown_timeout = publish_outbox_shutdown_timeout
+        self.message_deduplication_max_size = message_deduplication_max_size
+        self.message_deduplication_ttl = message_deduplication_ttl
+        self.subscribe_setup_concurrency = subscribe_setup_concurrency
+        self.resource_cache_path = resource_cache_path
+        self.wildcard_topic_refresh_interval = wildcard_topic_refresh_interval
+        self.fifo_message_group_parallelism = fifo_message_group_parallelism
+        self.empty_receive_backoff_max_delay = empty_receive_backoff_max_delay
+        self.empty_receive_backoff_threshold = empty_receive_backoff_threshold
+        self.empty_receive_backoff_initial_delay = empty_receive_backoff_initial_delay
+        self.client_pool_size = client_pool_size
+        self.client_pool_max_connections = client_pool_max_connections
+        self.client_pool_selection = client_pool_selection
+        self.warm_up_connections = warm_up_connections
+        self.dns_cache_ttl = dns_cache_ttl
+        self.retry_max_attempts = retry_max_attempts
+        self.retry_budget_max_tokens = retry_budget_max_tokens
+        self.retry_budget_ratio = retry_budget_ratio
+        self.circuit_breaker_failure_threshold = circuit_breaker_failure_threshold
+        self.circuit_breaker_reset_timeout = circuit_breaker_reset_timeout
 
         self._load_keyword_options(**kwargs)
 
@@ -190,6 +283,11 @@ class _AMQP(OptionsInterface):
     ssl: bool
     heartbeat: int
     queue_ttl: int
+    publish_outbox_max_size: int
+    publish_outbox_concurrency: int
+    publish_outbox_shutdown_timeout: Optional[float]
+    message_deduplication_max_size: int
+    message_deduplication_ttl: Optional[float]
     qos: QOS
 
     _hierarchy: Tuple[str, ...] = ("amqp",)
@@ -208,6 +306,11 @@ class _AMQP(OptionsInterface):
         ssl: bool = False,
         heartbeat: int = 60,
         queue_ttl: int = 86400,
+        publish_outbox_max_size: int = 10000,
+        publish_outbox_concurrency: int = 10,
+        publish_outbox_shutdown_timeout: Optional[float] = 10.0,
+        message_deduplication_max_size: int = 100000,
+        message_deduplication_ttl: Optional[float] = None,
         qos: Union[Mapping[str, Any], QOS] = DEFAULT(QOS),
         **kwargs: Any,
     ):
@@ -222,6 +325,11 @@ class _AMQP(OptionsInterface):
         self.ssl = ssl
         self.heartbeat = heartbeat
         self.queue_ttl = queue_ttl
+        self.publish_outbox_max_size = publish_outbox_max_size
+        self.publish_outbox_concurrency = publish_outbox_concurrency
+        self.publish_outbox_shutdown_timeout = publish_outbox_shutdown_timeout
+        self.message_deduplication_max_size = message_deduplication_max_size
+        self.message_deduplication_ttl = message_deduplication_ttl
 
         input_: Tuple[Tuple[str, Union[Mapping[str, Any], OptionsInterface], type], ...] = (("qos", qos, self.QOS),)
         self._load_initial_input(input_)
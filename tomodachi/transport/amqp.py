@@ -2,27 +2,29 @@ import asyncio
 import binascii
 import functools
 import hashlib
-import inspect
 import logging
 import re
-import time
 from typing import Any, Callable, Dict, List, Match, Optional, Set, Tuple, Union, cast
 
 import aioamqp
 
-from tomodachi.helpers.dict import merge_dicts
+from tomodachi.envelope.blob_store import BlobStoreFetchError
+from tomodachi.helpers.arguments import ArgumentBinding
+from tomodachi.helpers.deduplication import DeduplicationCache
 from tomodachi.helpers.execution_context import (
     decrease_execution_context_value,
     increase_execution_context_value,
     set_execution_context,
 )
 from tomodachi.helpers.middleware import execute_middlewares
+from tomodachi.helpers.outbox import PublishOutbox, flush_publish_outboxes, get_publish_outbox
 from tomodachi.invoker import Invoker
 from tomodachi.options import Options
 
 MESSAGE_ENVELOPE_DEFAULT = "2594418c-5771-454a-a7f9-8f83ae82812a"
 MESSAGE_PROTOCOL_DEFAULT = MESSAGE_ENVELOPE_DEFAULT  # deprecated
 MESSAGE_ROUTING_KEY_PREFIX = "38f58822-25f6-458a-985c-52701d40dbbc"
+BLOB_STORE_FETCH_RETRY_DELAY = 10
 
 
 class AmqpException(Exception):
@@ -63,6 +65,7 @@ class AmqpTransport(Invoker):
     protocol: Any = None
     transport: Any = None
     exchange_name: str
+    delayed_nacks: Set[asyncio.Future] = set()
 
     @classmethod
     async def publish(
@@ -114,8 +117,19 @@ class AmqpTransport(Invoker):
         if wait:
             await _publish_message()
         else:
-            loop: Any = asyncio.get_event_loop()
-            loop.create_task(_publish_message())
+            await cls.get_publish_outbox(service.context).put(_publish_message)
+
+    @classmethod
+    def get_publish_outbox(cls, context: Dict) -> PublishOutbox:
+        # Messages published with wait=False are queued in a bounded outbox, which is flushed when the service stops.
+        amqp_options: Options.AMQP = cls.options(context).amqp
+        return get_publish_outbox(
+            context,
+            "amqp",
+            max_size=amqp_options.publish_outbox_max_size,
+            concurrency=amqp_options.publish_outbox_concurrency,
+            shutdown_timeout=amqp_options.publish_outbox_shutdown_timeout,
+        )
 
     @classmethod
     def get_routing_key(
@@ -214,26 +228,11 @@ class AmqpTransport(Invoker):
             if envelope_kwargs_validation_func:
                 envelope_kwargs_validation_func(**parser_kwargs)
 
-        _callback_kwargs: Any = callback_kwargs
-        values = inspect.getfullargspec(func)
-        if not _callback_kwargs:
-            _callback_kwargs = (
-                {
-                    k: values.defaults[i - len(values.args) + 1]
-                    if values.defaults and i >= len(values.args) - len(values.defaults) - 1
-                    else None
-                    for i, k in enumerate(values.args[1:])
-                }
-                if values.args and len(values.args) > 1
-                else {}
-            )
-        else:
-            _callback_kwargs = {k: None for k in _callback_kwargs if k != "self"}
-        original_kwargs: Dict[str, Any] = {k: v for k, v in _callback_kwargs.items()}
+        argument_binding = ArgumentBinding(
+            func, callback_kwargs, enveloped=bool(message_envelope), context_names=("routing_key",)
+        )
 
         async def handler(payload: Any, delivery_tag: Any, routing_key: str) -> Any:
-            kwargs = dict(original_kwargs)
-
             message = payload
             message_uuid = None
             message_key = None
@@ -246,34 +245,22 @@ class AmqpTransport(Invoker):
                         else:
                             message, message_uuid, timestamp = await parse_message_func(payload)
                     if message_uuid:
-                        if not context.get("_amqp_received_messages"):
-                            context["_amqp_received_messages"] = {}
                         message_key = "{}:{}".format(message_uuid, func.__name__)
-                        if context["_amqp_received_messages"].get(message_key):
+                        if not cls.get_received_messages(context).add(message_key):
                             return
-                        context["_amqp_received_messages"][message_key] = time.time()
-                        _received_messages = context["_amqp_received_messages"]
-                        if (
-                            _received_messages
-                            and isinstance(_received_messages, dict)
-                            and len(_received_messages) > 100000
-                        ):
-                            context["_amqp_received_messages"] = {
-                                k: v for k, v in context["_amqp_received_messages"].items() if v > time.time() - 60
-                            }
-
-                    if _callback_kwargs:
-                        for k, v in message.items():
-                            if k in _callback_kwargs:
-                                kwargs[k] = v
-                        if "message" in _callback_kwargs and (
-                            not isinstance(message, dict) or "message" not in message
-                        ):
-                            kwargs["message"] = message
-                        if "routing_key" in _callback_kwargs and (
-                            not isinstance(message, dict) or "routing_key" not in message
-                        ):
-                            kwargs["routing_key"] = routing_key
+
+                    kwargs = argument_binding.kwargs(message, routing_key)
+                except BlobStoreFetchError as e:
+                    # The message is requeued after a delay, so that an unavailable blob store isn't retried in a
+                    # tight loop of redeliveries. The delayed nack runs as a separate task, since the consumer
+                    # callback is awaited inline by the channel and would otherwise block every other consumer.
+                    logging.getLogger("transport.amqp").warning(
+                        "Unable to fetch message data from blob store ({}) - message requeued in {} seconds".format(
+                            str(e), BLOB_STORE_FETCH_RETRY_DELAY
+                        )
+                    )
+                    cls.delayed_nack(delivery_tag, BLOB_STORE_FETCH_RETRY_DELAY)
+                    return
                 except (Exception, asyncio.CancelledError, BaseException) as e:
                     logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
                     if message is not False and not message_uuid:
@@ -284,33 +271,11 @@ class AmqpTransport(Invoker):
                         await cls.channel.basic_client_ack(delivery_tag)
                     return
             else:
-                if _callback_kwargs:
-                    if "message" in _callback_kwargs:
-                        kwargs["message"] = message
-                    if "routing_key" in _callback_kwargs:
-                        kwargs["routing_key"] = routing_key
-
-                if len(values.args[1:]) and values.args[1] in kwargs:
-                    del kwargs[values.args[1]]
+                kwargs = argument_binding.kwargs(message, routing_key)
 
             @functools.wraps(func)
             async def routine_func(*a: Any, **kw: Any) -> Any:
-                if not message_envelope and len(values.args[1:]) and len(values.args[2:]) == len(a):
-                    routine = func(*(obj, message, *a))
-                elif not message_envelope and len(values.args[1:]) and len(merge_dicts(kwargs, kw)):
-                    routine = func(*(obj, message, *a), **merge_dicts(kwargs, kw))
-                elif len(merge_dicts(kwargs, kw)):
-                    routine = func(*(obj, *a), **merge_dicts(kwargs, kw))
-                elif len(values.args[1:]):
-                    routine = func(*(obj, message, *a), **kw)
-                else:
-                    routine = func(*(obj, *a), **kw)
-
-                if inspect.isawaitable(routine):
-                    return_value = await routine
-                else:
-                    return_value = routine
-
+                return_value = await argument_binding.call(obj, message, kwargs, a, kw)
                 await cls.channel.basic_client_ack(delivery_tag)
                 return return_value
 
@@ -327,7 +292,7 @@ class AmqpTransport(Invoker):
                     (AmqpInternalServiceError, AmqpInternalServiceErrorException, AmqpInternalServiceException),
                 ):
                     if message_key:
-                        del context["_amqp_received_messages"][message_key]
+                        cls.get_received_messages(context).discard(message_key)
                     await cls.channel.basic_client_nack(delivery_tag)
                 else:
                     await cls.channel.basic_client_ack(delivery_tag)
@@ -342,6 +307,34 @@ class AmqpTransport(Invoker):
         start_func = cls.subscribe(obj, context)
         return (await start_func) if start_func else None
 
+    @classmethod
+    def get_received_messages(cls, context: Dict) -> DeduplicationCache:
+        received_messages: Optional[DeduplicationCache] = context.get("_amqp_received_messages")
+        if received_messages is None:
+            amqp_options: Options.AMQP = cls.options(context).amqp
+            received_messages = DeduplicationCache(
+                max_size=amqp_options.message_deduplication_max_size,
+                ttl=amqp_options.message_deduplication_ttl,
+            )
+            context["_amqp_received_messages"] = received_messages
+
+        return received_messages
+
+    @classmethod
+    def delayed_nack(cls, delivery_tag: Any, delay: Union[int, float]) -> None:
+        async def _nack() -> None:
+            await asyncio.sleep(delay)
+            try:
+                if cls.channel:
+                    await cls.channel.basic_client_nack(delivery_tag)
+            except Exception:
+                pass  # unacked messages are requeued by the broker when the channel is closed
+
+        # Pending nacks are cancelled when the service is stopped.
+        task = asyncio.ensure_future(_nack())
+        cls.delayed_nacks.add(task)
+        task.add_done_callback(cls.delayed_nacks.discard)
+
     @classmethod
     async def connect(cls, obj: Any, context: Dict) -> Any:
         logging.getLogger("aioamqp.protocol").setLevel(logging.WARNING)
@@ -394,6 +387,9 @@ class AmqpTransport(Invoker):
             stop_method = getattr(obj, "_stop_service", None)
 
             async def stop_service(*args: Any, **kwargs: Any) -> None:
+                await flush_publish_outboxes(context, "amqp")
+                for task in list(cls.delayed_nacks):
+                    task.cancel()
                 logging.getLogger("aioamqp.protocol").setLevel(logging.ERROR)
                 await cls.protocol.close()
                 cls.transport.close()
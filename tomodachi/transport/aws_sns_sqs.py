@@ -14,6 +14,7 @@ import time
 import uuid
 from typing import (
     Any,
+    Awaitable,
     Callable,
     Coroutine,
     Dict,
@@ -21,6 +22,7 @@ from typing import (
     Literal,
     Mapping,
     Match,
+    NamedTuple,
     Optional,
     Sequence,
     Set,
@@ -38,14 +40,23 @@ import botocore.exceptions
 from botocore.parsers import ResponseParserError
 
 from tomodachi import get_contextvar
+from tomodachi.envelope.blob_store import BlobStoreFetchError
 from tomodachi.helpers.aiobotocore_connector import ClientConnector
+from tomodachi.helpers.arguments import ArgumentBinding
+from tomodachi.helpers.backoff import EmptyReceiveBackoff
+from tomodachi.helpers.batching import BatchAccumulator
+from tomodachi.helpers.circuit_breaker import CircuitOpenError
+from tomodachi.helpers.deduplication import DeduplicationCache
 from tomodachi.helpers.dict import merge_dicts
 from tomodachi.helpers.execution_context import (
     decrease_execution_context_value,
     increase_execution_context_value,
     set_execution_context,
 )
+from tomodachi.helpers.limiter import InFlightLimiter
 from tomodachi.helpers.middleware import execute_middlewares
+from tomodachi.helpers.outbox import PublishOutbox, flush_publish_outboxes, get_publish_outbox
+from tomodachi.helpers.resource_cache import ResourceCache
 from tomodachi.invoker import Invoker
 from tomodachi.options import Options
 
@@ -57,7 +68,22 @@ MESSAGE_TOPIC_ATTRIBUTES = "dc6c667f-4c22-4a63-85f6-3ea0c7e2db49"
 FILTER_POLICY_DEFAULT = "7e68632f-3b39-4293-b5a9-16644cf857a5"
 DEAD_LETTER_QUEUE_DEFAULT = "22ebae61-1aab-4b2e-840f-008da1f45472"
 VISIBILITY_TIMEOUT_DEFAULT = -1
+VISIBILITY_TIMEOUT_QUEUE_DEFAULT = 30
 MAX_RECEIVE_COUNT_DEFAULT = -1
+MESSAGE_KEPT_IN_QUEUE = "bf2fc18b-0759-49ab-8e74-881767d888a4"
+PUBLISH_BATCH_MAX_ENTRIES = 10
+PUBLISH_BATCH_MAX_SIZE = 262144
+WARM_UP_REQUEST_TIMEOUT = 10
+BLOB_STORE_FETCH_RETRY_DELAY = 30
+BLOB_STORE_FETCH_RETRY_MAX_DELAY = 900
+SUBSCRIBE_QUEUE_ATTRIBUTE_NAMES = (
+    "Policy",
+    "RedrivePolicy",
+    "VisibilityTimeout",
+    "MessageRetentionPeriod",
+    "KmsMasterKeyId",
+    "KmsDataKeyReusePeriodSeconds",
+)
 
 SET_CONTEXTVAR_VALUES = False
 
@@ -135,6 +161,15 @@ class AWSSNSSQSInternalServiceException(AWSSNSSQSInternalServiceError):
     pass
 
 
+class AWSSNSSQSBatchMessage(NamedTuple):
+    message: Any
+    message_attributes: Dict[str, Any]
+    receipt_handle: Optional[str]
+    approximate_receive_count: Optional[int]
+    topic: str
+    message_uuid: Optional[str]
+
+
 class AWSSNSSQSTransport(Invoker):
     topics: Dict[str, str] = {}
     close_waiter: Optional[asyncio.Future] = None
@@ -156,7 +191,7 @@ class AWSSNSSQSTransport(Invoker):
         group_id: Optional[str] = None,
         deduplication_id: Optional[str] = None,
         **kwargs: Any,
-    ) -> None:
+    ) -> Optional[str]:
         if message_envelope == MESSAGE_ENVELOPE_DEFAULT and message_protocol != MESSAGE_ENVELOPE_DEFAULT:
             # Fallback if deprecated message_protocol keyword is used
             message_envelope = message_protocol
@@ -189,8 +224,9 @@ class AWSSNSSQSTransport(Invoker):
             overwrite_attributes=overwrite_topic_attributes,
         )
 
-        async def _publish_message() -> None:
-            await cls.publish_message(
+        async def _publish_message() -> str:
+            # The message id of the published message, also when it's published as part of a coalesced batch.
+            return await cls.publish_message(
                 topic_arn,
                 payload,
                 cast(Dict, message_attributes),
@@ -200,10 +236,107 @@ class AWSSNSSQSTransport(Invoker):
             )
 
         if wait:
-            await _publish_message()
-        else:
-            loop: Any = asyncio.get_event_loop()
-            loop.create_task(_publish_message())
+            return await _publish_message()
+
+        await cls.get_publish_outbox(service.context).put(_publish_message)
+        return None
+
+    @classmethod
+    async def publish_batch(
+        cls,
+        service: Any,
+        items: Sequence[Any],
+        topic: str,
+        wait: bool = True,
+        *,
+        message_envelope: Any = MESSAGE_ENVELOPE_DEFAULT,
+        message_protocol: Any = MESSAGE_ENVELOPE_DEFAULT,  # deprecated
+        topic_prefix: Optional[str] = MESSAGE_TOPIC_PREFIX,
+        message_attributes: Optional[Union[Dict[str, Any], Sequence[Optional[Dict[str, Any]]]]] = None,
+        topic_attributes: Optional[Union[str, Dict[str, Union[bool, str]]]] = MESSAGE_TOPIC_ATTRIBUTES,
+        overwrite_topic_attributes: bool = False,
+        group_id: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        deduplication_id: Optional[Union[str, Sequence[Optional[str]]]] = None,
+        **kwargs: Any,
+    ) -> Optional[List[str]]:
+        if message_envelope == MESSAGE_ENVELOPE_DEFAULT and message_protocol != MESSAGE_ENVELOPE_DEFAULT:
+            # Fallback if deprecated message_protocol keyword is used
+            message_envelope = message_protocol
+
+        message_envelope = (
+            getattr(service, "message_envelope", getattr(service, "message_protocol", None))
+            if message_envelope == MESSAGE_ENVELOPE_DEFAULT
+            else message_envelope
+        )
+
+        items = list(items)
+
+        def _per_item(value: Any, name: str) -> List[Any]:
+            # A single value applies to every item, while a list or tuple holds one value per item.
+            if isinstance(value, (list, tuple)):
+                if len(value) != len(items):
+                    raise AWSSNSSQSException(
+                        "The number of {} values doesn't match the number of items to publish".format(name),
+                        log_level=service.context.get("log_level"),
+                    )
+                return list(value)
+            return [value] * len(items)
+
+        message_attributes_list = _per_item(message_attributes, "message_attributes")
+        group_id_list = _per_item(group_id, "group_id")
+        deduplication_id_list = _per_item(deduplication_id, "deduplication_id")
+
+        if any(value is not None for value in group_id_list) and any(value is None for value in group_id_list):
+            raise AWSSNSSQSException(
+                "Either all or none of the items published to a topic must have a group_id",
+                log_level=service.context.get("log_level"),
+            )
+
+        entries: List[Tuple[Any, Dict, Optional[str], Optional[str]]] = []
+        build_message_func = getattr(message_envelope, "build_message", None) if message_envelope else None
+        for data, item_message_attributes, item_group_id, item_deduplication_id in zip(
+            items, message_attributes_list, group_id_list, deduplication_id_list
+        ):
+            item_message_attributes = copy.deepcopy(item_message_attributes) if item_message_attributes else {}
+            payload = data
+            if build_message_func:
+                payload = await build_message_func(
+                    service, topic, data, message_attributes=item_message_attributes, **kwargs
+                )
+            entries.append((payload, item_message_attributes, item_group_id, item_deduplication_id))
+
+        if not entries:
+            return [] if wait else None
+
+        topic_arn = await cls.create_topic(
+            topic,
+            service.context,
+            topic_prefix,
+            fifo=group_id_list[0] is not None,
+            attributes=topic_attributes,
+            overwrite_attributes=overwrite_topic_attributes,
+        )
+
+        async def _publish_message_batch() -> List[str]:
+            return await cls.publish_message_batch(topic_arn, entries, service.context)
+
+        if wait:
+            return await _publish_message_batch()
+
+        await cls.get_publish_outbox(service.context).put(_publish_message_batch)
+        return None
+
+    @classmethod
+    def get_publish_outbox(cls, context: Dict) -> PublishOutbox:
+        # Messages published with wait=False are queued in a bounded outbox, which is flushed when the service stops.
+        aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+        return get_publish_outbox(
+            context,
+            "aws_sns_sqs",
+            max_size=aws_sns_sqs_options.publish_outbox_max_size,
+            concurrency=aws_sns_sqs_options.publish_outbox_concurrency,
+            shutdown_timeout=aws_sns_sqs_options.publish_outbox_shutdown_timeout,
+        )
 
     @classmethod
     def get_topic_name(
@@ -328,10 +461,33 @@ class AWSSNSSQSTransport(Invoker):
         dead_letter_queue_name: Optional[str] = DEAD_LETTER_QUEUE_DEFAULT,
         max_receive_count: Optional[int] = MAX_RECEIVE_COUNT_DEFAULT,
         fifo: bool = False,
+        pollers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        batch: bool = False,
+        priority: Optional[Union[int, float]] = None,
         **kwargs: Any,
     ) -> Any:
         parser_kwargs = kwargs
 
+        if batch is not True and batch is not False:
+            raise Exception("SQS batch is invalid")
+
+        if pollers is not None and (not isinstance(pollers, int) or pollers is True or pollers is False or pollers < 1):
+            raise Exception("SQS pollers is invalid")
+
+        if max_concurrency is not None and (
+            not isinstance(max_concurrency, int)
+            or max_concurrency is True
+            or max_concurrency is False
+            or max_concurrency < 1
+        ):
+            raise Exception("SQS max_concurrency is invalid")
+
+        if priority is not None and (
+            not isinstance(priority, (int, float)) or priority is True or priority is False or priority <= 0
+        ):
+            raise Exception("SQS priority is invalid")
+
         if message_envelope == MESSAGE_ENVELOPE_DEFAULT and message_protocol != MESSAGE_ENVELOPE_DEFAULT:
             # Fallback if deprecated message_protocol keyword is used
             message_envelope = message_protocol
@@ -348,22 +504,13 @@ class AWSSNSSQSTransport(Invoker):
             if envelope_kwargs_validation_func:
                 envelope_kwargs_validation_func(**parser_kwargs)
 
-        _callback_kwargs: Any = callback_kwargs
-        values = inspect.getfullargspec(func)
-        if not _callback_kwargs:
-            _callback_kwargs = (
-                {
-                    k: values.defaults[i - len(values.args) + 1]
-                    if values.defaults and i >= len(values.args) - len(values.defaults) - 1
-                    else None
-                    for i, k in enumerate(values.args[1:])
-                }
-                if values.args and len(values.args) > 1
-                else {}
-            )
-        else:
-            _callback_kwargs = {k: None for k in _callback_kwargs if k != "self"}
-        original_kwargs = {k: v for k, v in _callback_kwargs.items()}
+        argument_binding = ArgumentBinding(
+            func,
+            callback_kwargs,
+            enveloped=bool(message_envelope),
+            context_names=("topic", "receipt_handle", "queue_url", "message_attributes", "approximate_receive_count"),
+        )
+        _callback_kwargs = argument_binding.defaults
 
         async def handler(
             payload: Optional[str],
@@ -375,13 +522,11 @@ class AWSSNSSQSTransport(Invoker):
         ) -> Any:
             if not payload or payload == DRAIN_MESSAGE_PAYLOAD:
                 try:
-                    await cls.delete_message(receipt_handle, queue_url, context)
+                    await cls.enqueue_delete_message(receipt_handle, queue_url, context)
                 except (Exception, asyncio.CancelledError):
                     pass
                 return
 
-            kwargs = dict(original_kwargs)
-
             if SET_CONTEXTVAR_VALUES:
                 # experimental featureset - set values to contextvars
                 get_contextvar("aws_sns_sqs.receipt_handle").set(receipt_handle)
@@ -406,90 +551,156 @@ class AWSSNSSQSTransport(Invoker):
                         else:
                             message, message_uuid, timestamp = await parse_message_func(payload)
                     if message is not False and message_uuid:
-                        if not context.get("_aws_sns_sqs_received_messages"):
-                            context["_aws_sns_sqs_received_messages"] = {}
                         message_key = "{}:{}".format(message_uuid, func.__name__)
-                        if context["_aws_sns_sqs_received_messages"].get(message_key):
+                        if not cls.get_received_messages(context).add(message_key):
                             return
-                        context["_aws_sns_sqs_received_messages"][message_key] = time.time()
-                        _received_messages = context["_aws_sns_sqs_received_messages"]
-                        if (
-                            _received_messages
-                            and isinstance(_received_messages, dict)
-                            and len(_received_messages) > 100000
-                        ):
-                            context["_aws_sns_sqs_received_messages"] = {
-                                k: v
-                                for k, v in context["_aws_sns_sqs_received_messages"].items()
-                                if v > time.time() - 60
-                            }
-
-                    if _callback_kwargs:
-                        if isinstance(message, dict):
-                            for k, v in message.items():
-                                if k in _callback_kwargs:
-                                    kwargs[k] = v
-                        if "message" in _callback_kwargs and (
-                            not isinstance(message, dict) or "message" not in message
-                        ):
-                            kwargs["message"] = message
-                        if "topic" in _callback_kwargs and (not isinstance(message, dict) or "topic" not in message):
-                            kwargs["topic"] = topic
-                        if "receipt_handle" in _callback_kwargs and (
-                            not isinstance(message, dict) or "receipt_handle" not in message
-                        ):
-                            kwargs["receipt_handle"] = receipt_handle
-                        if "queue_url" in _callback_kwargs and (
-                            not isinstance(message, dict) or "queue_url" not in message
-                        ):
-                            kwargs["queue_url"] = queue_url
-                        if "message_attributes" in _callback_kwargs and (
-                            not isinstance(message, dict) or "message_attributes" not in message
-                        ):
-                            kwargs["message_attributes"] = message_attributes_values
-                        if "approximate_receive_count" in _callback_kwargs and (
-                            not isinstance(message, dict) or "approximate_receive_count" not in message
-                        ):
-                            kwargs["approximate_receive_count"] = approximate_receive_count
+
+                    kwargs = argument_binding.kwargs(
+                        message, topic, receipt_handle, queue_url, message_attributes_values, approximate_receive_count
+                    )
+                except BlobStoreFetchError as e:
+                    await cls.delay_message_redelivery(
+                        receipt_handle, approximate_receive_count, queue_url, context, str(e)
+                    )
+                    return MESSAGE_KEPT_IN_QUEUE
                 except (Exception, asyncio.CancelledError, BaseException) as e:
                     logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
                     if message is not False and not message_uuid:
-                        await cls.delete_message(receipt_handle, queue_url, context)
+                        await cls.enqueue_delete_message(receipt_handle, queue_url, context)
                     elif message is False and message_uuid:
                         pass  # incompatible envelope, should probably delete if old message
                     elif message is False:
-                        await cls.delete_message(receipt_handle, queue_url, context)
+                        await cls.enqueue_delete_message(receipt_handle, queue_url, context)
                     return
             else:
-                if _callback_kwargs:
-                    if "message" in _callback_kwargs:
-                        kwargs["message"] = message
-                    if "topic" in _callback_kwargs:
-                        kwargs["topic"] = topic
-                    if "receipt_handle" in _callback_kwargs:
-                        kwargs["receipt_handle"] = receipt_handle
-                    if "queue_url" in _callback_kwargs:
-                        kwargs["queue_url"] = queue_url
-                    if "message_attributes" in _callback_kwargs:
-                        kwargs["message_attributes"] = message_attributes_values
-                    if "approximate_receive_count" in _callback_kwargs:
-                        kwargs["approximate_receive_count"] = approximate_receive_count
-
-                if len(values.args[1:]) and values.args[1] in kwargs:
-                    del kwargs[values.args[1]]
+                kwargs = argument_binding.kwargs(
+                    message, topic, receipt_handle, queue_url, message_attributes_values, approximate_receive_count
+                )
+
+            middlewares = context.get("message_middleware")
+            routine_func: Callable[..., Awaitable]
+            if middlewares:
+
+                @functools.wraps(func)
+                async def routine_func(*a: Any, **kw: Any) -> Any:
+                    return await argument_binding.call(obj, message, kwargs, a, kw)
+
+            else:
+                routine_func = functools.partial(argument_binding.call, obj, message, kwargs)
+
+            increase_execution_context_value("aws_sns_sqs_current_tasks")
+            increase_execution_context_value("aws_sns_sqs_total_tasks")
+            keep_message_in_queue = False
+            try:
+                return_value = await execute_middlewares(func, routine_func, middlewares or [], *(obj, message, topic))
+            except (Exception, asyncio.CancelledError, BaseException) as e:
+                # todo: don't log exception in case the error is of a AWSSNSSQSInternalServiceError (et. al) type
+                logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
+                return_value = None
+                if issubclass(
+                    e.__class__,
+                    (
+                        AWSSNSSQSInternalServiceError,
+                        AWSSNSSQSInternalServiceErrorException,
+                        AWSSNSSQSInternalServiceException,
+                    ),
+                ):
+                    keep_message_in_queue = True
+                    if message_key:
+                        cls.get_received_messages(context).discard(message_key)
+
+            if not keep_message_in_queue:
+                await cls.enqueue_delete_message(receipt_handle, queue_url, context)
+            decrease_execution_context_value("aws_sns_sqs_current_tasks")
+
+            if keep_message_in_queue:
+                return MESSAGE_KEPT_IN_QUEUE
+
+            return return_value
+
+        async def batch_handler(
+            received_messages: List[Tuple[Optional[str], Optional[str], str, Optional[Dict], Optional[int]]],
+            queue_url: Optional[str] = None,
+        ) -> Any:
+            # Received messages are tuples of (payload, receipt_handle, message_topic, message_attributes,
+            # approximate_receive_count), which are parsed and then passed as a list in one call to the handler.
+            messages: List[AWSSNSSQSBatchMessage] = []
+            message_keys: Dict[Optional[str], str] = {}
+
+            for (
+                payload,
+                receipt_handle,
+                message_topic,
+                message_attributes,
+                approximate_receive_count,
+            ) in received_messages:
+                if not payload or payload == DRAIN_MESSAGE_PAYLOAD:
+                    try:
+                        await cls.enqueue_delete_message(receipt_handle, queue_url, context)
+                    except (Exception, asyncio.CancelledError):
+                        pass
+                    continue
+
+                message: Any = payload
+                message_attributes_values: Dict[str, Any] = (
+                    cls.transform_message_attributes_from_response(message_attributes) if message_attributes else {}
+                )
+                message_uuid = None
+
+                if message_envelope:
+                    try:
+                        parse_message_func = getattr(message_envelope, "parse_message", None)
+                        if parse_message_func:
+                            if len(parser_kwargs):
+                                message, message_uuid, timestamp = await parse_message_func(
+                                    payload, message_attributes=message_attributes_values, **parser_kwargs
+                                )
+                            else:
+                                message, message_uuid, timestamp = await parse_message_func(payload)
+                        if message is not False and message_uuid:
+                            message_key = "{}:{}".format(message_uuid, func.__name__)
+                            if not cls.get_received_messages(context).add(message_key):
+                                continue
+                            message_keys[receipt_handle] = message_key
+                    except BlobStoreFetchError as e:
+                        await cls.delay_message_redelivery(
+                            receipt_handle, approximate_receive_count, queue_url, context, str(e)
+                        )
+                        continue
+                    except (Exception, asyncio.CancelledError, BaseException) as e:
+                        logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
+                        if message is not False and not message_uuid:
+                            await cls.enqueue_delete_message(receipt_handle, queue_url, context)
+                        elif message is False and message_uuid:
+                            pass  # incompatible envelope, should probably delete if old message
+                        elif message is False:
+                            await cls.enqueue_delete_message(receipt_handle, queue_url, context)
+                        continue
+
+                messages.append(
+                    AWSSNSSQSBatchMessage(
+                        message=message,
+                        message_attributes=message_attributes_values,
+                        receipt_handle=receipt_handle,
+                        approximate_receive_count=approximate_receive_count,
+                        topic=message_topic,
+                        message_uuid=message_uuid,
+                    )
+                )
+
+            if not messages:
+                return None
+
+            kwargs = {}
+            if _callback_kwargs:
+                if "topic" in _callback_kwargs:
+                    kwargs["topic"] = topic
+                if "queue_url" in _callback_kwargs:
+                    kwargs["queue_url"] = queue_url
 
             @functools.wraps(func)
             async def routine_func(*a: Any, **kw: Any) -> Any:
-                if not message_envelope and len(values.args[1:]) and len(values.args[2:]) == len(a):
-                    routine = func(*(obj, message, *a))
-                elif not message_envelope and len(values.args[1:]) and len(merge_dicts(kwargs, kw)):
-                    routine = func(*(obj, message, *a), **merge_dicts(kwargs, kw))
-                elif len(merge_dicts(kwargs, kw)):
-                    routine = func(*(obj, *a), **merge_dicts(kwargs, kw))
-                elif len(values.args[1:]):
-                    routine = func(*(obj, message, *a), **kw)
-                else:
-                    routine = func(*(obj, *a), **kw)
+                routine = func(*(obj, messages, *a), **merge_dicts(kwargs, kw))
 
                 if inspect.isawaitable(routine):
                     return_value = await routine
@@ -500,13 +711,13 @@ class AWSSNSSQSTransport(Invoker):
 
             increase_execution_context_value("aws_sns_sqs_current_tasks")
             increase_execution_context_value("aws_sns_sqs_total_tasks")
-            keep_message_in_queue = False
+            failed_receipt_handles: Set[Optional[str]] = set()
             try:
                 return_value = await execute_middlewares(
-                    func, routine_func, context.get("message_middleware", []), *(obj, message, topic)
+                    func, routine_func, context.get("message_middleware", []), *(obj, messages, topic)
                 )
+                failed_receipt_handles = cls.get_failed_batch_receipt_handles(messages, return_value)
             except (Exception, asyncio.CancelledError, BaseException) as e:
-                # todo: don't log exception in case the error is of a AWSSNSSQSInternalServiceError (et. al) type
                 logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
                 return_value = None
                 if issubclass(
@@ -517,12 +728,15 @@ class AWSSNSSQSTransport(Invoker):
                         AWSSNSSQSInternalServiceException,
                     ),
                 ):
-                    keep_message_in_queue = True
-                    if message_key:
-                        del context["_aws_sns_sqs_received_messages"][message_key]
+                    failed_receipt_handles = {batch_message.receipt_handle for batch_message in messages}
 
-            if not keep_message_in_queue:
-                await cls.delete_message(receipt_handle, queue_url, context)
+            # Failed messages are kept in the queue for redelivery, while the rest of the batch is deleted.
+            for batch_message in messages:
+                if batch_message.receipt_handle in failed_receipt_handles:
+                    if batch_message.receipt_handle in message_keys:
+                        cls.get_received_messages(context).discard(message_keys[batch_message.receipt_handle])
+                    continue
+                await cls.enqueue_delete_message(batch_message.receipt_handle, queue_url, context)
             decrease_execution_context_value("aws_sns_sqs_current_tasks")
 
             return return_value
@@ -543,18 +757,93 @@ class AWSSNSSQSTransport(Invoker):
                 competing,
                 queue_name,
                 func,
-                handler,
+                handler if not batch else batch_handler,
                 attributes,
                 visibility_timeout,
                 dead_letter_queue_name,
                 max_receive_count,
                 fifo,
+                pollers,
+                max_concurrency,
+                batch,
+                priority,
             )
         )
 
         start_func = cls.subscribe(obj, context)
         return (await start_func) if start_func else None
 
+    @classmethod
+    async def delay_message_redelivery(
+        cls,
+        receipt_handle: Optional[str],
+        approximate_receive_count: Optional[int],
+        queue_url: Optional[str],
+        context: Dict,
+        error_message: str,
+    ) -> None:
+        # A message which data couldn't be fetched from the blob store is kept in the queue, with a visibility timeout
+        # that doubles with each receive, so that an unavailable store isn't retried in a tight loop.
+        delay = min(
+            BLOB_STORE_FETCH_RETRY_DELAY * 2 ** min(max((approximate_receive_count or 1) - 1, 0), 10),
+            BLOB_STORE_FETCH_RETRY_MAX_DELAY,
+        )
+        logging.getLogger("transport.aws_sns_sqs").warning(
+            "Unable to fetch message data from blob store ({}) - message redelivered in {} seconds".format(
+                error_message, delay
+            )
+        )
+        if not receipt_handle or not queue_url:
+            return
+
+        try:
+            await cls.change_message_visibility_batch([receipt_handle], delay, queue_url, context)
+        except (Exception, asyncio.CancelledError) as e:
+            logging.getLogger("transport.aws_sns_sqs").warning(
+                "Unable to change visibility timeout of message ({})".format(str(e))
+            )
+
+    @staticmethod
+    def get_failed_batch_receipt_handles(
+        messages: Sequence[AWSSNSSQSBatchMessage], return_value: Any
+    ) -> Set[Optional[str]]:
+        # A batch handler may return either a list of the failed messages (or their receipt handles), or a list of
+        # per-message results in the same order as the messages, where False or an exception marks a failure.
+        if not isinstance(return_value, (list, tuple, set)):
+            return set()
+
+        results = list(return_value)
+        if len(results) == len(messages) and not any(
+            isinstance(result, (AWSSNSSQSBatchMessage, str)) for result in results
+        ):
+            return {
+                batch_message.receipt_handle
+                for batch_message, result in zip(messages, results)
+                if result is False or isinstance(result, BaseException)
+            }
+
+        failed_receipt_handles: Set[Optional[str]] = set()
+        for result in results:
+            if isinstance(result, AWSSNSSQSBatchMessage):
+                failed_receipt_handles.add(result.receipt_handle)
+            elif isinstance(result, str):
+                failed_receipt_handles.add(result)
+
+        return failed_receipt_handles
+
+    @classmethod
+    def get_received_messages(cls, context: Dict) -> DeduplicationCache:
+        received_messages: Optional[DeduplicationCache] = context.get("_aws_sns_sqs_received_messages")
+        if received_messages is None:
+            aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+            received_messages = DeduplicationCache(
+                max_size=aws_sns_sqs_options.message_deduplication_max_size,
+                ttl=aws_sns_sqs_options.message_deduplication_ttl,
+            )
+            context["_aws_sns_sqs_received_messages"] = received_messages
+
+        return received_messages
+
     @staticmethod
     async def create_client(name: str, context: Dict) -> None:
         alias = f"tomodachi.{name}"
@@ -570,7 +859,35 @@ class AWSSNSSQSTransport(Invoker):
             "endpoint_url": options.aws_endpoint_urls.get(name, None),
         }
 
+        dns_cache_ttl = options.aws_sns_sqs.dns_cache_ttl
+        if dns_cache_ttl is not None and (
+            not isinstance(dns_cache_ttl, int) or dns_cache_ttl is True or dns_cache_ttl is False or dns_cache_ttl < 1
+        ):
+            raise ValueError("Bad value for aws_sns_sqs option dns_cache_ttl: {}".format(str(dns_cache_ttl)))
+
         connector.setup_credentials(alias, credentials)
+        try:
+            connector.configure_pool(
+                alias,
+                clients=options.aws_sns_sqs.client_pool_size,
+                max_pool_connections=options.aws_sns_sqs.client_pool_max_connections,
+                selection=options.aws_sns_sqs.client_pool_selection,
+                connector_args={"ttl_dns_cache": dns_cache_ttl} if dns_cache_ttl else None,
+            )
+        except ValueError as e:
+            raise ValueError("Bad value for aws_sns_sqs option client_pool_* ({})".format(str(e))) from e
+        try:
+            connector.configure_retry_policy(
+                alias,
+                failure_threshold=options.aws_sns_sqs.circuit_breaker_failure_threshold,
+                reset_timeout=options.aws_sns_sqs.circuit_breaker_reset_timeout,
+                retry_budget_max_tokens=options.aws_sns_sqs.retry_budget_max_tokens,
+                retry_budget_ratio=options.aws_sns_sqs.retry_budget_ratio,
+            )
+        except ValueError as e:
+            raise ValueError(
+                "Bad value for aws_sns_sqs option circuit_breaker_* / retry_budget_* ({})".format(str(e))
+            ) from e
 
         logging.getLogger("botocore.vendored.requests.packages.urllib3.connectionpool").setLevel(logging.WARNING)
 
@@ -583,6 +900,66 @@ class AWSSNSSQSTransport(Invoker):
             )
             raise AWSSNSSQSConnectionException(error_message, log_level=context.get("log_level")) from e
 
+    @classmethod
+    def get_retry_max_attempts(cls, context: Dict, default: int) -> int:
+        # Max number of attempts of requests that are retried on failure. Retries are further limited by the retry
+        # budget and circuit breaker of the connector, which are shared by all requests to the same endpoint.
+        retry_max_attempts = cls.options(context).aws_sns_sqs.retry_max_attempts
+        if retry_max_attempts is None:
+            return default
+        if (
+            not isinstance(retry_max_attempts, int)
+            or retry_max_attempts is True
+            or retry_max_attempts is False
+            or retry_max_attempts < 1
+        ):
+            raise ValueError("Bad value for aws_sns_sqs option retry_max_attempts: {}".format(str(retry_max_attempts)))
+        return retry_max_attempts
+
+    @classmethod
+    async def warm_up(cls, context: Dict) -> None:
+        # Opens connections to the AWS SNS and AWS SQS endpoints while the service is starting, so that the first
+        # requests of the service don't have to wait for client creation, DNS lookups and TLS handshakes.
+        options: Options = cls.options(context)
+        warm_up_connections = options.aws_sns_sqs.warm_up_connections
+        if (
+            not isinstance(warm_up_connections, int)
+            or warm_up_connections is True
+            or warm_up_connections is False
+            or warm_up_connections < 0
+        ):
+            raise ValueError(
+                "Bad value for aws_sns_sqs option warm_up_connections: {}".format(str(warm_up_connections))
+            )
+        if not warm_up_connections:
+            return
+
+        connections = min(warm_up_connections, options.aws_sns_sqs.client_pool_max_connections)
+
+        async def _warm_up_sns(client: Any) -> None:
+            await asyncio.wait_for(client.list_topics(), timeout=WARM_UP_REQUEST_TIMEOUT)
+
+        async def _warm_up_sqs(client: Any) -> None:
+            await asyncio.wait_for(client.list_queues(MaxResults=1), timeout=WARM_UP_REQUEST_TIMEOUT)
+
+        for name, request in (("sns", _warm_up_sns), ("sqs", _warm_up_sqs)):
+            if not connector.get_client(f"tomodachi.{name}"):
+                await cls.create_client(name, context)
+            try:
+                await connector.warm_up(f"tomodachi.{name}", name, request, connections=connections)
+            except (
+                botocore.exceptions.NoCredentialsError,
+                botocore.exceptions.PartialCredentialsError,
+                botocore.exceptions.NoRegionError,
+            ):
+                raise
+            except (Exception, asyncio.TimeoutError) as e:
+                # A failed warm-up only means that the first requests will be slower, which isn't reason to fail.
+                error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
+                logging.getLogger("transport.aws_sns_sqs").warning(
+                    "Unable to warm up connections to AWS [{}] ({})".format(name, error_message)
+                )
+
     @classmethod
     async def create_topic(
         cls,
@@ -602,6 +979,41 @@ class AWSSNSSQSTransport(Invoker):
             if topic_arn and isinstance(topic_arn, str):
                 return topic_arn
 
+        resource_cache = cls.get_resource_cache(context)
+        cache_key = cls.get_resource_cache_key(
+            "topic", "sns", context, cls.get_topic_name(topic, context, fifo, topic_prefix)
+        )
+        attributes_hash = ResourceCache.attributes_hash(
+            [attributes, overwrite_attributes, cls.options(context).aws_sns_sqs.sns_kms_master_key_id]
+        )
+
+        async def _create_topic() -> str:
+            topic_arn = await cls._create_topic(topic, context, topic_prefix, attributes, overwrite_attributes, fifo)
+            if resource_cache is not None:
+                resource_cache.set(cache_key, {"topic_arn": topic_arn}, attributes_hash)
+            return topic_arn
+
+        if resource_cache is not None:
+            cached_value = resource_cache.get(cache_key, attributes_hash)
+            if cached_value and cached_value.get("topic_arn") and isinstance(cached_value.get("topic_arn"), str):
+                cls.topics[topic] = cached_value["topic_arn"]
+                cls.verify_cached_resource(cache_key, _create_topic, context)
+                return cast(str, cached_value["topic_arn"])
+
+        return cast(
+            str, await cls.shared_setup_call(("create_topic", topic, topic_prefix, fifo), _create_topic, context)
+        )
+
+    @classmethod
+    async def _create_topic(
+        cls,
+        topic: str,
+        context: Dict,
+        topic_prefix: Optional[str] = MESSAGE_TOPIC_PREFIX,
+        attributes: Optional[Union[str, Dict[str, Union[bool, str]]]] = MESSAGE_TOPIC_ATTRIBUTES,
+        overwrite_attributes: bool = True,
+        fifo: bool = False,
+    ) -> str:
         if not connector.get_client("tomodachi.sns"):
             await cls.create_client("sns", context)
 
@@ -804,6 +1216,10 @@ class AWSSNSSQSTransport(Invoker):
         group_id: Optional[str] = None,
         deduplication_id: Optional[str] = None,
     ) -> str:
+        buffer = cls.get_publish_message_buffer(topic_arn, context)
+        if buffer is not None:
+            return cast(str, await buffer.add((message, message_attributes, group_id, deduplication_id)))
+
         if not connector.get_client("tomodachi.sns"):
             await cls.create_client("sns", context)
 
@@ -817,7 +1233,8 @@ class AWSSNSSQSTransport(Invoker):
             }
 
         response = {}
-        for retry in range(1, 4):
+        max_attempts = cls.get_retry_max_attempts(context, 3)
+        for retry in range(1, max_attempts + 1):
             try:
                 async with connector("tomodachi.sns", service_name="sns") as client:
                     response = await asyncio.wait_for(
@@ -830,15 +1247,16 @@ class AWSSNSSQSTransport(Invoker):
                         timeout=40,
                     )
             except (aiohttp.client_exceptions.ServerDisconnectedError, RuntimeError, asyncio.CancelledError) as e:
-                if retry >= 3:
+                if retry >= max_attempts or not connector.can_retry("tomodachi.sns"):
                     raise e
                 continue
             except (
                 botocore.exceptions.ClientError,
                 aiohttp.client_exceptions.ClientConnectorError,
                 asyncio.TimeoutError,
+                CircuitOpenError,
             ) as e:
-                if retry >= 3:
+                if retry >= max_attempts or not connector.can_retry("tomodachi.sns"):
                     error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
                     logging.getLogger("transport.aws_sns_sqs").warning(
                         "Unable to publish message [sns] on AWS ({})".format(error_message)
@@ -847,8 +1265,13 @@ class AWSSNSSQSTransport(Invoker):
                 continue
             # SNS sometimes sends empty response with 408 errors
             except ResponseParserError as e:
-                if retry >= 3 or "Further retries may succeed" not in str(e):
+                if (
+                    retry >= max_attempts
+                    or "Further retries may succeed" not in str(e)
+                    or not connector.can_retry("tomodachi.sns")
+                ):
                     raise e
+                continue
             break
 
         message_id = response.get("MessageId")
@@ -861,6 +1284,177 @@ class AWSSNSSQSTransport(Invoker):
 
         return message_id
 
+    @classmethod
+    def get_publish_message_buffer(cls, topic_arn: str, context: Dict) -> Optional[BatchAccumulator]:
+        if context.get("_aws_sns_sqs_publish_message_buffers") is None:
+            context["_aws_sns_sqs_publish_message_buffers"] = {}
+        buffers: Dict[str, BatchAccumulator] = context["_aws_sns_sqs_publish_message_buffers"]
+
+        buffer = buffers.get(topic_arn)
+        if buffer is not None:
+            return buffer
+
+        aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+        if aws_sns_sqs_options.publish_message_batch_size <= 1:
+            return None
+
+        async def _flush(entries: List[Tuple[Any, Dict, Optional[str], Optional[str]]]) -> List[Any]:
+            return await cls.publish_message_batch(topic_arn, entries, context, return_exceptions=True)
+
+        # Publishes to the same topic made within the batch interval are coalesced into a single PublishBatch
+        # request, where every publisher awaits the result for its own message.
+        buffer = BatchAccumulator(
+            _flush,
+            max_size=min(aws_sns_sqs_options.publish_message_batch_size, PUBLISH_BATCH_MAX_ENTRIES),
+            max_wait=aws_sns_sqs_options.publish_message_batch_interval,
+        )
+        buffers[topic_arn] = buffer
+
+        return buffer
+
+    @classmethod
+    async def flush_publish_message_buffers(cls, context: Dict) -> None:
+        buffers: Optional[Dict[str, BatchAccumulator]] = context.get("_aws_sns_sqs_publish_message_buffers")
+        if not buffers:
+            return
+
+        await asyncio.gather(*[buffer.flush() for buffer in list(buffers.values())])
+
+    @classmethod
+    async def publish_message_batch(
+        cls,
+        topic_arn: str,
+        entries: Sequence[Tuple[Any, Dict, Optional[str], Optional[str]]],
+        context: Dict,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        # Entries are tuples of (message, message_attributes, group_id, deduplication_id). Returns the message ids
+        # of the published messages, in the same order as the entries. With return_exceptions, entries that failed
+        # are returned as exceptions in place of their message id instead of raising.
+        if not connector.get_client("tomodachi.sns"):
+            await cls.create_client("sns", context)
+
+        request_entries: List[Dict] = []
+        request_entry_sizes: List[int] = []
+        for idx, (message, message_attributes, group_id, deduplication_id) in enumerate(entries):
+            message_attribute_values = cls.transform_message_attributes_to_botocore(message_attributes)
+            request_entry: Dict = {
+                "Id": str(idx),
+                "Message": message,
+                "MessageAttributes": message_attribute_values,
+            }
+            if group_id is not None:
+                request_entry["MessageGroupId"] = group_id
+                request_entry["MessageDeduplicationId"] = deduplication_id or str(uuid.uuid4())
+            request_entries.append(request_entry)
+
+            size = len(message.encode("utf-8")) if isinstance(message, str) else len(message or b"")
+            for name, value in message_attribute_values.items():
+                for attribute_value in value.values():
+                    if isinstance(attribute_value, str):
+                        attribute_value = attribute_value.encode("utf-8")
+                    size += len(attribute_value)
+                size += len(name.encode("utf-8"))
+            request_entry_sizes.append(size)
+
+        # Requests hold at most 10 entries, with a total payload size of at most 256 KiB.
+        batches: List[List[Dict]] = []
+        batch: List[Dict] = []
+        batch_size = 0
+        for request_entry, size in zip(request_entries, request_entry_sizes):
+            if batch and (len(batch) >= PUBLISH_BATCH_MAX_ENTRIES or batch_size + size > PUBLISH_BATCH_MAX_SIZE):
+                batches.append(batch)
+                batch = []
+                batch_size = 0
+            batch.append(request_entry)
+            batch_size += size
+        if batch:
+            batches.append(batch)
+
+        message_ids: Dict[str, str] = {}
+        failed: Dict[str, str] = {}
+        max_attempts = cls.get_retry_max_attempts(context, 3)
+
+        for batch in batches:
+            pending = batch
+            for retry in range(1, max_attempts + 1):
+                try:
+                    async with connector("tomodachi.sns", service_name="sns") as client:
+                        response = await asyncio.wait_for(
+                            client.publish_batch(TopicArn=topic_arn, PublishBatchRequestEntries=pending),
+                            timeout=40,
+                        )
+                except (aiohttp.client_exceptions.ServerDisconnectedError, RuntimeError, asyncio.CancelledError) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sns"):
+                        raise e
+                    continue
+                except (
+                    botocore.exceptions.ClientError,
+                    aiohttp.client_exceptions.ClientConnectorError,
+                    asyncio.TimeoutError,
+                    CircuitOpenError,
+                ) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sns"):
+                        error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
+                        logging.getLogger("transport.aws_sns_sqs").warning(
+                            "Unable to publish message batch [sns] on AWS ({})".format(error_message)
+                        )
+                        raise AWSSNSSQSException(error_message, log_level=context.get("log_level")) from e
+                    continue
+                # SNS sometimes sends empty response with 408 errors
+                except ResponseParserError as e:
+                    if (
+                        retry >= max_attempts
+                        or "Further retries may succeed" not in str(e)
+                        or not connector.can_retry("tomodachi.sns")
+                    ):
+                        raise e
+                    continue
+
+                for successful in response.get("Successful", []):
+                    message_id = successful.get("MessageId")
+                    if message_id and isinstance(message_id, str):
+                        message_ids[successful.get("Id")] = message_id
+
+                # Only the entries that failed on the AWS side are retried - sender faults won't succeed on retry.
+                retry_ids: Set[str] = set()
+                for failed_entry in response.get("Failed", []):
+                    entry_id = failed_entry.get("Id")
+                    failed[entry_id] = "{}: {}".format(failed_entry.get("Code"), failed_entry.get("Message"))
+                    if not failed_entry.get("SenderFault"):
+                        retry_ids.add(entry_id)
+
+                pending = [request_entry for request_entry in pending if request_entry["Id"] in retry_ids]
+                for request_entry in pending:
+                    failed.pop(request_entry["Id"], None)
+                if not pending or retry >= max_attempts or not connector.can_retry("tomodachi.sns"):
+                    for request_entry in pending:
+                        failed[request_entry["Id"]] = failed.get(request_entry["Id"]) or "Unable to publish entry"
+                    break
+
+        for request_entry in request_entries:
+            if request_entry["Id"] not in message_ids and request_entry["Id"] not in failed:
+                failed[request_entry["Id"]] = "Missing MessageId in response"
+
+        if failed:
+            error_message = "{} of {} messages failed ({})".format(
+                len(failed), len(request_entries), ", ".join(sorted(set(failed.values())))
+            )
+            logging.getLogger("transport.aws_sns_sqs").warning(
+                "Unable to publish message batch [sns] on AWS ({})".format(error_message)
+            )
+            if not return_exceptions:
+                raise AWSSNSSQSException(error_message, log_level=context.get("log_level"))
+
+        results: List[Any] = []
+        for request_entry in request_entries:
+            if request_entry["Id"] in message_ids:
+                results.append(message_ids[request_entry["Id"]])
+            else:
+                results.append(AWSSNSSQSException(failed[request_entry["Id"]], log_level=context.get("log_level")))
+
+        return results
+
     @classmethod
     async def delete_message(cls, receipt_handle: Optional[str], queue_url: Optional[str], context: Dict) -> None:
         if not receipt_handle:
@@ -869,8 +1463,10 @@ class AWSSNSSQSTransport(Invoker):
         if not connector.get_client("tomodachi.sqs"):
             await cls.create_client("sqs", context)
 
+        max_attempts = cls.get_retry_max_attempts(context, 4)
+
         async def _delete_message() -> None:
-            for retry in range(1, 5):
+            for retry in range(1, max_attempts + 1):
                 try:
                     async with connector("tomodachi.sqs", service_name="sqs") as client:
                         await asyncio.wait_for(
@@ -882,7 +1478,8 @@ class AWSSNSSQSTransport(Invoker):
                     RuntimeError,
                     asyncio.CancelledError,
                 ) as e:
-                    if retry >= 4:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        increase_execution_context_value("aws_sns_sqs_failed_message_deletes")
                         raise e
                     continue
                 except botocore.exceptions.ClientError as e:
@@ -890,18 +1487,214 @@ class AWSSNSSQSTransport(Invoker):
                     logging.getLogger("transport.aws_sns_sqs").warning(
                         "Unable to delete message [sqs] on AWS ({})".format(error_message)
                     )
-                except asyncio.TimeoutError as e:
-                    if retry >= 4:
-                        error_message = "Network timeout"
+                    increase_execution_context_value("aws_sns_sqs_failed_message_deletes")
+                except (asyncio.TimeoutError, CircuitOpenError) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
                         logging.getLogger("transport.aws_sns_sqs").warning(
                             "Unable to delete message [sqs] on AWS ({})".format(error_message)
                         )
+                        increase_execution_context_value("aws_sns_sqs_failed_message_deletes")
                         raise AWSSNSSQSException(error_message, log_level=context.get("log_level")) from e
                     continue
                 break
 
         await _delete_message()
 
+    @classmethod
+    async def delete_message_batch(cls, receipt_handles: Sequence[str], queue_url: str, context: Dict) -> None:
+        receipt_handles = [receipt_handle for receipt_handle in receipt_handles if receipt_handle]
+        if not receipt_handles:
+            return
+
+        if not connector.get_client("tomodachi.sqs"):
+            await cls.create_client("sqs", context)
+
+        failed_receipt_handles: List[str] = []
+        max_attempts = cls.get_retry_max_attempts(context, 4)
+
+        for i in range(0, len(receipt_handles), 10):
+            entries = [
+                {"Id": str(idx), "ReceiptHandle": receipt_handle}
+                for idx, receipt_handle in enumerate(receipt_handles[i : i + 10])
+            ]
+            response: Dict = {}
+            for retry in range(1, max_attempts + 1):
+                try:
+                    async with connector("tomodachi.sqs", service_name="sqs") as client:
+                        response = await asyncio.wait_for(
+                            client.delete_message_batch(QueueUrl=queue_url, Entries=entries), timeout=12
+                        )
+                except (
+                    aiohttp.client_exceptions.ServerDisconnectedError,
+                    aiohttp.client_exceptions.ClientConnectorError,
+                    RuntimeError,
+                    asyncio.CancelledError,
+                ) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        increase_execution_context_value(
+                            "aws_sns_sqs_failed_message_deletes", len(receipt_handles) - i + len(failed_receipt_handles)
+                        )
+                        raise e
+                    continue
+                except botocore.exceptions.ClientError as e:
+                    error_message = str(e)
+                    logging.getLogger("transport.aws_sns_sqs").warning(
+                        "Unable to delete message batch [sqs] on AWS ({})".format(error_message)
+                    )
+                    response = {"Failed": [{"Id": entry["Id"]} for entry in entries]}
+                except (asyncio.TimeoutError, CircuitOpenError) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
+                        logging.getLogger("transport.aws_sns_sqs").warning(
+                            "Unable to delete message batch [sqs] on AWS ({})".format(error_message)
+                        )
+                        increase_execution_context_value(
+                            "aws_sns_sqs_failed_message_deletes", len(receipt_handles) - i + len(failed_receipt_handles)
+                        )
+                        raise AWSSNSSQSException(error_message, log_level=context.get("log_level")) from e
+                    continue
+                break
+
+            failed_ids = {failed.get("Id") for failed in response.get("Failed", [])}
+            failed_receipt_handles.extend([entry["ReceiptHandle"] for entry in entries if entry["Id"] in failed_ids])
+
+        # Partial failures are retried one at a time, using the same retry policy as for single deletes. Messages
+        # which couldn't be deleted are counted in the "aws_sns_sqs_failed_message_deletes" execution context value.
+        for idx, receipt_handle in enumerate(failed_receipt_handles):
+            try:
+                await cls.delete_message(receipt_handle, queue_url, context)
+            except (Exception, asyncio.CancelledError):
+                increase_execution_context_value(
+                    "aws_sns_sqs_failed_message_deletes", len(failed_receipt_handles) - idx - 1
+                )
+                raise
+
+    @classmethod
+    async def enqueue_delete_message(
+        cls, receipt_handle: Optional[str], queue_url: Optional[str], context: Dict
+    ) -> None:
+        if not receipt_handle:
+            return
+
+        if context.get("_aws_sns_sqs_delete_message_buffers") is None:
+            context["_aws_sns_sqs_delete_message_buffers"] = {}
+        buffers: Dict[str, BatchAccumulator] = context["_aws_sns_sqs_delete_message_buffers"]
+
+        buffer = buffers.get(queue_url) if queue_url else None
+        if buffer is None:
+            aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+            if not queue_url or aws_sns_sqs_options.delete_message_batch_size <= 1:
+                await cls.delete_message(receipt_handle, queue_url, context)
+                return
+
+            async def _flush(receipt_handles: List[str]) -> List[None]:
+                try:
+                    await cls.delete_message_batch(receipt_handles, queue_url, context)
+                except (Exception, asyncio.CancelledError) as e:
+                    error_message = str(e) or type(e).__name__
+                    logging.getLogger("transport.aws_sns_sqs").warning(
+                        "Unable to delete message batch [sqs] on AWS ({})".format(error_message)
+                    )
+                return [None] * len(receipt_handles)
+
+            buffer = BatchAccumulator(
+                _flush,
+                max_size=min(aws_sns_sqs_options.delete_message_batch_size, 10),
+                max_wait=aws_sns_sqs_options.delete_message_batch_interval,
+            )
+            buffers[queue_url] = buffer
+
+        buffer.add(receipt_handle)
+
+    @classmethod
+    async def flush_delete_message_buffers(cls, context: Dict) -> None:
+        buffers: Optional[Dict[str, BatchAccumulator]] = context.get("_aws_sns_sqs_delete_message_buffers")
+        if not buffers:
+            return
+
+        await asyncio.gather(*[buffer.flush() for buffer in list(buffers.values())])
+
+    @classmethod
+    async def change_message_visibility_batch(
+        cls, receipt_handles: Sequence[str], visibility_timeout: int, queue_url: str, context: Dict
+    ) -> None:
+        receipt_handles = [receipt_handle for receipt_handle in receipt_handles if receipt_handle]
+        if not receipt_handles:
+            return
+
+        if not connector.get_client("tomodachi.sqs"):
+            await cls.create_client("sqs", context)
+
+        max_attempts = cls.get_retry_max_attempts(context, 4)
+        for i in range(0, len(receipt_handles), 10):
+            entries = [
+                {"Id": str(idx), "ReceiptHandle": receipt_handle, "VisibilityTimeout": visibility_timeout}
+                for idx, receipt_handle in enumerate(receipt_handles[i : i + 10])
+            ]
+            for retry in range(1, max_attempts + 1):
+                try:
+                    async with connector("tomodachi.sqs", service_name="sqs") as client:
+                        await asyncio.wait_for(
+                            client.change_message_visibility_batch(QueueUrl=queue_url, Entries=entries), timeout=12
+                        )
+                except (
+                    aiohttp.client_exceptions.ServerDisconnectedError,
+                    aiohttp.client_exceptions.ClientConnectorError,
+                    RuntimeError,
+                    asyncio.CancelledError,
+                ) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        raise e
+                    continue
+                except botocore.exceptions.ClientError as e:
+                    error_message = str(e)
+                    logging.getLogger("transport.aws_sns_sqs").warning(
+                        "Unable to change message visibility [sqs] on AWS ({})".format(error_message)
+                    )
+                except (asyncio.TimeoutError, CircuitOpenError) as e:
+                    if retry >= max_attempts or not connector.can_retry("tomodachi.sqs"):
+                        error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
+                        logging.getLogger("transport.aws_sns_sqs").warning(
+                            "Unable to change message visibility [sqs] on AWS ({})".format(error_message)
+                        )
+                        raise AWSSNSSQSException(error_message, log_level=context.get("log_level")) from e
+                    continue
+                break
+
+            # Entries that fail individually are most likely messages that were deleted while the request was
+            # in flight, which makes their receipt handles invalid - there's nothing left to extend for those.
+
+    @classmethod
+    async def get_queue_visibility_timeout(cls, queue_url: str, context: Dict) -> int:
+        if context.get("_aws_sns_sqs_visibility_timeouts") is None:
+            context["_aws_sns_sqs_visibility_timeouts"] = {}
+        visibility_timeouts: Dict[str, int] = context["_aws_sns_sqs_visibility_timeouts"]
+
+        visibility_timeout = visibility_timeouts.get(queue_url)
+        if visibility_timeout is not None:
+            return visibility_timeout
+
+        if not connector.get_client("tomodachi.sqs"):
+            await cls.create_client("sqs", context)
+
+        visibility_timeout = VISIBILITY_TIMEOUT_QUEUE_DEFAULT
+        try:
+            async with connector("tomodachi.sqs", service_name="sqs") as client:
+                response = await asyncio.wait_for(
+                    client.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["VisibilityTimeout"]), timeout=12
+                )
+            visibility_timeout = int(response.get("Attributes", {}).get("VisibilityTimeout") or visibility_timeout)
+        except (botocore.exceptions.ClientError, asyncio.TimeoutError, ValueError) as e:
+            error_message = str(e) if not isinstance(e, asyncio.TimeoutError) else "Network timeout"
+            logging.getLogger("transport.aws_sns_sqs").warning(
+                "Unable to get queue attributes [sqs] on AWS ({})".format(error_message)
+            )
+            return visibility_timeout
+
+        visibility_timeouts[queue_url] = visibility_timeout
+        return visibility_timeout
+
     @classmethod
     async def get_queue_url_from_arn(cls, queue_arn: str, context: Dict) -> Optional[str]:
         if not connector.get_client("tomodachi.sqs"):
@@ -928,11 +1721,138 @@ class AWSSNSSQSTransport(Invoker):
         except botocore.exceptions.ClientError:
             pass
 
-        return queue_url
+        return queue_url
+
+    @classmethod
+    async def shared_setup_call(cls, key: Tuple, func: Callable[[], Awaitable[Any]], context: Dict) -> Any:
+        # Concurrent setup calls for the same key (for example multiple handlers subscribing to the same topic
+        # or using the same dead-letter queue) share a single in-flight request instead of each calling AWS.
+        if context.get("_aws_sns_sqs_setup_tasks") is None:
+            context["_aws_sns_sqs_setup_tasks"] = {}
+        setup_tasks: Dict[Tuple, asyncio.Future] = context["_aws_sns_sqs_setup_tasks"]
+
+        task = setup_tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            setup_tasks[key] = task
+            task.add_done_callback(lambda _: setup_tasks.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    @classmethod
+    def get_resource_cache(cls, context: Dict) -> Optional[ResourceCache]:
+        resource_cache_path = cls.options(context).aws_sns_sqs.resource_cache_path
+        if not resource_cache_path:
+            return None
+
+        resource_cache: Optional[ResourceCache] = context.get("_aws_sns_sqs_resource_cache")
+        if resource_cache is None or resource_cache.path != resource_cache_path:
+            resource_cache = ResourceCache(resource_cache_path)
+            context["_aws_sns_sqs_resource_cache"] = resource_cache
+
+        return resource_cache
+
+    @classmethod
+    def get_resource_cache_key(cls, resource_type: str, service_name: str, context: Dict, *parts: str) -> str:
+        # Entries are kept apart per region, endpoint and credentials, so that a cache file which is used against
+        # different endpoints (for example localstack and AWS) or accounts never returns another one's resources.
+        # The access key id is hashed so that it isn't written to the cache file.
+        options: Options = cls.options(context)
+        aws_access_key_id = options.aws_sns_sqs.aws_access_key_id
+        return ResourceCache.key(
+            resource_type,
+            options.aws_sns_sqs.region_name,
+            options.aws_endpoint_urls.get(service_name, None),
+            hashlib.sha256(aws_access_key_id.encode("utf-8")).hexdigest() if aws_access_key_id else None,
+            *parts,
+        )
+
+    @classmethod
+    def verify_cached_resource(cls, cache_key: str, func: Callable[[], Awaitable[Any]], context: Dict) -> None:
+        # Resources read from the resource cache are used right away, while the idempotent setup calls that
+        # would otherwise have been made at startup are run in the background to verify (and refresh) the entry.
+        if context.get("_aws_sns_sqs_resource_cache_tasks") is None:
+            context["_aws_sns_sqs_resource_cache_tasks"] = set()
+        verify_tasks: Set[asyncio.Future] = context["_aws_sns_sqs_resource_cache_tasks"]
+
+        async def _verify() -> None:
+            resource_cache = cls.get_resource_cache(context)
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.getLogger("transport.aws_sns_sqs").warning(
+                    "Unable to verify cached resource on AWS ({})".format(str(e))
+                )
+                if resource_cache is not None:
+                    resource_cache.discard(cache_key)
+            if resource_cache is not None:
+                resource_cache.save()
+
+        task = asyncio.ensure_future(_verify())
+        verify_tasks.add(task)
+        task.add_done_callback(verify_tasks.discard)
+
+    @classmethod
+    def invalidate_resource_cache(cls, context: Dict) -> None:
+        for task in list(context.get("_aws_sns_sqs_resource_cache_tasks") or []):
+            task.cancel()
+
+        resource_cache = cls.get_resource_cache(context)
+        if resource_cache is not None:
+            resource_cache.clear()
+            resource_cache.save()
+
+    @classmethod
+    async def close_resource_cache(cls, context: Dict) -> None:
+        verify_tasks = list(context.get("_aws_sns_sqs_resource_cache_tasks") or [])
+        for task in verify_tasks:
+            task.cancel()
+        if verify_tasks:
+            await asyncio.wait(verify_tasks)
+
+        resource_cache = cls.get_resource_cache(context)
+        if resource_cache is not None:
+            resource_cache.save()
 
     @classmethod
     async def create_queue(cls, queue_name: str, context: Dict, fifo: bool) -> Tuple[str, str]:
         cls.validate_queue_name(queue_name)
+
+        resource_cache = cls.get_resource_cache(context)
+        cache_key = cls.get_resource_cache_key("queue", "sqs", context, queue_name, "fifo" if fifo else "standard")
+        attributes_hash = ResourceCache.attributes_hash([cls.get_create_queue_attributes(fifo)])
+
+        async def _create_queue() -> Tuple[str, str]:
+            queue_url, queue_arn = await cls._create_queue(queue_name, context, fifo)
+            if resource_cache is not None:
+                resource_cache.set(cache_key, {"queue_url": queue_url, "queue_arn": queue_arn}, attributes_hash)
+            return queue_url, queue_arn
+
+        if resource_cache is not None:
+            cached_value = resource_cache.get(cache_key, attributes_hash)
+            if cached_value and cached_value.get("queue_url") and cached_value.get("queue_arn"):
+                cls.verify_cached_resource(cache_key, _create_queue, context)
+                return cached_value["queue_url"], cached_value["queue_arn"]
+
+        return cast(
+            Tuple[str, str], await cls.shared_setup_call(("create_queue", queue_name, fifo), _create_queue, context)
+        )
+
+    @staticmethod
+    def get_create_queue_attributes(fifo: bool) -> Dict[str, str]:
+        if not fifo:
+            return {}
+        return {
+            "FifoQueue": "true",
+            "ContentBasedDeduplication": "false",
+            "DeduplicationScope": "messageGroup",
+            "FifoThroughputLimit": "perMessageGroupId",
+        }
+
+    @classmethod
+    async def _create_queue(cls, queue_name: str, context: Dict, fifo: bool) -> Tuple[str, str]:
         if not connector.get_client("tomodachi.sqs"):
             await cls.create_client("sqs", context)
 
@@ -955,16 +1875,7 @@ class AWSSNSSQSTransport(Invoker):
             pass
 
         if not queue_url:
-            queue_attrs = (
-                {
-                    "FifoQueue": "true",
-                    "ContentBasedDeduplication": "false",
-                    "DeduplicationScope": "messageGroup",
-                    "FifoThroughputLimit": "perMessageGroupId",
-                }
-                if fifo
-                else {}
-            )
+            queue_attrs = cls.get_create_queue_attributes(fifo)
             try:
                 async with connector("tomodachi.sqs", service_name="sqs") as client:
                     response = await client.create_queue(QueueName=queue_name, Attributes=queue_attrs)
@@ -995,7 +1906,9 @@ class AWSSNSSQSTransport(Invoker):
 
         try:
             async with connector("tomodachi.sqs", service_name="sqs") as client:
-                response = await client.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["QueueArn"])
+                response = await client.get_queue_attributes(
+                    QueueUrl=queue_url, AttributeNames=["QueueArn", *SUBSCRIBE_QUEUE_ATTRIBUTE_NAMES]
+                )
         except botocore.exceptions.ClientError as e:
             error_message = str(e)
             logging.getLogger("transport.aws_sns_sqs").warning(
@@ -1011,6 +1924,12 @@ class AWSSNSSQSTransport(Invoker):
             )
             raise AWSSNSSQSException(error_message, log_level=context.get("log_level"))
 
+        # The current queue attributes are kept to be compared against by subscribe_topics, which then doesn't
+        # need another round-trip to find out if the queue attributes already match the expected values.
+        if context.get("_aws_sns_sqs_queue_attributes") is None:
+            context["_aws_sns_sqs_queue_attributes"] = {}
+        context["_aws_sns_sqs_queue_attributes"][queue_url] = response.get("Attributes", {})
+
         queue_fifo = queue_name.endswith(".fifo")
         if fifo is not queue_fifo:
             queue_types = {False: "Standard", True: "FIFO"}
@@ -1066,29 +1985,32 @@ class AWSSNSSQSTransport(Invoker):
         return queue_policy
 
     @classmethod
-    async def subscribe_wildcard_topic(
-        cls,
-        topic: str,
-        queue_arn: str,
-        queue_url: str,
-        context: Dict,
-        fifo: bool,
-        attributes: Optional[Dict[str, Union[str, bool]]] = None,
-        visibility_timeout: Optional[int] = None,
-        redrive_policy: Optional[Dict[str, Union[str, int]]] = None,
-    ) -> Optional[List]:
-        if not connector.get_client("tomodachi.sns"):
-            await cls.create_client("sns", context)
-
-        pattern = r"^arn:aws:sns:[^:]+:[^:]+:{}$".format(
+    def get_wildcard_topic_pattern(cls, topic: str, context: Dict, fifo: bool) -> str:
+        return r"^arn:aws:sns:[^:]+:[^:]+:{}$".format(
             cls.encode_topic(cls.get_topic_name(topic, context, fifo))
             .replace(cls.encode_topic("*"), "((?!{}).)*".format(cls.encode_topic(".")))
             .replace(cls.encode_topic("#"), ".*")
         )
-        compiled_pattern = re.compile(pattern)
+
+    @classmethod
+    async def list_topics(cls, context: Dict) -> List[str]:
+        # The topic listing is shared by every wildcard subscription of the service and is only fetched again
+        # on resubscribe or when wildcard topic subscriptions are refreshed.
+        topic_arns: Optional[List[str]] = context.get("_aws_sns_sqs_topic_arns")
+        if topic_arns is not None:
+            return topic_arns
+
+        return cast(
+            List[str], await cls.shared_setup_call(("list_topics",), lambda: cls._list_topics(context), context)
+        )
+
+    @classmethod
+    async def _list_topics(cls, context: Dict) -> List[str]:
+        if not connector.get_client("tomodachi.sns"):
+            await cls.create_client("sns", context)
 
         next_token: Any = False
-        topic_arn_list: Optional[List[str]] = None
+        topic_arns: List[str] = []
         while next_token is not None:
             try:
                 async with connector("tomodachi.sns", service_name="sns") as client:
@@ -1104,10 +2026,111 @@ class AWSSNSSQSTransport(Invoker):
                 raise AWSSNSSQSException(error_message, log_level=context.get("log_level")) from e
 
             next_token = response.get("NextToken")
-            topics = response.get("Topics", [])
-            topic_arn_list = [
-                t.get("TopicArn") for t in topics if t.get("TopicArn") and compiled_pattern.match(t.get("TopicArn"))
-            ]
+            topic_arns.extend([t.get("TopicArn") for t in response.get("Topics", []) if t.get("TopicArn")])
+
+        context["_aws_sns_sqs_topic_arns"] = topic_arns
+        context["_aws_sns_sqs_wildcard_topic_arns"] = {}
+
+        return topic_arns
+
+    @classmethod
+    async def get_wildcard_topic_arns(cls, topic: str, context: Dict, fifo: bool) -> List[str]:
+        pattern = cls.get_wildcard_topic_pattern(topic, context, fifo)
+
+        topic_arns = await cls.list_topics(context)
+        if context.get("_aws_sns_sqs_wildcard_topic_arns") is None:
+            context["_aws_sns_sqs_wildcard_topic_arns"] = {}
+        matched_topic_arns: Dict[str, List[str]] = context["_aws_sns_sqs_wildcard_topic_arns"]
+        if pattern in matched_topic_arns:
+            return matched_topic_arns[pattern]
+
+        # All wildcard patterns of the service that haven't been matched yet are matched in a single pass over
+        # the topic listing, instead of once per wildcard subscription.
+        compiled_patterns = {
+            p: re.compile(p)
+            for p in set(context.get("_aws_sns_sqs_wildcard_topic_patterns") or []) | {pattern}
+            if p not in matched_topic_arns
+        }
+        matches: Dict[str, List[str]] = {p: [] for p in compiled_patterns}
+        for topic_arn in topic_arns:
+            for p, compiled_pattern in compiled_patterns.items():
+                if compiled_pattern.match(topic_arn):
+                    matches[p].append(topic_arn)
+        matched_topic_arns.update(matches)
+
+        return matched_topic_arns[pattern]
+
+    @classmethod
+    async def refresh_wildcard_subscriptions(cls, interval: float, context: Dict) -> None:
+        while True:
+            await asyncio.sleep(interval)
+
+            context.pop("_aws_sns_sqs_topic_arns", None)
+            context.pop("_aws_sns_sqs_wildcard_topic_arns", None)
+
+            for subscription in list(context.get("_aws_sns_sqs_wildcard_subscriptions") or []):
+                try:
+                    topic_arn_list = await cls.get_wildcard_topic_arns(
+                        subscription["topic"], context, subscription["fifo"]
+                    )
+                    new_topic_arn_list = [t for t in topic_arn_list if t not in subscription["topic_arns"]]
+                    if not new_topic_arn_list:
+                        continue
+
+                    logging.getLogger("transport.aws_sns_sqs").info(
+                        "Subscribing queue ARN '{}' to {} new SNS topic(s) matching '{}'".format(
+                            subscription["queue_arn"], len(new_topic_arn_list), subscription["topic"]
+                        )
+                    )
+                    all_topic_arn_list = sorted(subscription["topic_arns"] | set(new_topic_arn_list))
+                    await cls.subscribe_topics(
+                        all_topic_arn_list,
+                        subscription["queue_arn"],
+                        subscription["queue_url"],
+                        context,
+                        attributes=subscription["attributes"],
+                        visibility_timeout=subscription["visibility_timeout"],
+                        redrive_policy=subscription["redrive_policy"],
+                        subscribe_topic_arn_list=new_topic_arn_list,
+                    )
+                    subscription["topic_arns"] = set(all_topic_arn_list)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.getLogger("transport.aws_sns_sqs").warning(
+                        "Unable to refresh wildcard topic subscriptions [sns] on AWS ({})".format(str(e))
+                    )
+
+    @classmethod
+    async def subscribe_wildcard_topic(
+        cls,
+        topic: str,
+        queue_arn: str,
+        queue_url: str,
+        context: Dict,
+        fifo: bool,
+        attributes: Optional[Dict[str, Union[str, bool]]] = None,
+        visibility_timeout: Optional[int] = None,
+        redrive_policy: Optional[Dict[str, Union[str, int]]] = None,
+    ) -> Optional[List]:
+        topic_arn_list = await cls.get_wildcard_topic_arns(topic, context, fifo)
+
+        # Subscriptions are kept to be able to subscribe to matching topics that are created later on, if
+        # the wildcard topic subscriptions are refreshed periodically.
+        if context.get("_aws_sns_sqs_wildcard_subscriptions") is None:
+            context["_aws_sns_sqs_wildcard_subscriptions"] = []
+        context["_aws_sns_sqs_wildcard_subscriptions"].append(
+            {
+                "topic": topic,
+                "queue_arn": queue_arn,
+                "queue_url": queue_url,
+                "fifo": fifo,
+                "attributes": attributes,
+                "visibility_timeout": visibility_timeout,
+                "redrive_policy": redrive_policy,
+                "topic_arns": set(topic_arn_list),
+            }
+        )
 
         if topic_arn_list:
             queue_policy = cls.generate_queue_policy(queue_arn, topic_arn_list, context)
@@ -1136,6 +2159,66 @@ class AWSSNSSQSTransport(Invoker):
         attributes: Optional[Dict[str, Union[str, bool]]] = None,
         visibility_timeout: Optional[int] = None,
         redrive_policy: Optional[Dict[str, Union[str, int]]] = None,
+        subscribe_topic_arn_list: Optional[Union[List, Tuple]] = None,
+    ) -> List:
+        if not queue_policy:
+            queue_policy = cls.generate_queue_policy(queue_arn, topic_arn_list, context)
+
+        resource_cache = cls.get_resource_cache(context)
+        aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+        cache_key = cls.get_resource_cache_key("subscriptions", "sns", context, queue_arn)
+        attributes_hash = ResourceCache.attributes_hash(
+            [
+                sorted(topic_arn_list),
+                queue_policy,
+                attributes,
+                visibility_timeout,
+                redrive_policy,
+                aws_sns_sqs_options.sqs_kms_master_key_id,
+                aws_sns_sqs_options.sqs_kms_data_key_reuse_period,
+            ]
+        )
+
+        async def _subscribe_topics() -> List:
+            subscription_arn_list = await cls._subscribe_topics(
+                topic_arn_list,
+                queue_arn,
+                queue_url,
+                context,
+                queue_policy=queue_policy,
+                attributes=attributes,
+                visibility_timeout=visibility_timeout,
+                redrive_policy=redrive_policy,
+                subscribe_topic_arn_list=subscribe_topic_arn_list,
+            )
+            if resource_cache is not None and subscribe_topic_arn_list is None:
+                resource_cache.set(cache_key, {"subscription_arns": subscription_arn_list}, attributes_hash)
+            return subscription_arn_list
+
+        if resource_cache is not None and subscribe_topic_arn_list is None:
+            cached_value = resource_cache.get(cache_key, attributes_hash)
+            if cached_value and isinstance(cached_value.get("subscription_arns"), list):
+                if visibility_timeout is not None and visibility_timeout != VISIBILITY_TIMEOUT_DEFAULT:
+                    if context.get("_aws_sns_sqs_visibility_timeouts") is None:
+                        context["_aws_sns_sqs_visibility_timeouts"] = {}
+                    context["_aws_sns_sqs_visibility_timeouts"][queue_url] = visibility_timeout
+                cls.verify_cached_resource(cache_key, _subscribe_topics, context)
+                return cast(List, cached_value["subscription_arns"])
+
+        return await _subscribe_topics()
+
+    @classmethod
+    async def _subscribe_topics(
+        cls,
+        topic_arn_list: Union[List, Tuple],
+        queue_arn: str,
+        queue_url: str,
+        context: Dict,
+        queue_policy: Optional[Dict] = None,
+        attributes: Optional[Dict[str, Union[str, bool]]] = None,
+        visibility_timeout: Optional[int] = None,
+        redrive_policy: Optional[Dict[str, Union[str, int]]] = None,
+        subscribe_topic_arn_list: Optional[Union[List, Tuple]] = None,
     ) -> List:
         if not connector.get_client("tomodachi.sns"):
             await cls.create_client("sns", context)
@@ -1212,32 +2295,28 @@ class AWSSNSSQSTransport(Invoker):
         message_retention_period = None  # not implemented yet
 
         try:
-            async with connector("tomodachi.sqs", service_name="sqs") as sqs_client:
-                response = await sqs_client.get_queue_attributes(
-                    QueueUrl=queue_url,
-                    AttributeNames=[
-                        "Policy",
-                        "RedrivePolicy",
-                        "VisibilityTimeout",
-                        "MessageRetentionPeriod",
-                        "KmsMasterKeyId",
-                        "KmsDataKeyReusePeriodSeconds",
-                    ],
-                )
-                current_queue_attributes = response.get("Attributes", {})
-                current_queue_policy = json.loads(current_queue_attributes.get("Policy") or "{}")
-                current_visibility_timeout = current_queue_attributes.get("VisibilityTimeout")
-                if current_queue_attributes:
-                    current_redrive_policy = json.loads(current_queue_attributes.get("RedrivePolicy") or "{}")
-                if current_visibility_timeout:
-                    current_visibility_timeout = int(current_visibility_timeout)
-                current_message_retention_period = current_queue_attributes.get("MessageRetentionPeriod")
-                if current_message_retention_period:
-                    current_message_retention_period = int(current_message_retention_period)
-                current_kms_master_key_id = current_queue_attributes.get("KmsMasterKeyId")
-                current_kms_data_key_reuse_period_seconds = current_queue_attributes.get("KmsDataKeyReusePeriodSeconds")
-                if current_kms_data_key_reuse_period_seconds:
-                    current_kms_data_key_reuse_period_seconds = int(current_kms_data_key_reuse_period_seconds)
+            cached_queue_attributes = (context.get("_aws_sns_sqs_queue_attributes") or {}).pop(queue_url, None)
+            if cached_queue_attributes is not None:
+                current_queue_attributes = cached_queue_attributes
+            else:
+                async with connector("tomodachi.sqs", service_name="sqs") as sqs_client:
+                    response = await sqs_client.get_queue_attributes(
+                        QueueUrl=queue_url, AttributeNames=list(SUBSCRIBE_QUEUE_ATTRIBUTE_NAMES)
+                    )
+                    current_queue_attributes = response.get("Attributes", {})
+            current_queue_policy = json.loads(current_queue_attributes.get("Policy") or "{}")
+            current_visibility_timeout = current_queue_attributes.get("VisibilityTimeout")
+            if current_queue_attributes:
+                current_redrive_policy = json.loads(current_queue_attributes.get("RedrivePolicy") or "{}")
+            if current_visibility_timeout:
+                current_visibility_timeout = int(current_visibility_timeout)
+            current_message_retention_period = current_queue_attributes.get("MessageRetentionPeriod")
+            if current_message_retention_period:
+                current_message_retention_period = int(current_message_retention_period)
+            current_kms_master_key_id = current_queue_attributes.get("KmsMasterKeyId")
+            current_kms_data_key_reuse_period_seconds = current_queue_attributes.get("KmsDataKeyReusePeriodSeconds")
+            if current_kms_data_key_reuse_period_seconds:
+                current_kms_data_key_reuse_period_seconds = int(current_kms_data_key_reuse_period_seconds)
         except botocore.exceptions.ClientError:
             pass
 
@@ -1253,6 +2332,13 @@ class AWSSNSSQSTransport(Invoker):
                 visibility_timeout
             )  # SQS.SetQueueAttributes "Attributes" are mapped string -> string
 
+        if visibility_timeout is not None or current_visibility_timeout is not None:
+            if context.get("_aws_sns_sqs_visibility_timeouts") is None:
+                context["_aws_sns_sqs_visibility_timeouts"] = {}
+            context["_aws_sns_sqs_visibility_timeouts"][queue_url] = (
+                visibility_timeout if visibility_timeout is not None else current_visibility_timeout
+            )
+
         if (
             redrive_policy is not None
             and current_redrive_policy is not None
@@ -1307,7 +2393,9 @@ class AWSSNSSQSTransport(Invoker):
         # Subscription attributes: DeliveryPolicy, FilterPolicy, RawMessageDelivery, RedrivePolicy
         update_attributes = True if attributes else False
 
-        for topic_arn in topic_arn_list:
+        # The queue policy covers every topic in topic_arn_list, while subscribe_topic_arn_list can be used to
+        # only make subscribe calls for a subset of the topics (for example newly created topics).
+        for topic_arn in topic_arn_list if subscribe_topic_arn_list is None else subscribe_topic_arn_list:
             subscription_arn = None
 
             if update_attributes and attributes:
@@ -1379,9 +2467,20 @@ class AWSSNSSQSTransport(Invoker):
         return subscription_arn_list
 
     @classmethod
-    async def consume_queue(cls, obj: Any, context: Dict, handler: Callable, queue_url: str) -> None:
+    async def consume_queue(
+        cls,
+        obj: Any,
+        context: Dict,
+        handler: Callable,
+        queue_url: str,
+        pollers_per_queue: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        batch: bool = False,
+        priority: Optional[Union[int, float]] = None,
+    ) -> None:
         max_number_of_messages = 10
         wait_time_seconds = 20
+        busy_wait_time_seconds = 1
 
         if not connector.get_client("tomodachi.sqs"):
             await cls.create_client("sqs", context)
@@ -1392,6 +2491,158 @@ class AWSSNSSQSTransport(Invoker):
         stop_waiter: asyncio.Future = asyncio.Future()
         start_waiter: asyncio.Future = asyncio.Future()
 
+        aws_sns_sqs_options: Options.AWSSNSSQS = cls.options(context).aws_sns_sqs
+
+        # With a limit on in-flight messages per queue, the queue is consumed in continuous-prefetch mode, where
+        # the next receive is issued as soon as there's capacity, instead of awaiting all messages of a batch.
+        if max_concurrency is None:
+            max_concurrency = aws_sns_sqs_options.max_in_flight_messages_per_queue
+        if max_concurrency is not None and (
+            not isinstance(max_concurrency, int)
+            or max_concurrency is True
+            or max_concurrency is False
+            or max_concurrency < 1
+        ):
+            raise ValueError(
+                "Bad value for aws_sns_sqs option max_in_flight_messages_per_queue: {}".format(str(max_concurrency))
+            )
+        queue_limiter: Optional[InFlightLimiter] = (
+            InFlightLimiter(max_concurrency) if max_concurrency is not None else None
+        )
+
+        # The service-wide limit is shared by the receive loops of all the queues that the service consumes.
+        service_limiter: Optional[InFlightLimiter] = context.get("_aws_sns_sqs_in_flight_limiter")
+        max_in_flight_messages = aws_sns_sqs_options.max_in_flight_messages
+        if not service_limiter and max_in_flight_messages is not None:
+            if (
+                not isinstance(max_in_flight_messages, int)
+                or max_in_flight_messages is True
+                or max_in_flight_messages is False
+                or max_in_flight_messages < 1
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option max_in_flight_messages: {}".format(str(max_in_flight_messages))
+                )
+            service_limiter = InFlightLimiter(max_in_flight_messages)
+            context["_aws_sns_sqs_in_flight_limiter"] = service_limiter
+
+        running_tasks: Set[asyncio.Future] = set()
+
+        if pollers_per_queue is None:
+            pollers_per_queue = aws_sns_sqs_options.pollers_per_queue
+        if (
+            not isinstance(pollers_per_queue, int)
+            or pollers_per_queue is True
+            or pollers_per_queue is False
+            or pollers_per_queue < 1
+        ):
+            raise ValueError("Bad value for aws_sns_sqs option pollers_per_queue: {}".format(str(pollers_per_queue)))
+
+        resubscribe_lock = asyncio.Lock()
+
+        fifo_message_groups = bool(
+            queue_url.endswith(".fifo") and aws_sns_sqs_options.fifo_message_group_parallelism and not batch
+        )
+
+        # Receives on queues that have been empty for a while are delayed, which is shared by the pollers of the queue.
+        receive_backoff: Optional[EmptyReceiveBackoff] = None
+        backoff_max_delay = aws_sns_sqs_options.empty_receive_backoff_max_delay
+        backoff_threshold = aws_sns_sqs_options.empty_receive_backoff_threshold
+        backoff_initial_delay = aws_sns_sqs_options.empty_receive_backoff_initial_delay
+        if backoff_max_delay is not None:
+            if (
+                not isinstance(backoff_max_delay, (int, float))
+                or backoff_max_delay is True
+                or backoff_max_delay is False
+                or backoff_max_delay <= 0
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option empty_receive_backoff_max_delay: {}".format(
+                        str(backoff_max_delay)
+                    )
+                )
+            if (
+                not isinstance(backoff_threshold, int)
+                or backoff_threshold is True
+                or backoff_threshold is False
+                or backoff_threshold < 1
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option empty_receive_backoff_threshold: {}".format(
+                        str(backoff_threshold)
+                    )
+                )
+            if (
+                not isinstance(backoff_initial_delay, (int, float))
+                or backoff_initial_delay is True
+                or backoff_initial_delay is False
+                or backoff_initial_delay <= 0
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option empty_receive_backoff_initial_delay: {}".format(
+                        str(backoff_initial_delay)
+                    )
+                )
+            receive_backoff = EmptyReceiveBackoff(
+                backoff_max_delay, threshold=backoff_threshold, initial_delay=backoff_initial_delay
+            )
+
+        # Receipt handles of messages being processed, mapped to the loop time at which their current visibility
+        # timeout runs out. Used by the heartbeat which extends the visibility timeout of long-running handlers.
+        visibility_leases: Dict[str, float] = {}
+        heartbeat_visibility_timeout: Optional[int] = None
+        heartbeat_threshold = aws_sns_sqs_options.visibility_timeout_heartbeat_threshold
+        if aws_sns_sqs_options.visibility_timeout_heartbeat:
+            if (
+                not isinstance(heartbeat_threshold, (int, float))
+                or heartbeat_threshold is True
+                or heartbeat_threshold is False
+                or heartbeat_threshold <= 0
+                or heartbeat_threshold >= 1
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option visibility_timeout_heartbeat_threshold: {}".format(
+                        str(heartbeat_threshold)
+                    )
+                )
+            heartbeat_visibility_timeout = await cls.get_queue_visibility_timeout(queue_url, context) or None
+
+        async def acquire_capacity(count: int) -> int:
+            # Waits while the queue or the service is saturated, so that no messages are received which
+            # would otherwise have their visibility timeout expire while waiting to be processed.
+            if queue_limiter:
+                count = await queue_limiter.acquire(count)
+            if service_limiter:
+                try:
+                    # Queues of handlers with a higher priority get a larger share of the service-wide capacity.
+                    service_count = await service_limiter.acquire(count, priority=priority or 1, key=queue_url)
+                except asyncio.CancelledError:
+                    if queue_limiter:
+                        queue_limiter.release(count)
+                    raise
+                if queue_limiter and count > service_count:
+                    queue_limiter.release(count - service_count)
+                count = service_count
+            return count
+
+        async def wait_for_capacity() -> None:
+            # Waits while the queue or the service is saturated, without taking any capacity.
+            if queue_limiter:
+                await queue_limiter.wait_available()
+            if service_limiter:
+                await service_limiter.wait_available()
+
+        def release_capacity(count: int = 1) -> None:
+            if queue_limiter:
+                queue_limiter.release(count)
+            if service_limiter:
+                service_limiter.release(count)
+
+        def task_done_callback(task: asyncio.Future, capacity: int = 1) -> None:
+            running_tasks.discard(task)
+            if queue_limiter or service_limiter:
+                release_capacity(capacity)
+
         async def receive_messages() -> None:
             await start_waiter
 
@@ -1404,37 +2655,128 @@ class AWSSNSSQSTransport(Invoker):
                     message_attributes: Dict,
                     approximate_receive_count: Optional[int],
                 ) -> Callable[..., Coroutine]:
+                    if heartbeat_visibility_timeout and receipt_handle:
+                        visibility_leases[receipt_handle] = loop.time() + heartbeat_visibility_timeout
+
+                    async def _callback() -> Any:
+                        try:
+                            return await handler(
+                                payload,
+                                receipt_handle,
+                                queue_url,
+                                message_topic,
+                                message_attributes,
+                                approximate_receive_count,
+                            )
+                        finally:
+                            if receipt_handle:
+                                visibility_leases.pop(receipt_handle, None)
+
+                    return _callback
+
+                def message_group_callback(
+                    group_messages: List[Tuple[Optional[str], Callable[..., Coroutine]]],
+                ) -> Callable[..., Coroutine]:
+                    # Messages of the same FIFO message group are handled one after another, in the order they
+                    # were received, while different message groups are handled concurrently.
                     async def _callback() -> None:
-                        await handler(
-                            payload,
-                            receipt_handle,
-                            queue_url,
-                            message_topic,
-                            message_attributes,
-                            approximate_receive_count,
-                        )
+                        for i, (_, func) in enumerate(group_messages):
+                            if await func() != MESSAGE_KEPT_IN_QUEUE:
+                                continue
+
+                            # The message was kept in the queue for redelivery - the remaining messages of the group
+                            # aren't handled, since that would break the ordering within the message group. They
+                            # become visible on the queue again when their visibility timeout runs out.
+                            for receipt_handle, _ in group_messages[i + 1 :]:
+                                if receipt_handle:
+                                    visibility_leases.pop(receipt_handle, None)
+                            break
+
+                    return _callback
+
+                def batch_callback(
+                    received_messages: List[Tuple[Optional[str], Optional[str], str, Dict, Optional[int]]],
+                    queue_url: Optional[str],
+                ) -> Callable[..., Coroutine]:
+                    receipt_handles = [received_message[1] for received_message in received_messages]
+                    if heartbeat_visibility_timeout:
+                        for receipt_handle in receipt_handles:
+                            if receipt_handle:
+                                visibility_leases[receipt_handle] = loop.time() + heartbeat_visibility_timeout
+
+                    async def _callback() -> None:
+                        try:
+                            await handler(received_messages, queue_url)
+                        finally:
+                            for receipt_handle in receipt_handles:
+                                if receipt_handle:
+                                    visibility_leases.pop(receipt_handle, None)
 
                     return _callback
 
                 is_disconnected = False
+                is_idle = True
 
                 while cls.close_waiter and not cls.close_waiter.done():
+                    if receive_backoff and receive_backoff.delay:
+                        # Waits before the next receive on an idle queue, unless the service is stopped meanwhile.
+                        await asyncio.wait([cls.close_waiter], timeout=receive_backoff.delay)
+                        if cls.close_waiter.done():
+                            break
+
                     futures: List[Callable[..., Coroutine]] = []
+                    batch_messages: List[Tuple[Optional[str], Optional[str], str, Dict, Optional[int]]] = []
+                    message_groups: Dict[Optional[str], List[Tuple[Optional[str], Callable[..., Coroutine]]]] = {}
 
                     # In case of FIFO queues, we have to cannot receive more
                     # than one message at a time, because otherwise we will not
-                    # be able to ensure their execution order.
-                    message_limit = 1 if queue_url.endswith(".fifo") else max_number_of_messages
+                    # be able to ensure their execution order - unless messages
+                    # are partitioned by message group and each group is handled
+                    # sequentially.
+                    message_limit = (
+                        1 if queue_url.endswith(".fifo") and not fifo_message_groups else max_number_of_messages
+                    )
+
+                    # Pollers of idle queues would starve the other queues if they held service-wide capacity while
+                    # long-polling, so they long-poll for a single message without holding any capacity and take it
+                    # once a message is received. Pollers of busy queues hold capacity for the messages they receive,
+                    # using a short wait so that the capacity is given back soon after the queue has become empty.
+                    # The wait isn't zero, since short polls only sample some of the SQS servers and would often
+                    # return empty for a queue that still has messages.
+                    idle_poll = bool(service_limiter and is_idle)
+
+                    acquired_capacity = 0
+                    if idle_poll:
+                        try:
+                            # Doesn't poll while the queue or the service is saturated.
+                            await wait_for_capacity()
+                        except asyncio.CancelledError:
+                            continue
+                        message_limit = 1
+                    elif queue_limiter or service_limiter:
+                        try:
+                            acquired_capacity = await acquire_capacity(message_limit)
+                        except asyncio.CancelledError:
+                            continue
+                        message_limit = acquired_capacity
+
+                    receive_wait_time_seconds = (
+                        wait_time_seconds if not service_limiter or idle_poll else busy_wait_time_seconds
+                    )
 
                     try:
                         try:
-                            async with connector("tomodachi.sqs", service_name="sqs") as client:
+                            async with connector("tomodachi.sqs", service_name="sqs", long_poll=True) as client:
                                 response = await asyncio.wait_for(
                                     client.receive_message(
                                         QueueUrl=queue_url,
-                                        WaitTimeSeconds=wait_time_seconds,
+                                        WaitTimeSeconds=receive_wait_time_seconds,
                                         MaxNumberOfMessages=message_limit,
-                                        AttributeNames=["ApproximateReceiveCount"],
+                                        AttributeNames=(
+                                            ["ApproximateReceiveCount", "MessageGroupId"]
+                                            if fifo_message_groups
+                                            else ["ApproximateReceiveCount"]
+                                        ),
                                     ),
                                     timeout=40,
                                 )
@@ -1453,6 +2795,15 @@ class AWSSNSSQSTransport(Invoker):
                             continue
                         except asyncio.CancelledError:
                             continue
+                        except CircuitOpenError as e:
+                            if not is_disconnected:
+                                is_disconnected = True
+                                logging.getLogger("transport.aws_sns_sqs").warning(
+                                    "Unable to receive message from queue [sqs] on AWS ({})".format(str(e))
+                                )
+                            # Waits until a request may be made again, unless the service is stopped meanwhile.
+                            await asyncio.wait([cls.close_waiter], timeout=max(e.retry_after, 1))
+                            continue
                         except ResponseParserError:
                             if not is_disconnected:
                                 is_disconnected = True
@@ -1476,14 +2827,17 @@ class AWSSNSSQSTransport(Invoker):
                                     logging.getLogger("transport.aws_sns_sqs").warning(
                                         "Reconnected - receiving messages"
                                     )
-                                try:
-                                    context["_aws_sns_sqs_subscribed"] = False
-                                    cls.topics = {}
-                                    func = await cls.subscribe(obj, context)
-                                    if func:
-                                        await func()
-                                except Exception:
-                                    pass
+                                if not resubscribe_lock.locked():
+                                    async with resubscribe_lock:
+                                        try:
+                                            context["_aws_sns_sqs_subscribed"] = False
+                                            cls.topics = {}
+                                            cls.invalidate_resource_cache(context)
+                                            func = await cls.subscribe(obj, context)
+                                            if func:
+                                                await func()
+                                        except Exception:
+                                            pass
                                 await asyncio.sleep(20)
                                 continue
                             if not is_disconnected:
@@ -1514,6 +2868,11 @@ class AWSSNSSQSTransport(Invoker):
                             continue
 
                         messages = response.get("Messages", [])
+                        is_idle = not messages
+                        if idle_poll and messages:
+                            acquired_capacity = await acquire_capacity(len(messages))
+                        if receive_backoff:
+                            receive_backoff.record(len(messages))
                         if not messages:
                             continue
 
@@ -1531,7 +2890,7 @@ class AWSSNSSQSTransport(Invoker):
                                 )
                             except ValueError:
                                 # Malformed SQS message, not in SNS format and should be discarded
-                                await cls.delete_message(receipt_handle, queue_url, context)
+                                await cls.enqueue_delete_message(receipt_handle, queue_url, context)
                                 logging.getLogger("transport.aws_sns_sqs").warning("Discarded malformed message")
                                 continue
 
@@ -1541,6 +2900,18 @@ class AWSSNSSQSTransport(Invoker):
                                 int(message.get("Attributes", {}).get("ApproximateReceiveCount", 0)) or None
                             )
 
+                            if batch:
+                                batch_messages.append(
+                                    (
+                                        payload,
+                                        receipt_handle,
+                                        message_topic,
+                                        message_attributes,
+                                        approximate_receive_count,
+                                    )
+                                )
+                                continue
+
                             futures.append(
                                 callback(
                                     payload,
@@ -1551,55 +2922,150 @@ class AWSSNSSQSTransport(Invoker):
                                     approximate_receive_count,
                                 )
                             )
+                            if fifo_message_groups:
+                                message_groups.setdefault(
+                                    message.get("Attributes", {}).get("MessageGroupId"), []
+                                ).append((receipt_handle, futures[-1]))
                     except asyncio.CancelledError:
                         continue
                     except BaseException:
                         continue
+                    finally:
+                        if acquired_capacity > len(futures) + len(batch_messages):
+                            release_capacity(acquired_capacity - len(futures) - len(batch_messages))
+
+                    tasks: List[asyncio.Future] = []
+                    if fifo_message_groups:
+                        # Each message group holds the in-flight capacity of each of its messages until the last
+                        # message of the group has been handled.
+                        for group_messages in message_groups.values():
+                            task = asyncio.ensure_future(message_group_callback(group_messages)())
+                            tasks.append(task)
+                            running_tasks.add(task)
+                            task.add_done_callback(functools.partial(task_done_callback, capacity=len(group_messages)))
+                    else:
+                        for func in futures:
+                            task = asyncio.ensure_future(func())
+                            tasks.append(task)
+                            running_tasks.add(task)
+                            task.add_done_callback(task_done_callback)
+
+                    if batch_messages:
+                        # All messages of a receive are handled in one call to the batch handler, which holds the
+                        # in-flight capacity of each of its messages until it's done.
+                        task = asyncio.ensure_future(batch_callback(batch_messages, queue_url)())
+                        tasks.append(task)
+                        running_tasks.add(task)
+                        task.add_done_callback(functools.partial(task_done_callback, capacity=len(batch_messages)))
 
-                    tasks = [asyncio.ensure_future(func()) for func in futures]
                     if not tasks:
                         continue
+
+                    if queue_limiter:
+                        continue
+
                     try:
                         await asyncio.shield(asyncio.wait(tasks))
                     except asyncio.CancelledError:
                         await asyncio.wait(tasks)
                         await asyncio.sleep(1)
 
-                if not stop_waiter.done():
-                    stop_waiter.set_result(None)
-
-            task: Optional[asyncio.Future] = None
-            while True:
-                if task and cls.close_waiter and not cls.close_waiter.done():
-                    logging.getLogger("transport.aws_sns_sqs").warning(
-                        "Resuming message receiving after trying to recover from fatal error"
+            async def _poll() -> None:
+                task: Optional[asyncio.Future] = None
+                while True:
+                    if task and cls.close_waiter and not cls.close_waiter.done():
+                        logging.getLogger("transport.aws_sns_sqs").warning(
+                            "Resuming message receiving after trying to recover from fatal error"
+                        )
+                    if not task or task.done():
+                        task = asyncio.ensure_future(_receive_wrapper())
+                    await asyncio.wait(
+                        [cast(asyncio.Future, cls.close_waiter), task], return_when=asyncio.FIRST_COMPLETED
                     )
-                if not task or task.done():
-                    task = asyncio.ensure_future(_receive_wrapper())
-                await asyncio.wait([cast(asyncio.Future, cls.close_waiter), task], return_when=asyncio.FIRST_COMPLETED)
-                if not cls.close_waiter or cls.close_waiter.done():
-                    break
-                if not cls.close_waiter.done() and task.done() and task.exception():
+                    if not cls.close_waiter or cls.close_waiter.done():
+                        break
+                    if not cls.close_waiter.done() and task.done() and task.exception():
+                        try:
+                            exception = task.exception()
+                            if exception:
+                                raise exception
+                        except Exception as e:
+                            logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
+                        sleep_task: asyncio.Future = asyncio.ensure_future(asyncio.sleep(10))
+                        await asyncio.wait([sleep_task, cls.close_waiter], return_when=asyncio.FIRST_COMPLETED)
+                        if not sleep_task.done():
+                            sleep_task.cancel()
+
+                if task and not task.done():
+                    task.cancel()
+                    try:
+                        await task
+                    except asyncio.CancelledError:
+                        pass
+
+            async def _visibility_heartbeat(visibility_timeout: int) -> None:
+                # Messages that have been processed for longer than the threshold fraction of the visibility
+                # timeout get their visibility timeout reset, so that they don't reappear on the queue while
+                # their handler is still running.
+                extend_within = visibility_timeout * (1 - heartbeat_threshold)
+                interval = max(extend_within / 2, 0.1)
+                while True:
+                    await asyncio.sleep(interval)
+                    now = loop.time()
+                    receipt_handles = [
+                        receipt_handle
+                        for receipt_handle, expires_at in visibility_leases.items()
+                        if expires_at - now <= extend_within
+                    ]
+                    if not receipt_handles:
+                        continue
+                    for receipt_handle in receipt_handles:
+                        visibility_leases[receipt_handle] = now + visibility_timeout
                     try:
-                        exception = task.exception()
-                        if exception:
-                            raise exception
+                        await cls.change_message_visibility_batch(
+                            receipt_handles, visibility_timeout, queue_url, context
+                        )
+                    except asyncio.CancelledError:
+                        raise
                     except Exception as e:
-                        logging.getLogger("exception").exception("Uncaught exception: {}".format(str(e)))
-                    sleep_task: asyncio.Future = asyncio.ensure_future(asyncio.sleep(10))
-                    await asyncio.wait([sleep_task, cls.close_waiter], return_when=asyncio.FIRST_COMPLETED)
-                    if not sleep_task.done():
-                        sleep_task.cancel()
+                        error_message = str(e) or type(e).__name__
+                        logging.getLogger("transport.aws_sns_sqs").warning(
+                            "Unable to change message visibility [sqs] on AWS ({})".format(error_message)
+                        )
+
+            heartbeat_task: Optional[asyncio.Future] = None
+            if heartbeat_visibility_timeout:
+                heartbeat_task = asyncio.ensure_future(_visibility_heartbeat(heartbeat_visibility_timeout))
+
+            # All pollers of the queue share the same in-flight window (if any) and are awaited before the
+            # remaining running tasks are drained.
+            await asyncio.gather(*[_poll() for _ in range(pollers_per_queue)])
+
+            while running_tasks:
+                try:
+                    await asyncio.shield(asyncio.wait(list(running_tasks)))
+                except asyncio.CancelledError:
+                    continue
 
-            if task and not task.done():
-                task.cancel()
-                await task
+            if heartbeat_task and not heartbeat_task.done():
+                heartbeat_task.cancel()
+                try:
+                    await heartbeat_task
+                except asyncio.CancelledError:
+                    pass
+
+            if not stop_waiter.done():
+                stop_waiter.set_result(None)
 
         loop: Any = asyncio.get_event_loop()
 
         stop_method = getattr(obj, "_stop_service", None)
 
         async def stop_service(*args: Any, **kwargs: Any) -> None:
+            refresh_task: Optional[asyncio.Future] = context.get("_aws_sns_sqs_wildcard_refresh_task")
+            if refresh_task is not None and not refresh_task.done():
+                refresh_task.cancel()
+
             if cls.close_waiter and not cls.close_waiter.done():
                 logging.getLogger("transport.aws_sns_sqs").warning("Draining message pool - awaiting running tasks")
                 cls.close_waiter.set_result(None)
@@ -1609,6 +3075,10 @@ class AWSSNSSQSTransport(Invoker):
                 await stop_waiter
                 if stop_method:
                     await stop_method(*args, **kwargs)
+                await cls.flush_delete_message_buffers(context)
+                await flush_publish_outboxes(context, "aws_sns_sqs")
+                await cls.flush_publish_message_buffers(context)
+                await cls.close_resource_cache(context)
                 await connector.close()
             else:
                 await stop_waiter
@@ -1642,6 +3112,8 @@ class AWSSNSSQSTransport(Invoker):
             if not connector.get_client("tomodachi.sqs"):
                 await cls.create_client("sqs", context)
 
+            await cls.warm_up(context)
+
             cls.close_waiter = asyncio.Future()
 
             set_execution_context(
@@ -1649,6 +3121,7 @@ class AWSSNSSQSTransport(Invoker):
                     "aws_sns_sqs_enabled": True,
                     "aws_sns_sqs_current_tasks": 0,
                     "aws_sns_sqs_total_tasks": 0,
+                    "aws_sns_sqs_failed_message_deletes": 0,
                     "aiobotocore_version": aiobotocore.__version__,
                     "aiohttp_version": aiohttp.__version__,
                     "botocore_version": botocore.__version__,
@@ -1761,32 +3234,135 @@ class AWSSNSSQSTransport(Invoker):
 
                 return queue_url
 
-            try:
-                for (
-                    topic,
-                    competing,
-                    queue_name,
-                    func,
-                    handler,
-                    attributes,
-                    visibility_timeout,
-                    dead_letter_queue_name,
-                    max_receive_count,
-                    fifo,
-                ) in context.get("_aws_sns_sqs_subscribers", []):
-                    queue_url = await setup_queue(
+            subscribe_setup_concurrency = cls.options(context).aws_sns_sqs.subscribe_setup_concurrency
+            if (
+                not isinstance(subscribe_setup_concurrency, int)
+                or subscribe_setup_concurrency is True
+                or subscribe_setup_concurrency < 1
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option subscribe_setup_concurrency: {}".format(
+                        str(subscribe_setup_concurrency)
+                    )
+                )
+            setup_semaphore = asyncio.Semaphore(subscribe_setup_concurrency)
+
+            async def bounded_setup_queue(
+                func: Callable,
+                topic: Optional[str],
+                queue_name: Optional[str],
+                competing_consumer: Optional[bool],
+                attributes: Optional[Dict[str, Union[str, bool]]],
+                visibility_timeout: Optional[int],
+                dead_letter_queue_name: Optional[str],
+                max_receive_count: Optional[int],
+                fifo: bool,
+            ) -> str:
+                async with setup_semaphore:
+                    return await setup_queue(
                         func,
                         topic=topic,
                         queue_name=queue_name,
-                        competing_consumer=competing,
+                        competing_consumer=competing_consumer,
                         attributes=attributes,
                         visibility_timeout=visibility_timeout,
                         dead_letter_queue_name=dead_letter_queue_name,
                         max_receive_count=max_receive_count,
                         fifo=fifo,
                     )
-                    await cls.consume_queue(obj, context, handler, queue_url=queue_url)
+
+            subscribers = context.get("_aws_sns_sqs_subscribers", [])
+            setup_tasks: List[asyncio.Future] = []
+
+            wildcard_topic_refresh_interval = cls.options(context).aws_sns_sqs.wildcard_topic_refresh_interval
+            if wildcard_topic_refresh_interval is not None and (
+                not isinstance(wildcard_topic_refresh_interval, (int, float))
+                or wildcard_topic_refresh_interval is True
+                or wildcard_topic_refresh_interval is False
+                or wildcard_topic_refresh_interval <= 0
+            ):
+                raise ValueError(
+                    "Bad value for aws_sns_sqs option wildcard_topic_refresh_interval: {}".format(
+                        str(wildcard_topic_refresh_interval)
+                    )
+                )
+
+            refresh_task: Optional[asyncio.Future] = context.get("_aws_sns_sqs_wildcard_refresh_task")
+            if refresh_task is not None and not refresh_task.done():
+                refresh_task.cancel()
+            context.pop("_aws_sns_sqs_topic_arns", None)
+            context.pop("_aws_sns_sqs_wildcard_topic_arns", None)
+            context["_aws_sns_sqs_wildcard_subscriptions"] = []
+            context["_aws_sns_sqs_wildcard_topic_patterns"] = set(
+                [
+                    cls.get_wildcard_topic_pattern(subscriber[0], context, subscriber[9])
+                    for subscriber in subscribers
+                    if subscriber[0] and re.search(r"([*#])", subscriber[0])
+                ]
+            )
+
+            try:
+                # Queues, topics and subscriptions for all handlers are set up concurrently (with a bounded fan-out)
+                # and the consumers are started once every handler has been set up successfully.
+                setup_tasks = [
+                    asyncio.ensure_future(
+                        bounded_setup_queue(
+                            func,
+                            topic,
+                            queue_name,
+                            competing,
+                            attributes,
+                            visibility_timeout,
+                            dead_letter_queue_name,
+                            max_receive_count,
+                            fifo,
+                        )
+                    )
+                    for (
+                        topic,
+                        competing,
+                        queue_name,
+                        func,
+                        _,
+                        attributes,
+                        visibility_timeout,
+                        dead_letter_queue_name,
+                        max_receive_count,
+                        fifo,
+                        _,
+                        _,
+                        _,
+                        _,
+                    ) in subscribers
+                ]
+                queue_urls = await asyncio.gather(*setup_tasks)
+
+                for queue_url, (_, _, _, _, handler, _, _, _, _, _, pollers, max_concurrency, batch, priority) in zip(
+                    queue_urls, subscribers
+                ):
+                    await cls.consume_queue(
+                        obj,
+                        context,
+                        handler,
+                        queue_url=queue_url,
+                        pollers_per_queue=pollers,
+                        max_concurrency=max_concurrency,
+                        batch=batch,
+                        priority=priority,
+                    )
+
+                resource_cache = cls.get_resource_cache(context)
+                if resource_cache is not None:
+                    resource_cache.save()
+
+                if wildcard_topic_refresh_interval and context["_aws_sns_sqs_wildcard_subscriptions"]:
+                    context["_aws_sns_sqs_wildcard_refresh_task"] = asyncio.ensure_future(
+                        cls.refresh_wildcard_subscriptions(wildcard_topic_refresh_interval, context)
+                    )
             except Exception:
+                for task in setup_tasks:
+                    if not task.done():
+                        task.cancel()
                 await connector.close(fast=True)
                 await asyncio.sleep(0.5)
                 raise
@@ -1796,7 +3372,9 @@ class AWSSNSSQSTransport(Invoker):
 
 __aws_sns_sqs = AWSSNSSQSTransport.decorator(AWSSNSSQSTransport.subscribe_handler)
 aws_sns_sqs_publish = AWSSNSSQSTransport.publish
+aws_sns_sqs_publish_batch = AWSSNSSQSTransport.publish_batch
 publish = AWSSNSSQSTransport.publish
+publish_batch = AWSSNSSQSTransport.publish_batch
 
 
 def aws_sns_sqs(